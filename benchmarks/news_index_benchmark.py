@@ -0,0 +1,52 @@
+"""Offline check of the local news index against recorded NewsAPI articles.
+
+Run from the repo root:
+    python -m benchmarks.news_index_benchmark
+"""
+import os
+import tempfile
+import time
+
+from services.news_index import NewsIndex
+from services.news_service import COMPANY_NAMES, FixtureNewsClient, NewsService
+
+FIXTURES = os.path.join(os.path.dirname(__file__), "news_fixtures.json")
+QUERIES = ["federal reserve rates", "dividend", "AI data center", "oil OPEC", "iPhone China", "crypto"]
+
+
+def main():
+    with tempfile.TemporaryDirectory() as tmp:
+        index = NewsIndex(os.path.join(tmp, "news_index.sqlite"))
+        added = index.ingest_file(FIXTURES)
+        again = index.ingest_file(FIXTURES)
+        print(f"Ingested {added} articles, {again} on re-ingest (URL dedup)")
+
+        for query in QUERIES:
+            start = time.perf_counter()
+            results = index.search(query, limit=5)
+            elapsed = (time.perf_counter() - start) * 1000
+            top = results[0]["title"] if results else "-"
+            print(f"{query!r:26} {len(results)} hits {elapsed:6.2f} ms  {top}")
+
+        for symbol in ("AAPL", "MSFT", "NVDA"):
+            print(f"{symbol}: {[a['title'][:40] for a in index.stock_articles(symbol, limit=3)]}")
+
+        client = FixtureNewsClient.from_file(FIXTURES)
+        service = NewsService(api=client, index=index)
+        for query in QUERIES:
+            service.search_news(query, limit=5)
+        for symbol in ("AAPL", "MSFT", "NVDA", "AMZN"):
+            service.get_stock_news(symbol, limit=3)
+        print(f"Remote calls for {len(QUERIES)} searches and 4 tickers: {client.calls}")
+
+        portfolio = list(COMPANY_NAMES)[:30]
+        client = FixtureNewsClient.from_file(FIXTURES)
+        service = NewsService(api=client, index=NewsIndex(os.path.join(tmp, "portfolio_index.sqlite")))
+        news = service.get_portfolio_news(portfolio, limit=3)
+        with_news = sum(1 for articles in news.values() if articles)
+        print(f"Portfolio news for {len(portfolio)} symbols: {client.calls} remote calls, "
+              f"{with_news} symbols with articles")
+
+
+if __name__ == "__main__":
+    main()
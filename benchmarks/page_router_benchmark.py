@@ -0,0 +1,63 @@
+"""Accuracy and latency of the local page router against labelled goals.
+
+Run from the repo root:
+    python -m benchmarks.page_router_benchmark
+"""
+import json
+import os
+import time
+
+from services.page_router import PageRouter, EXTRA_PAGES
+
+FIXTURES = os.path.join(os.path.dirname(__file__), "page_router_fixtures.json")
+
+
+def main():
+    with open(FIXTURES) as f:
+        fixtures = json.load(f)
+
+    router = PageRouter()
+    exact = 0
+    uncertain = 0
+    tp = {page: 0 for page in EXTRA_PAGES}
+    fp = dict(tp)
+    fn = dict(tp)
+    misses = []
+
+    for case in fixtures:
+        predicted, confident = router.route(case["goal"])
+        expected = set(case["pages"])
+        uncertain += not confident
+        if set(predicted) == expected:
+            exact += 1
+        else:
+            misses.append((case["goal"], sorted(expected), predicted))
+        for page in EXTRA_PAGES:
+            if page in predicted and page in expected:
+                tp[page] += 1
+            elif page in predicted:
+                fp[page] += 1
+            elif page in expected:
+                fn[page] += 1
+
+    runs = 2000
+    started = time.perf_counter()
+    for i in range(runs):
+        router.route(fixtures[i % len(fixtures)]["goal"])
+    per_call_us = (time.perf_counter() - started) / runs * 1e6
+
+    print(f"Exact-match accuracy: {exact}/{len(fixtures)} ({exact / len(fixtures):.1%})")
+    print(f"Low-confidence (LLM fallback) rate: {uncertain / len(fixtures):.1%}")
+    print(f"Latency: {per_call_us:.1f} µs per goal")
+    print()
+    print(f"{'page':<26}{'precision':>10}{'recall':>8}")
+    for page in EXTRA_PAGES:
+        precision = tp[page] / (tp[page] + fp[page]) if tp[page] + fp[page] else 1.0
+        recall = tp[page] / (tp[page] + fn[page]) if tp[page] + fn[page] else 1.0
+        print(f"{page:<26}{precision:>10.2f}{recall:>8.2f}")
+    for goal, expected, predicted in misses:
+        print(f"\nMISS: {goal!r}\n  expected {expected}\n  got      {predicted}")
+
+
+if __name__ == "__main__":
+    main()
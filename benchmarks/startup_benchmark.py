@@ -0,0 +1,108 @@
+"""Worker cold start: `import dash_app` plus the first HTTP response, before and after.
+
+Each scenario runs in a fresh interpreter so nothing is cached between runs. The
+baseline is the pre-change tree (the repository's root commit unless --baseline
+names another revision), exported with `git archive`; it imports every SDK,
+component and service eagerly. The current tree is measured twice with schema
+migrations stubbed so no database is needed: once with the background refreshers
+(market snapshot, sentiment, news ingester, goal index) also stubbed, which
+isolates the import and first-render cost, and once with them running as in
+production.
+
+Run from the repo root:
+    python -m benchmarks.startup_benchmark [--runs 5] [--baseline REV]
+"""
+import argparse
+import json
+import os
+import statistics
+import subprocess
+import sys
+import tempfile
+
+HEAVY_MODULES = ["anthropic", "openai", "newsapi", "yfinance", "pandas",
+                 "plotly", "streamlit", "smolagents"]
+
+REPO_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+STUB_MIGRATIONS = """
+import services.schema
+services.schema.run_migrations = lambda: []
+"""
+
+STUB_REFRESHERS = """
+from services.market_snapshot import market_snapshot
+from services.sentiment_job import sentiment_snapshot
+from services.news_index import news_ingester
+from services.goal_index import goal_index
+for refresher in (market_snapshot, sentiment_snapshot, news_ingester, goal_index):
+    refresher.start = lambda *args, **kwargs: None
+"""
+
+PROBE = """
+import json, sys, time
+started = time.perf_counter()
+{setup}
+import dash_app
+imported = time.perf_counter()
+
+client = dash_app.server.test_client()
+for path in ("/", "/_dash-layout", "/_dash-dependencies"):
+    assert client.get(path).status_code == 200, path
+responded = time.perf_counter()
+
+print(json.dumps({{"import": imported - started, "first_response": responded - started,
+                  "heavy_loaded": [m for m in {heavy!r} if m in sys.modules]}}))
+"""
+
+
+def measure(tree: str, setup: str, runs: int) -> dict:
+    imports, responses, result = [], [], {}
+    probe = PROBE.format(setup=setup, heavy=HEAVY_MODULES)
+    for _ in range(runs):
+        out = subprocess.run([sys.executable, "-c", probe], cwd=tree, capture_output=True,
+                             text=True, check=True).stdout
+        result = json.loads(out.strip().splitlines()[-1])
+        imports.append(result["import"])
+        responses.append(result["first_response"])
+    return {"import_ms": statistics.median(imports) * 1000,
+            "first_response_ms": statistics.median(responses) * 1000,
+            "heavy_loaded": result["heavy_loaded"]}
+
+
+def export_tree(revision: str, directory: str):
+    archive = subprocess.run(["git", "archive", revision], cwd=REPO_ROOT, capture_output=True, check=True)
+    subprocess.run(["tar", "-x", "-C", directory], input=archive.stdout, check=True)
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--runs", type=int, default=5)
+    parser.add_argument("--baseline", help="revision to compare against (default: the root commit)")
+    args = parser.parse_args()
+
+    baseline = args.baseline or subprocess.run(
+        ["git", "rev-list", "--max-parents=0", "HEAD"], cwd=REPO_ROOT, capture_output=True,
+        text=True, check=True).stdout.split()[0]
+
+    with tempfile.TemporaryDirectory() as baseline_tree:
+        export_tree(baseline, baseline_tree)
+        scenarios = {
+            f"baseline ({baseline[:7]})": (baseline_tree, ""),
+            "refreshers stubbed": (REPO_ROOT, STUB_MIGRATIONS + STUB_REFRESHERS),
+            "refreshers running": (REPO_ROOT, STUB_MIGRATIONS),
+        }
+        results = {}
+        for label, (tree, setup) in scenarios.items():
+            results[label] = result = measure(tree, setup, args.runs)
+            print(f"{label:<20} import {result['import_ms']:8.1f} ms   "
+                  f"first response {result['first_response_ms']:8.1f} ms   heavy modules loaded: "
+                  f"{', '.join(result['heavy_loaded']) or 'none'}")
+
+    before = results[f"baseline ({baseline[:7]})"]["first_response_ms"]
+    after = results["refreshers running"]["first_response_ms"]
+    print(f"\nFirst response: {before:.0f} ms -> {after:.0f} ms ({before / after:.1f}x faster)")
+
+
+if __name__ == "__main__":
+    main()
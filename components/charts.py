@@ -5,19 +5,19 @@ from services.stock_service import StockService
 import pandas as pd
 from components import portfolio
 
-def plot_portfolio_performance():
+def plot_portfolio_performance(user_id: str = None):
     """Display portfolio performance charts"""
     # Get optimized portfolio positions from the database
-    positions = portfolio.get_optimized_positions()
+    positions = portfolio.get_optimized_positions(user_id)
     if not positions:
         st.warning("No portfolio positions found. Please generate your portfolio first.")
         return
     
-    # Get historical data for each stock
-    historical_data = {}
-    for symbol in positions:
-        data = StockService.get_stock_data(symbol)
-        historical_data[symbol] = data
+    # Get historical data for all stocks concurrently; failed symbols are skipped
+    historical_data = StockService.get_many_histories(list(positions))
+    missing = [symbol for symbol in positions if symbol not in historical_data]
+    if missing:
+        st.warning(f"Price history unavailable for: {', '.join(missing)}")
     
     # Create performance chart
     fig = go.Figure()
@@ -1,26 +1,35 @@
 import streamlit as st
-from services.news_service import NewsService
-from services.ai_service import AIService
+from services.registry import get_news_service
+from services.sentiment_job import sentiment_snapshot
 
 def display_news_dashboard():
     """Display news dashboard"""
-    news_service = NewsService()
-    ai_service = AIService()
+    news_service = get_news_service()
     
     # Search bar
     from services.tracking_service import TrackingService
     
     search_query = st.text_input("Search News", placeholder="Enter keywords or stock symbols")
     
+    sentiment = None
     if search_query:
         TrackingService.log_activity("news_search", {"query": search_query})
         news_articles = news_service.search_news(search_query)
+        if news_articles:
+            sentiment = sentiment_snapshot.get_query_sentiment(search_query, news_articles)
     else:
-        news_articles = news_service.get_market_news()
+        # The default feed and its sentiment come from the shared precomputed snapshot,
+        # refreshed by the thread dash_app starts at boot
+        snapshot = sentiment_snapshot.get()
+        if snapshot is None:
+            st.info("Market sentiment is being prepared, check back shortly.")
+            news_articles = []
+        else:
+            news_articles = snapshot['articles']
+            sentiment = snapshot['sentiment']
     
     # Display sentiment analysis if articles are found
-    if news_articles:
-        sentiment = ai_service.get_market_sentiment(news_articles)
+    if sentiment:
         
         # Display sentiment metrics
         col1, col2 = st.columns(2)
@@ -1,50 +1,27 @@
 import streamlit as st
 import pandas as pd
-import os
-import singlestoredb as s2
+from services.portfolio_repository import PortfolioRepository
 from services.stock_service import StockService
+from services.market_snapshot import market_snapshot
+from services.batch_analytics import get_portfolio_summary
 from utils.data_utils import format_currency, format_percentage, calculate_portfolio_metrics
 
-def get_optimized_positions():
+def get_optimized_positions(user_id: str = None):
     """Fetch optimized portfolio positions from SingleStore."""
-    config = {
-        "host": os.getenv('host'),
-        "port": os.getenv('port'),
-        "user": os.getenv('user'),
-        "password": os.getenv('password'),
-        "database": os.getenv('database')
-    }
-    connection = s2.connect(**config)
-    cursor = connection.cursor()
-
-    # Get user_id from session state
-    user_id = st.session_state.get('user_id', '')
-    
+    # Get user_id from session state unless the caller passed it, e.g. a Dash job
+    if user_id is None:
+        user_id = st.session_state.get('user_id', '')
     if not user_id:
-        cursor.close()
-        connection.close()
         return {}
+    return PortfolioRepository.get_positions(user_id)
 
-    query = "SELECT symbol, quantity FROM optimized_portfolio WHERE user_id = %s"
-    cursor.execute(query, (user_id,))
-    results = cursor.fetchall()
-    cursor.close()
-    connection.close()
-
-    positions = {}
-    for row in results:
-        # Assuming each row is a tuple (symbol, quantity)
-        symbol = row[0]
-        quantity = row[1]
-        # If multiple rows for the same symbol exist, sum them
-        positions[symbol] = positions.get(symbol, 0) + quantity
-    return positions
 
-
-def display_portfolio_summary():
+def display_portfolio_summary(user_id: str = None):
     """Display portfolio summary section using optimized portfolio positions."""
+    if user_id is None:
+        user_id = st.session_state.get('user_id', '')
     try:
-        positions = get_optimized_positions()
+        positions = get_optimized_positions(user_id)
     except Exception as e:
         st.error(f"Error fetching optimized positions: {e}")
         positions = {}
@@ -55,15 +32,30 @@ def display_portfolio_summary():
 
     # Get performance metrics based on positions
     performance = StockService.get_portfolio_performance(positions)
-    metrics = calculate_portfolio_metrics(performance)
+    try:
+        summary = get_portfolio_summary(user_id)
+    except Exception as e:
+        print(f"Failed to read portfolio summary: {e}")
+        summary = {}
+    if summary:
+        # Risk and return metrics precomputed by the batch job; value and daily change stay live
+        metrics = calculate_portfolio_metrics(performance)
+        metrics['ytd_return'] = summary['ytd_return'] or 0
+        metrics['risk_metrics'].update({
+            key: summary[key] for key in ('volatility', 'sharpe', 'max_drawdown', 'beta')
+        })
+    else:
+        histories = StockService.get_many_histories(list(positions) + ['^GSPC'])
+        benchmark = histories.pop('^GSPC', None)
+        metrics = calculate_portfolio_metrics(performance, histories, benchmark)
 
     # Display metrics
     col1, col2, col3 = st.columns(3)
     with col1:
         st.metric("Total Value", format_currency(metrics['total_value']),
-                  format_percentage(metrics['daily_return']))
+                  format_percentage(metrics['daily_return'] * 100))
     with col2:
-        st.metric("YTD Return", format_percentage(metrics['ytd_return']))
+        st.metric("YTD Return", format_percentage(metrics['ytd_return'] * 100))
     with col3:
         st.metric(
             "Diversification Score",
@@ -81,39 +73,11 @@ def display_portfolio_summary():
 
 def add_stock_to_portfolio(symbol: str, quantity: int):
     """Add a stock symbol to the optimized portfolio table for the current user."""
-    config = {
-        "host": os.getenv('host'),
-        "port": os.getenv('port'),
-        "user": os.getenv('user'),
-        "password": os.getenv('password'),
-        "database": os.getenv('database')
-    }
-    connection = s2.connect(**config)
-    cursor = connection.cursor()
-
     user_id = st.session_state.get('user_id', '')
     if not user_id:
         st.error("User ID is not set.")
         return
-
-    # Check if the symbol already exists for this user
-    query = "SELECT quantity FROM optimized_portfolio WHERE user_id = %s AND symbol = %s"
-    cursor.execute(query, (user_id, symbol))
-    result = cursor.fetchone()
-
-    if result:
-        # Update the quantity if the stock already exists
-        new_quantity = result[0] + quantity
-        update_query = "UPDATE optimized_portfolio SET quantity = %s WHERE user_id = %s AND symbol = %s"
-        cursor.execute(update_query, (new_quantity, user_id, symbol))
-    else:
-        # Insert new record; using 0.0 as a default for target_allocation
-        insert_query = "INSERT INTO optimized_portfolio (user_id, symbol, quantity, target_allocation) VALUES (%s, %s, %s, %s)"
-        cursor.execute(insert_query, (user_id, symbol, quantity, 0.0))
-
-    connection.commit()
-    cursor.close()
-    connection.close()
+    PortfolioRepository.add_position(user_id, symbol, quantity)
 
 
 def display_quick_actions():
@@ -139,7 +103,12 @@ def display_quick_actions():
 
 def display_market_summary():
     """Display market summary section."""
-    market_data = StockService.get_market_summary()
+    market_data = market_snapshot.get()
+    if not market_data:
+        st.info("Market data is loading, check back shortly.")
+        return
     for index, data in market_data.items():
+        if index == '^TNX':
+            continue
         st.metric(data['name'], format_currency(data['price']),
                   format_percentage(data['change']))
\ No newline at end of file
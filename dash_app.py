@@ -2,67 +2,52 @@ import dash
 from dash import dcc, html, Input, Output, State, callback_context, ALL, no_update
 import os
 import json
-import singlestoredb as s2
+import diskcache
 from dotenv import load_dotenv
 import dash_bootstrap_components as dbc
 
 load_dotenv()
 
-# Import your components and services
-from components import portfolio, news, charts
-from services.stock_service import StockService
-from services.news_service import NewsService
-from services.ai_service import AIService
-from services.custom_investment_agent2 import get_additional_pages
+# Background callbacks run in forked worker processes, so the LLM response cache and
+# goal index they fill must live on disk to be reused by later requests
+DASH_CACHE_DIR = os.getenv('dash_cache_dir', './.dash_cache')
+os.makedirs(DASH_CACHE_DIR, exist_ok=True)
+os.environ.setdefault('llm_cache_path', os.path.join(DASH_CACHE_DIR, 'llm_cache.sqlite'))
+os.environ.setdefault('goal_index_path', os.path.join(DASH_CACHE_DIR, 'goal_index.jsonl'))
+os.environ.setdefault('news_index_path', os.path.join(DASH_CACHE_DIR, 'news_index.sqlite'))
+# The same goes for price histories, positions and NewsAPI responses read by the
+# dashboard and news page jobs
+os.environ.setdefault('price_store_dir', os.path.join(DASH_CACHE_DIR, 'prices'))
+os.environ.setdefault('positions_cache_dir', os.path.join(DASH_CACHE_DIR, 'positions'))
+os.environ.setdefault('news_cache_dir', os.path.join(DASH_CACHE_DIR, 'news'))
+
+# Import your services. Components (streamlit, plotly, yfinance) and the LLM SDKs are
+# loaded lazily on first use so workers can start serving immediately.
+from services.registry import get_ai_service
+from services.market_snapshot import market_snapshot
+from services.sentiment_job import sentiment_snapshot
+from services.news_index import news_ingester
+from services.goal_index import goal_index
+from services.portfolio_repository import PortfolioRepository
+from services.schema import run_migrations
+from services.job_manager import DedupingDiskcacheManager
 
 def insert_optimized_portfolio(optimized_portfolio_data: dict, user_id: str):
     """
-    Inserts optimized portfolio positions into SingleStore.
+    Replaces the user's optimized portfolio positions in SingleStore.
     """
-    config = {
-        "host": os.getenv('host'),
-        "port": os.getenv('port'),
-        "user": os.getenv('user'),
-        "password": os.getenv('password'),
-        "database": os.getenv('database')
-    }
-    connection = s2.connect(**config)
-    cursor = connection.cursor()
-
-    # Create table if not exists
-    cursor.execute("""
-    CREATE TABLE IF NOT EXISTS optimized_portfolio (
-        id BIGINT AUTO_INCREMENT PRIMARY KEY,
-        user_id VARCHAR(100),
-        symbol VARCHAR(10),
-        quantity INT,
-        target_allocation FLOAT,
-        created_at DATETIME DEFAULT CURRENT_TIMESTAMP
-    );
-    """)
-    # Clear previous optimizations for this user
-    cursor.execute("DELETE FROM optimized_portfolio WHERE user_id = %s", (user_id, ))
-
-    insert_query = '''
-    INSERT INTO optimized_portfolio (user_id, symbol, quantity, target_allocation)
-    VALUES (%s, %s, %s, %s);
-    '''
-    for holding in optimized_portfolio_data.get("optimized_holdings", []):
-        data_tuple = (
-            user_id,
-            holding["symbol"],
-            holding["quantity"],
-            holding["target_allocation"]
-        )
-        cursor.execute(insert_query, data_tuple)
-
-    connection.commit()
-    cursor.close()
-    connection.close()
+    PortfolioRepository.replace_portfolio(user_id, optimized_portfolio_data.get("optimized_holdings", []))
 
 # Define the base pages
 base_pages = ["Welcome", "Portfolio Dashboard", "News Tracker", "AI Insights"]
 
+# Background callbacks run in a local diskcache-backed job manager so slow LLM work,
+# database writes and market/news fetches stream progress to the browser without
+# holding a web worker. Identical in-flight jobs are shared rather than started twice.
+background_callback_manager = DedupingDiskcacheManager(
+    diskcache.Cache(os.path.join(DASH_CACHE_DIR, 'jobs')),
+    expire=float(os.getenv('background_job_expire', 60)))
+
 # Initialize the Dash app with Bootstrap components and Font Awesome
 app = dash.Dash(
     __name__, 
@@ -70,10 +55,33 @@ app = dash.Dash(
         dbc.themes.FLATLY,
         "https://use.fontawesome.com/releases/v5.15.4/css/all.css"
     ],
-    suppress_callback_exceptions=True
+    suppress_callback_exceptions=True,
+    background_callback_manager=background_callback_manager
 )
 server = app.server  # For deployment purposes
 
+# Apply pending schema migrations once at startup; request handlers never issue DDL.
+# Deploys should run `python -m services.schema` first; a database outage here is
+# logged rather than stopping the worker from booting.
+try:
+    run_migrations()
+except Exception as e:
+    print(f"Failed to apply schema migrations: {e}")
+
+# The refreshers below import pandas on their own threads straight away. Import it
+# here first: plotly's serializer checks sys.modules for pandas, and a request served
+# while another thread is mid-import sees a partially initialised module and fails.
+import pandas  # noqa: E402,F401
+
+# Keep the shared market snapshot warm so page renders never fetch index quotes
+market_snapshot.start()
+sentiment_snapshot.start()
+# Pull headlines and tracked tickers into the local news index that serves searches
+news_ingester.start()
+# Load saved plans here so forked plan-creation jobs inherit the index instead of
+# re-reading the whole file
+goal_index.start()
+
 # Define custom styles
 SIDEBAR_STYLE = {
     "position": "fixed",
@@ -122,6 +130,30 @@ navbar = dbc.Navbar(
     className="mb-4",
 )
 
+def market_insight_items():
+    """Build the Market Insights list from the shared market snapshot (no network I/O)."""
+    snapshot = market_snapshot.get()
+    if not snapshot:
+        return [dbc.ListGroupItem("Market data is loading...", className="text-muted")]
+
+    items = []
+    for index in ['^GSPC', '^IXIC', '^TNX']:
+        data = snapshot.get(index)
+        if not data:
+            continue
+        color = "text-success" if data['change'] >= 0 else "text-danger"
+        price = f"{data['price']:.2f}% " if index == '^TNX' else f"{data['price']:,.2f} "
+        items.append(
+            dbc.ListGroupItem([
+                html.Div(data['name'], className="fw-bold"),
+                html.Div([
+                    html.Span(price, className=color),
+                    html.Span(f"{data['change']:+.2f}%", className=color)
+                ], className="d-flex justify-content-between")
+            ])
+        )
+    return items
+
 # Define the welcome_page function before app.layout
 def welcome_page(user_data):
     return dbc.Container([
@@ -162,11 +194,20 @@ def welcome_page(user_data):
                                 color="primary", 
                                 className="mt-3"
                             ),
+                            dbc.Button(
+                                "Cancel",
+                                id='cancel-plan-btn',
+                                color="secondary",
+                                outline=True,
+                                className="mt-3 ms-2",
+                                style={"display": "none"}
+                            ),
                         ])
                     ])
                 ], className="mb-4"),
                 dbc.Card([
                     dbc.CardBody([
+                        html.Div(id='welcome-stream'),
                         html.Div(id='welcome-output')
                     ])
                 ])
@@ -188,29 +229,7 @@ def welcome_page(user_data):
                     dbc.CardBody([
                         html.H4("Market Insights", className="card-title"),
                         html.P("Today's Market Overview"),
-                        dbc.ListGroup([
-                            dbc.ListGroupItem([
-                                html.Div("S&P 500", className="fw-bold"),
-                                html.Div([
-                                    html.Span("4,587.64 ", className="text-success"),
-                                    html.Span("+0.57%", className="text-success")
-                                ], className="d-flex justify-content-between")
-                            ]),
-                            dbc.ListGroupItem([
-                                html.Div("NASDAQ", className="fw-bold"),
-                                html.Div([
-                                    html.Span("14,346.02 ", className="text-success"),
-                                    html.Span("+0.75%", className="text-success")
-                                ], className="d-flex justify-content-between")
-                            ]),
-                            dbc.ListGroupItem([
-                                html.Div("10-YR Treasury", className="fw-bold"),
-                                html.Div([
-                                    html.Span("1.67% ", className="text-danger"),
-                                    html.Span("-0.02%", className="text-danger")
-                                ], className="d-flex justify-content-between")
-                            ])
-                        ])
+                        dbc.ListGroup(market_insight_items())
                     ])
                 ])
             ], width=4)
@@ -341,67 +360,90 @@ def update_content(page, user_data):
     else:
         return render_page(page, user_data)
 
+def render_plan(holdings, rationale=None, saved=False):
+    """Render a (possibly still streaming) investment plan."""
+    holdings_rows = []
+    for holding in holdings:
+        holdings_rows.append(
+            dbc.ListGroupItem([
+                html.Div([
+                    html.Span(holding["symbol"], className="fw-bold"),
+                    html.Span(f"{holding['target_allocation']*100:.1f}%", className="badge bg-primary ms-2"),
+                ]),
+                html.Div(f"Quantity: {holding['quantity']}")
+            ])
+        )
+
+    children = [
+        html.H5("Your Personalized Investment Plan", className="text-success mb-3"),
+        html.P("Based on your goals, we've created an optimized portfolio that aligns with your objectives:"),
+        dbc.ListGroup(holdings_rows, className="mb-3")
+    ]
+    if rationale:
+        children.append(html.P(rationale))
+    if saved:
+        children.append(html.P("Your portfolio has been saved and is ready for detailed analysis!", className="text-muted"))
+    else:
+        children.append(dbc.Spinner(size="sm", color="primary"))
+    return html.Div(children)
+
 # Updated welcome page callback with debugging, error handling, and active-page update.
 # We add allow_duplicate=True so that this callback can also update 'active-page' alongside the other callback.
+# Runs as a background callback so the plan streams into 'welcome-stream' while it is generated.
 @app.callback(
     [Output('store-user', 'data'),
      Output('store-pages', 'data'),
      Output('welcome-output', 'children'),
+     Output('welcome-stream', 'style'),
      Output('active-page', 'data')],
     Input('submit-btn', 'n_clicks'),
     [State('user-name', 'value'),
      State('investment-goals', 'value'),
      State('store-user', 'data'),
      State('store-pages', 'data')],
+    background=True,
+    progress=[Output('welcome-stream', 'children')],
+    progress_default=[None],
+    running=[(Output('submit-btn', 'disabled'), True, False),
+             (Output('cancel-plan-btn', 'style'), {}, {"display": "none"})],
+    cancel=[Input('cancel-plan-btn', 'n_clicks')],
+    interval=250,
     allow_duplicate=True,
     prevent_initial_call=True
 )
-def update_welcome(n_clicks, user_name, investment_goals, user_data, pages):
+def update_welcome(set_progress, n_clicks, user_name, investment_goals, user_data, pages):
     print("Create My Financial Plan Button clicked", n_clicks)  # Debug statement
     if n_clicks is None or n_clicks == 0:
         # Instead of preventing update, return current values
-        return user_data, pages, no_update, no_update
+        return user_data, pages, no_update, no_update, no_update
 
     # Update user data with name and investment goals
     user_data['user_id'] = user_name
     user_data['investment_goals'] = investment_goals
 
-    # Modify pages if investment goals are provided
-    if investment_goals and pages == base_pages:
-        pages = get_additional_pages(investment_goals, base_pages)
-    else:
-        pages = base_pages
-
     output_message = None
     new_active_page = 'Welcome'
     if investment_goals:
         try:
-            ai_service = AIService()
-            # Generate optimized portfolio (using an empty dict as a placeholder)
-            optimized_portfolio = ai_service.optimize_portfolio({}, investment_goals)
+            ai_service = get_ai_service()
+            # Stream the optimized portfolio (using an empty dict as a placeholder) so
+            # holdings render as soon as each one is complete
+            holdings = []
+            optimized_portfolio = {}
+            for key, index, value in ai_service.stream_optimize_portfolio({}, investment_goals):
+                if index is not None:
+                    holdings.append(value)
+                else:
+                    optimized_portfolio[key] = value
+                    if key == "optimized_holdings":
+                        holdings = value
+                set_progress([render_plan(holdings, optimized_portfolio.get("rationale"))])
+
             # Insert the optimized portfolio into the database
             insert_optimized_portfolio(optimized_portfolio, user_name)
             user_data['custom_portfolio'] = optimized_portfolio
-
-            # Create a visual representation of the portfolio
-            holdings_rows = []
-            for holding in optimized_portfolio.get("optimized_holdings", []):
-                holdings_rows.append(
-                    dbc.ListGroupItem([
-                        html.Div([
-                            html.Span(holding["symbol"], className="fw-bold"),
-                            html.Span(f"{holding['target_allocation']*100:.1f}%", className="badge bg-primary ms-2"),
-                        ]),
-                        html.Div(f"Quantity: {holding['quantity']}")
-                    ])
-                )
-
-            output_message = html.Div([
-                html.H5("Your Personalized Investment Plan", className="text-success mb-3"),
-                html.P("Based on your goals, we've created an optimized portfolio that aligns with your objectives:"),
-                dbc.ListGroup(holdings_rows, className="mb-3"),
-                html.P("Your portfolio has been saved and is ready for detailed analysis!", className="text-muted")
-            ])
+            output_message = render_plan(optimized_portfolio.get("optimized_holdings", []),
+                                         optimized_portfolio.get("rationale"), saved=True)
             # Update active page to Portfolio Dashboard after plan creation
             new_active_page = "Portfolio Dashboard"
         except Exception as e:
@@ -409,20 +451,119 @@ def update_welcome(n_clicks, user_name, investment_goals, user_data, pages):
             output_message = html.Div("An error occurred while creating your financial plan.")
             new_active_page = "Welcome"
 
-    return user_data, pages, output_message, new_active_page
+    # Modify pages if investment goals are provided (after the plan, so it doesn't delay first content)
+    if investment_goals and pages == base_pages:
+        from services.custom_investment_agent2 import get_additional_pages
+        pages = get_additional_pages(investment_goals, base_pages)
+    else:
+        pages = base_pages
+
+    return user_data, pages, output_message, {"display": "none"}, new_active_page
+
+def render_insight_section(data, error=None):
+    """Render an AI result dict as labelled sections, or a notice if it didn't arrive."""
+    if data is None:
+        return dbc.Alert(f"This analysis is unavailable right now ({error}).", color="warning")
+    children = []
+    for key, value in data.items():
+        children.append(html.H6(key.replace('_', ' ').title(), className="mt-2"))
+        if isinstance(value, list):
+            children.append(html.Ul([html.Li(str(item)) for item in value]))
+        else:
+            children.append(html.P(str(value)))
+    return children
+
+@app.callback(
+    [Output('portfolio-analysis-body', 'children'),
+     Output('portfolio-analysis-stream', 'style'),
+     Output('sentiment-body', 'children')],
+    Input('ai-insights-request', 'data'),
+    background=True,
+    progress=[Output('portfolio-analysis-stream', 'children')],
+    cancel=[Input('active-page', 'data')],
+    interval=250
+)
+def stream_ai_insights(set_progress, portfolio_data):
+    """Stream the portfolio analysis field by field while sentiment runs alongside it."""
+    ai_service = get_ai_service()
+    partial = {}
+
+    def stream_analysis():
+        for key, index, value in ai_service.stream_portfolio_insights(portfolio_data or {}):
+            if index is not None:
+                partial.setdefault(key, []).append(value)
+            else:
+                partial[key] = value
+            set_progress([render_insight_section(partial)])
+        return partial
+
+    def sentiment():
+        # Shared snapshot scored once per refresh interval; no per-user LLM call
+        snapshot = sentiment_snapshot.get()
+        if snapshot is None or snapshot['sentiment'] is None:
+            raise Exception("market sentiment is still being prepared")
+        return snapshot['sentiment']
+
+    results, errors = ai_service.run_concurrently({
+        'portfolio_analysis': stream_analysis,
+        'sentiment': sentiment
+    })
+    analysis = render_insight_section(results.get('portfolio_analysis') or partial or None,
+                                      errors.get('portfolio_analysis'))
+    if partial and 'portfolio_analysis' in errors:
+        analysis = analysis + [render_insight_section(None, errors['portfolio_analysis'])]
+    return analysis, {"display": "none"}, render_insight_section(results.get('sentiment'),
+                                                                 errors.get('sentiment'))
+
+@app.callback(
+    [Output('portfolio-summary-body', 'children'),
+     Output('portfolio-charts-body', 'children'),
+     Output('portfolio-status', 'style')],
+    Input('portfolio-request', 'data'),
+    background=True,
+    progress=[Output('portfolio-status', 'children')],
+    cancel=[Input('active-page', 'data')],
+    interval=500
+)
+def load_portfolio_dashboard(set_progress, request):
+    """Fetch prices for the summary and charts off the web worker."""
+    from components import portfolio, charts
+    # The job runs in a forked process, so the user comes from the request, not session state
+    user_id = (request or {}).get('user_id', '')
+    set_progress(["Loading portfolio summary..."])
+    summary = portfolio.display_portfolio_summary(user_id)
+    set_progress(["Loading performance charts..."])
+    return summary, charts.plot_portfolio_performance(user_id), {"display": "none"}
+
+@app.callback(
+    Output('news-body', 'children'),
+    Input('news-request', 'data'),
+    background=True,
+    cancel=[Input('active-page', 'data')],
+    interval=500
+)
+def load_news_tracker(request):
+    """Build the news dashboard off the web worker."""
+    from components import news
+    return news.display_news_dashboard()
 
 # Callback to render pages with modernized layouts
 def render_page(page, user_data):
     if page == "Welcome":
         return welcome_page(user_data)
     elif page == "Portfolio Dashboard":
+        from components import portfolio
+
+        # Summary and charts fetch prices, so load_portfolio_dashboard fills them in
         return dbc.Container([
+            dcc.Store(id='portfolio-request', data={'user_id': user_data.get('user_id', '')}),
             html.H2("Portfolio Overview", className="text-primary mb-4"),
+            html.Div(id='portfolio-status', className="text-muted mb-2"),
             dbc.Row([
                 dbc.Col([
                     dbc.Card([
                         dbc.CardHeader(html.H5("Portfolio Summary")),
-                        dbc.CardBody(portfolio.display_portfolio_summary())
+                        dbc.CardBody(dbc.Spinner(color="primary"), id='portfolio-summary-body')
                     ], className="mb-4")
                 ], width=12)
             ]),
@@ -430,7 +571,7 @@ def render_page(page, user_data):
                 dbc.Col([
                     dbc.Card([
                         dbc.CardHeader(html.H5("Performance Charts")),
-                        dbc.CardBody(charts.plot_portfolio_performance())
+                        dbc.CardBody(dbc.Spinner(color="primary"), id='portfolio-charts-body')
                     ], className="mb-4")
                 ], width=12)
             ]),
@@ -450,27 +591,29 @@ def render_page(page, user_data):
             ])
         ])
     elif page == "News Tracker":
+        # The feed is filled in by load_news_tracker; one job serves every concurrent reader
         return dbc.Container([
+            dcc.Store(id='news-request', data={}),
             html.H2("Financial News Tracker", className="text-primary mb-4"),
             dbc.Card([
-                dbc.CardBody(news.display_news_dashboard())
+                dbc.CardBody(dbc.Spinner(color="primary"), id='news-body')
             ])
         ])
     elif page == "AI Insights":
         portfolio_data = user_data.get('custom_portfolio', {})
-        ai_service = AIService()
-        portfolio_analysis = ai_service.get_portfolio_insights(portfolio_data)
-        news_service = NewsService()
-        market_news = news_service.get_market_news(limit=5)
-        sentiment = ai_service.get_market_sentiment(market_news)
-        
+
+        # The analysis and sentiment are filled in by stream_ai_insights as they arrive
         return dbc.Container([
+            dcc.Store(id='ai-insights-request', data=portfolio_data),
             html.H2("AI-Powered Insights", className="text-primary mb-4"),
             dbc.Row([
                 dbc.Col([
                     dbc.Card([
                         dbc.CardHeader(html.H5("Portfolio Analysis")),
-                        dbc.CardBody(portfolio_analysis)
+                        dbc.CardBody([
+                            html.Div(dbc.Spinner(color="primary"), id='portfolio-analysis-stream'),
+                            html.Div(id='portfolio-analysis-body')
+                        ])
                     ], className="mb-4")
                 ], width=12)
             ]),
@@ -478,7 +621,7 @@ def render_page(page, user_data):
                 dbc.Col([
                     dbc.Card([
                         dbc.CardHeader(html.H5("Market Sentiment Analysis")),
-                        dbc.CardBody(sentiment)
+                        dbc.CardBody(dbc.Spinner(color="primary"), id='sentiment-body')
                     ])
                 ], width=12)
             ])
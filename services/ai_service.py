@@ -1,25 +1,123 @@
 import os
-from anthropic import Anthropic
 import json
+import time
+from concurrent.futures import ThreadPoolExecutor, TimeoutError as FutureTimeoutError
 from dotenv import load_dotenv
+from services.llm_cache import llm_cache, cache_key
+from services.goal_index import goal_index
+from services.registry import get_anthropic_client
+from utils.streaming_json import IncrementalJSONParser
+from utils.prompt_builder import build_articles_payload, build_portfolio_payload, estimate_tokens
 
 load_dotenv()
 
-anthropic_api_key = os.getenv('anthropic_api_key')
+# Token budgets for the data embedded in prompts
+SENTIMENT_TOKEN_BUDGET = int(os.getenv('sentiment_token_budget', 1500))
+PORTFOLIO_TOKEN_BUDGET = int(os.getenv('portfolio_token_budget', 1500))
+
+# Shared pool for running independent LLM/news requests side by side
+_executor = ThreadPoolExecutor(max_workers=8, thread_name_prefix="ai-service")
 
 
 class AIService:
 
-    def __init__(self):
+    def __init__(self, client=None):
         # the newest Anthropic model is "claude-3-5-sonnet-20241022" which was released October 22, 2024
-        self.client = Anthropic(api_key=anthropic_api_key)
+        # client can be any object with a compatible messages.create, e.g. a local fake for tests;
+        # by default the process-wide Anthropic client is shared
+        self.client = client or get_anthropic_client()
         self.model = "claude-3-5-sonnet-20241022"
 
-    def get_portfolio_insights(self, portfolio_data: dict) -> dict:
-        """Generate AI insights for portfolio"""
-        try:
-            prompt = f"""You are a financial advisor. Analyze this portfolio data and provide insights:
-{json.dumps(portfolio_data, indent=2)}
+    # Per-call prompt size: {name: {'calls', 'estimated_input_tokens', 'input_tokens'}}
+    token_stats = {}
+
+    @staticmethod
+    def _record_tokens(name: str, prompt: str, usage=None):
+        stats = AIService.token_stats.setdefault(
+            name, {'calls': 0, 'estimated_input_tokens': 0, 'input_tokens': 0})
+        stats['calls'] += 1
+        stats['estimated_input_tokens'] += estimate_tokens(prompt)
+        if usage is not None:
+            stats['input_tokens'] += usage.input_tokens
+
+    def _complete_json(self, prompt: str, max_tokens: int = 1000, name: str = "completion") -> dict:
+        """Send a prompt and parse the JSON reply, reusing cached replies for identical requests"""
+        key = cache_key(self.model, prompt, max_tokens)
+        cached = llm_cache.get(key)
+        if cached is not None:
+            return cached
+
+        started = time.monotonic()
+        response = self.client.messages.create(model=self.model,
+                                               messages=[{
+                                                   "role": "user",
+                                                   "content": prompt
+                                               }],
+                                               max_tokens=max_tokens)
+        result = json.loads(response.content[0].text)
+        usage = getattr(response, 'usage', None)
+        AIService._record_tokens(name, prompt, usage)
+        tokens = (usage.input_tokens + usage.output_tokens) if usage else 0
+        llm_cache.set(key, result, seconds=time.monotonic() - started, tokens=tokens)
+        return result
+
+    @staticmethod
+    def run_concurrently(tasks: dict, timeout: float = 30.0) -> tuple:
+        """Run independent zero-argument callables in parallel.
+
+        Returns (results, errors) keyed like `tasks`. A task that raises or is still
+        running when `timeout` seconds have passed lands in errors, so callers can
+        render whatever did finish.
+        """
+        futures = {name: _executor.submit(task) for name, task in tasks.items()}
+        deadline = time.monotonic() + timeout
+        results, errors = {}, {}
+        for name, future in futures.items():
+            try:
+                results[name] = future.result(timeout=max(0, deadline - time.monotonic()))
+            except FutureTimeoutError:
+                future.cancel()
+                errors[name] = f"Timed out after {timeout:g}s"
+            except Exception as e:
+                errors[name] = str(e)
+        return results, errors
+
+    def _stream_json(self, prompt: str, max_tokens: int = 1000, name: str = "completion"):
+        """Stream a prompt and yield (key, index, value) events as fields of the JSON reply complete.
+
+        A cached reply is replayed field by field without touching the network; a
+        streamed reply is cached once it has fully parsed.
+        """
+        key = cache_key(self.model, prompt, max_tokens)
+        cached = llm_cache.get(key)
+        if cached is not None:
+            for field, value in cached.items():
+                yield field, None, value
+            return
+
+        parser = IncrementalJSONParser()
+        started = time.monotonic()
+        with self.client.messages.stream(model=self.model,
+                                         messages=[{
+                                             "role": "user",
+                                             "content": prompt
+                                         }],
+                                         max_tokens=max_tokens) as stream:
+            for text in stream.text_stream:
+                yield from parser.feed(text)
+            message = stream.get_final_message()
+
+        if not parser.done:
+            raise Exception("Response ended before the JSON object was complete")
+        usage = getattr(message, 'usage', None)
+        AIService._record_tokens(name, prompt, usage)
+        tokens = (usage.input_tokens + usage.output_tokens) if usage else 0
+        llm_cache.set(key, parser.result, seconds=time.monotonic() - started, tokens=tokens)
+
+    @staticmethod
+    def _portfolio_insights_prompt(portfolio_data: dict) -> str:
+        return f"""You are a financial advisor. Analyze this portfolio data and provide insights:
+{build_portfolio_payload(portfolio_data, PORTFOLIO_TOKEN_BUDGET)}
 
 Return your analysis as a JSON object with exactly these keys:
 - summary: A string with overall portfolio assessment
@@ -28,13 +126,44 @@ Return your analysis as a JSON object with exactly these keys:
 - recommendations: An array of strings with actionable recommendations
 
 Format your response as valid JSON only, no other text."""
-            response = self.client.messages.create(model=self.model,
-                                                   messages=[{
-                                                       "role": "user",
-                                                       "content": prompt
-                                                   }],
-                                                   max_tokens=1000)
-            return json.loads(response.content[0].text)
+
+    @staticmethod
+    def _optimize_prompt(portfolio_data: dict, user_goals: str) -> str:
+        if not portfolio_data:
+            return f"""You are a financial advisor. The user has not provided any current portfolio data, but has the following investment goals:
+{user_goals}
+
+Generate a custom portfolio as a JSON object with exactly these keys:
+- optimized_holdings: an array of objects with keys 'symbol', 'quantity', and 'target_allocation'. Only include stock symbols and not crypto or savings accounts.
+- rationale: a string explaining your recommendations
+
+Format your response as valid JSON only, no additional text."""
+        return f"""You are a financial advisor and portfolio optimizer. Given the following portfolio data and the user's investment goals, optimize the portfolio to best meet the goals.
+Portfolio data:
+{build_portfolio_payload(portfolio_data, PORTFOLIO_TOKEN_BUDGET)}
+
+User Goals:
+{user_goals}
+
+Return your optimized portfolio as a JSON object with exactly these keys:
+- optimized_holdings: an array of objects with keys 'symbol', 'quantity', and 'target_allocation'
+- rationale: a string explaining the changes
+
+Format your response as valid JSON only, no additional text."""
+
+    def get_portfolio_insights(self, portfolio_data: dict) -> dict:
+        """Generate AI insights for portfolio"""
+        try:
+            return self._complete_json(self._portfolio_insights_prompt(portfolio_data),
+                                       name="portfolio_insights")
+        except Exception as e:
+            raise Exception(f"Failed to generate portfolio insights: {e}")
+
+    def stream_portfolio_insights(self, portfolio_data: dict):
+        """Yield (key, index, value) events for the portfolio insights as they arrive"""
+        try:
+            yield from self._stream_json(self._portfolio_insights_prompt(portfolio_data),
+                                         name="portfolio_insights")
         except Exception as e:
             raise Exception(f"Failed to generate portfolio insights: {e}")
 
@@ -42,7 +171,7 @@ Format your response as valid JSON only, no other text."""
         """Analyze market sentiment from news"""
         try:
             prompt = f"""You are a financial analyst. Analyze these news articles and provide market sentiment:
-{json.dumps(news_articles, indent=2)}
+{build_articles_payload(news_articles, SENTIMENT_TOKEN_BUDGET)}
 
 Return your analysis as a JSON object with exactly these keys:
 - overall_sentiment: A string that must be either "bullish", "bearish", or "neutral"
@@ -51,48 +180,51 @@ Return your analysis as a JSON object with exactly these keys:
 - market_outlook: A string with a brief market outlook
 
 Format your response as valid JSON only, no other text."""
-            response = self.client.messages.create(model=self.model,
-                                                   messages=[{
-                                                       "role": "user",
-                                                       "content": prompt
-                                                   }],
-                                                   max_tokens=1000)
-            return json.loads(response.content[0].text)
+            return self._complete_json(prompt, name="market_sentiment")
         except Exception as e:
             raise Exception(f"Failed to analyze market sentiment: {e}")
 
     def optimize_portfolio(self, portfolio_data: dict,
                            user_goals: str) -> dict:
-        """Optimize portfolio according to user stated investment goals."""
+        """Optimize portfolio according to user stated investment goals.
+
+        Without existing holdings the plan depends only on the goals, so a plan
+        generated for a sufficiently similar goal is reused instead of calling the LLM.
+        """
+        if not portfolio_data:
+            plan, _ = goal_index.lookup(user_goals)
+            if plan is not None:
+                return plan
         try:
-            if not portfolio_data:
-                prompt = f"""You are a financial advisor. The user has not provided any current portfolio data, but has the following investment goals:
-{user_goals}
-
-Generate a custom portfolio as a JSON object with exactly these keys:
-- optimized_holdings: an array of objects with keys 'symbol', 'quantity', and 'target_allocation'. Only include stock symbols and not crypto or savings accounts.
-- rationale: a string explaining your recommendations
-
-Format your response as valid JSON only, no additional text."""
-            else:
-                prompt = f"""You are a financial advisor and portfolio optimizer. Given the following portfolio data and the user's investment goals, optimize the portfolio to best meet the goals.
-Portfolio data:
-{json.dumps(portfolio_data, indent=2)}
-
-User Goals:
-{user_goals}
-
-Return your optimized portfolio as a JSON object with exactly these keys:
-- optimized_holdings: an array of objects with keys 'symbol', 'quantity', and 'target_allocation'
-- rationale: a string explaining the changes
-
-Format your response as valid JSON only, no additional text."""
-            response = self.client.messages.create(model=self.model,
-                                                   messages=[{
-                                                       "role": "user",
-                                                       "content": prompt
-                                                   }],
-                                                   max_tokens=1000)
-            return json.loads(response.content[0].text)
+            plan = self._complete_json(self._optimize_prompt(portfolio_data, user_goals),
+                                       name="optimize_portfolio")
+        except Exception as e:
+            raise Exception(f"Failed to optimize portfolio: {e}")
+        if not portfolio_data:
+            goal_index.add(user_goals, plan)
+        return plan
+
+    def stream_optimize_portfolio(self, portfolio_data: dict, user_goals: str):
+        """Streaming optimize_portfolio: yields (key, index, value) events, then returns the plan.
+
+        Use `plan = yield from ...` or read the final ('optimized_holdings', None, ...)
+        and ('rationale', None, ...) events.
+        """
+        if not portfolio_data:
+            plan, _ = goal_index.lookup(user_goals)
+            if plan is not None:
+                for field, value in plan.items():
+                    yield field, None, value
+                return plan
+        plan = {}
+        try:
+            for key, index, value in self._stream_json(self._optimize_prompt(portfolio_data, user_goals),
+                                                       name="optimize_portfolio"):
+                if index is None:
+                    plan[key] = value
+                yield key, index, value
         except Exception as e:
-            raise Exception(f"Failed to optimize portfolio: {e}")
\ No newline at end of file
+            raise Exception(f"Failed to optimize portfolio: {e}")
+        if not portfolio_data:
+            goal_index.add(user_goals, plan)
+        return plan
@@ -0,0 +1,174 @@
+from datetime import datetime
+
+import numpy as np
+import pandas as pd
+from scipy import sparse
+
+from services.database import get_connection
+from services.stock_service import StockService
+from utils.analytics import TRADING_DAYS, max_drawdowns, returns_matrix
+from utils.data_utils import calculate_returns
+
+BENCHMARK = '^GSPC'
+
+SUMMARY_COLUMNS = [
+    'total_value', 'daily_change', 'daily_return', 'ytd_return', 'volatility',
+    'sharpe', 'max_drawdown', 'beta', 'diversification_score'
+]
+
+
+def load_all_positions(cursor) -> pd.DataFrame:
+    """Load every user's holdings with a single query"""
+    cursor.execute("""
+        SELECT user_id, symbol, SUM(quantity)
+        FROM optimized_portfolio
+        GROUP BY user_id, symbol
+    """)
+    return pd.DataFrame(cursor.fetchall(), columns=['user_id', 'symbol', 'quantity'])
+
+
+def build_quantity_matrix(positions: pd.DataFrame):
+    """Return (users, symbols, Q) where Q is a sparse users × symbols quantity matrix"""
+    user_codes, users = pd.factorize(positions['user_id'])
+    symbol_codes, symbols = pd.factorize(positions['symbol'])
+    Q = sparse.csr_matrix(
+        (positions['quantity'].to_numpy(dtype=float), (user_codes, symbol_codes)),
+        shape=(len(users), len(symbols)))
+    return list(users), list(symbols), Q
+
+
+def compute_batch_metrics(Q, symbols: list, prices: pd.Series, prev_close: pd.Series,
+                          returns: pd.DataFrame, benchmark: pd.Series = None,
+                          risk_free_rate: float = 0.0) -> pd.DataFrame:
+    """Compute value, daily change and risk metrics for every portfolio with matrix ops.
+
+    Args:
+        Q: sparse users × symbols quantity matrix.
+        symbols: column labels of Q.
+        prices / prev_close: latest and previous close per symbol.
+        returns: symbols × dates daily returns covering `symbols`.
+        benchmark: daily benchmark returns indexed by date.
+    """
+    p = prices.reindex(symbols).fillna(0).to_numpy(dtype=float)
+    prev = prev_close.reindex(symbols).fillna(0).to_numpy(dtype=float)
+    R = returns.reindex(symbols).fillna(0).to_numpy(dtype=float)
+
+    total_value = Q @ p
+    daily_change = Q @ (p - prev)
+    safe_total = np.where(total_value > 0, total_value, 1)
+
+    # Row-normalised weights stay sparse: diag(1 / value) · Q · diag(price)
+    W = sparse.diags(1 / safe_total) @ Q @ sparse.diags(p)
+    W = W.tocsr()
+
+    # Like compute_portfolio_analytics, symbols without history drop out of the
+    # return series and the remaining holdings are reweighted to sum to one
+    has_history = np.asarray(pd.Index(symbols).isin(returns.index), dtype=float)
+    covered = Q @ sparse.diags(p * has_history)
+    covered_value = np.asarray(covered.sum(axis=1)).ravel()
+    W_returns = sparse.diags(1 / np.where(covered_value > 0, covered_value, 1)) @ covered
+
+    portfolio_returns = np.asarray(W_returns @ R)              # users × dates
+    cumulative = np.cumprod(1 + portfolio_returns, axis=1)
+
+    dates = returns.columns
+    ytd_mask = np.asarray(dates.year == dates[-1].year)
+    ytd_return = np.prod(1 + portfolio_returns[:, ytd_mask], axis=1) - 1
+
+    # Sample std of each portfolio's return series equals sqrt(w' Σ w) without a
+    # dense users × symbols product
+    if portfolio_returns.shape[1] > 1:
+        volatility = portfolio_returns.std(axis=1, ddof=1) * np.sqrt(TRADING_DAYS)
+    else:
+        volatility = np.zeros(len(total_value))
+    mean_annual = portfolio_returns.mean(axis=1) * TRADING_DAYS
+    sharpe = np.divide(mean_annual - risk_free_rate, volatility,
+                       out=np.zeros_like(volatility), where=volatility > 0)
+
+    beta = np.full(len(total_value), np.nan)
+    if benchmark is not None:
+        b = benchmark.reindex(dates).fillna(0).to_numpy(dtype=float)
+        b_centered = b - b.mean()
+        b_var = b_centered @ b_centered
+        if b_var > 0:
+            p_centered = portfolio_returns - portfolio_returns.mean(axis=1, keepdims=True)
+            beta = (p_centered @ b_centered) / b_var
+
+    hhi = np.asarray(W.multiply(W).sum(axis=1)).ravel()
+
+    return pd.DataFrame({
+        'total_value': total_value,
+        'daily_change': daily_change,
+        'daily_return': np.divide(daily_change, safe_total),
+        'ytd_return': ytd_return,
+        'volatility': volatility,
+        'sharpe': sharpe,
+        'max_drawdown': max_drawdowns(cumulative),
+        'beta': beta,
+        'diversification_score': 1 - hhi
+    })
+
+
+def write_summaries(cursor, users: list, metrics: pd.DataFrame):
+    """Upsert one summary row per user"""
+    now = datetime.now()
+    rows = [
+        (user_id, *[None if pd.isna(v) else float(v) for v in values], now)
+        for user_id, values in zip(users, metrics[SUMMARY_COLUMNS].itertuples(index=False))
+    ]
+    columns = ', '.join(['user_id'] + SUMMARY_COLUMNS + ['updated_at'])
+    placeholders = ', '.join(['%s'] * (len(SUMMARY_COLUMNS) + 2))
+    updates = ', '.join(f"{c} = VALUES({c})" for c in SUMMARY_COLUMNS + ['updated_at'])
+    cursor.executemany(
+        f"INSERT INTO portfolio_summary ({columns}) VALUES ({placeholders}) "
+        f"ON DUPLICATE KEY UPDATE {updates}",
+        rows)
+
+
+def run_batch_analytics(period: str = "1y") -> int:
+    """Recompute every user's portfolio summary in one pass. Returns the number of users."""
+    with get_connection() as connection:
+        cursor = connection.cursor()
+        positions = load_all_positions(cursor)
+        if positions.empty:
+            cursor.close()
+            return 0
+        users, symbols, Q = build_quantity_matrix(positions)
+
+        histories = StockService.get_many_histories(symbols + [BENCHMARK], period=period)
+        benchmark = histories.pop(BENCHMARK, None)
+        closes = pd.DataFrame({s: f['Close'] for s, f in histories.items() if not f.empty})
+        returns = returns_matrix(closes)
+        if returns.empty or len(returns.columns) == 0:
+            print("No price history available; portfolio summaries left unchanged")
+            cursor.close()
+            return 0
+        quotes = StockService.get_quotes(symbols)
+        prices = pd.Series({s: q['price'] for s, q in quotes.items()})
+        prev_close = pd.Series({s: q['previous_close'] for s, q in quotes.items()})
+
+        metrics = compute_batch_metrics(
+            Q, symbols, prices, prev_close, returns,
+            benchmark=calculate_returns(benchmark) if benchmark is not None else None)
+        write_summaries(cursor, users, metrics)
+        connection.commit()
+        cursor.close()
+    return len(users)
+
+
+def get_portfolio_summary(user_id: str) -> dict:
+    """Read a user's precomputed summary, or {} if the batch job hasn't covered them yet.
+
+    Portfolio writes delete the user's row, so a summary always matches current holdings.
+    """
+    columns = ', '.join(SUMMARY_COLUMNS + ['updated_at'])
+    with get_connection() as connection:
+        cursor = connection.cursor()
+        cursor.execute(f"SELECT {columns} FROM portfolio_summary WHERE user_id = %s", (user_id,))
+        row = cursor.fetchone()
+        cursor.close()
+    return dict(zip(SUMMARY_COLUMNS + ['updated_at'], row)) if row else {}
+
+
+if __name__ == '__main__':
+    print(f"Updated portfolio summaries for {run_batch_analytics()} users")
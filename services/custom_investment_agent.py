@@ -1,7 +1,7 @@
 import json
-from smolagents import tool, CodeAgent, HfApiModel
 
-@tool
+_agent = None
+
 def merge_navigation_pages(current_pages_json: str, new_pages_json: str) -> str:
     """
     Merge current navigation pages with new pages and return the updated list as a JSON array.
@@ -42,10 +42,15 @@ def merge_navigation_pages(current_pages_json: str, new_pages_json: str) -> str:
         # On error, just return the original current_pages JSON
         return current_pages_json
 
-model = HfApiModel()
-
-# Create the agent, passing in the tool. The agent can then call this tool as needed.
-agent = CodeAgent(tools=[merge_navigation_pages], model=model)
+def get_agent():
+    """Build the CodeAgent on first use; importing this module stays cheap."""
+    global _agent
+    if _agent is None:
+        from smolagents import tool, CodeAgent, HfApiModel
+        model = HfApiModel()
+        # Create the agent, passing in the tool. The agent can then call this tool as needed.
+        _agent = CodeAgent(tools=[tool(merge_navigation_pages)], model=model)
+    return _agent
 
 def get_additional_pages(investment_goals: str, current_pages: list) -> list:
     """
@@ -92,7 +97,7 @@ Steps to follow:
 """
 
     # Run the agent with the above instructions
-    raw_response = agent.run(prompt)
+    raw_response = get_agent().run(prompt)
 
     # The agent's final output should be a JSON array of pages. Let's parse it:
     try:
@@ -1,20 +1,51 @@
-import os
-from openai import OpenAI
+import ast
+import json
 from dotenv import load_dotenv
+from services.registry import get_openai_client
+from services.page_router import page_router, merge_pages, EXTRA_PAGES
 
 load_dotenv()
 
-def get_additional_pages(investment_goals: str, current_pages: list) -> list:
-    client = OpenAI(api_key=os.getenv("openai_api_key"))
+def _parse_page_list(text: str) -> list:
+    """Parse the LLM's list reply; accepts JSON or Python list syntax"""
+    text = (text or '').strip().strip('`')
+    start, end = text.find('['), text.rfind(']')
+    if start == -1 or end == -1:
+        return []
+    snippet = text[start:end + 1]
+    for parse in (json.loads, ast.literal_eval):
+        try:
+            pages = parse(snippet)
+            return [p for p in pages if isinstance(p, str)]
+        except Exception:
+            continue
+    return []
+
+def llm_additional_pages(investment_goals: str, current_pages: list) -> list:
+    client = get_openai_client()
 
     response = client.chat.completions.create(
         model="gpt-4o-mini",
         messages=[{"role": "user", "content": f"""You are a financial advisor. Based on the following investment goals and current pages, 
-                   return a list of additional pages that are relevant to the investment goals from the following list: ["College Savings Account", "529 Plan", "Crypto Investments", "Mortgage Planning", "Estate Planning", "Life Insurance"] 
+                   return a list of additional pages that are relevant to the investment goals from the following list: {json.dumps(EXTRA_PAGES)} 
                    Investment Goals: {investment_goals}
                    Current Pages: {current_pages}
                     It is imperative that you return your response like a python list [page1, page2, page3] with no other text.
                    """}]
     )
 
-    return response.choices[0].message.content
\ No newline at end of file
+    return _parse_page_list(response.choices[0].message.content)
+
+def get_additional_pages(investment_goals: str, current_pages: list) -> list:
+    """Return current_pages plus the extra pages relevant to the goals.
+
+    The local router answers almost every request; the LLM is only consulted when
+    the router is unsure, and its answer is validated against the allowed pages.
+    """
+    pages, confident = page_router.route(investment_goals)
+    if not confident:
+        try:
+            pages = pages + llm_additional_pages(investment_goals, current_pages)
+        except Exception as e:
+            print("Page routing LLM fallback failed:", e)
+    return merge_pages(current_pages, pages)
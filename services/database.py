@@ -0,0 +1,236 @@
+import os
+import threading
+import time
+from collections import deque
+from contextlib import contextmanager
+
+
+def db_config() -> dict:
+    """SingleStore connection settings from the environment"""
+    return {
+        "host": os.getenv('host'),
+        "port": os.getenv('port'),
+        "user": os.getenv('user'),
+        "password": os.getenv('password'),
+        "database": os.getenv('database')
+    }
+
+
+def _singlestore_connect():
+    import singlestoredb as s2
+    return s2.connect(**db_config())
+
+
+class _PooledConnection:
+    __slots__ = ('raw', 'created_at', 'last_used')
+
+    def __init__(self, raw):
+        self.raw = raw
+        self.created_at = time.monotonic()
+        self.last_used = self.created_at
+
+
+class ConnectionPool:
+    """Bounded, thread-safe pool of DB-API connections.
+
+    `connect` is any zero-argument factory returning a DB-API connection, so tests
+    can point the pool at a local MySQL-protocol server or sqlite3. Connections older
+    than `max_age_seconds` are recycled, and connections idle for longer than
+    `health_check_after` seconds are pinged before being handed out.
+    """
+
+    def __init__(self, connect, max_size: int = 10, max_age_seconds: float = 1800,
+                 health_check_after: float = 30, checkout_timeout: float = 30):
+        self._connect = connect
+        self.max_size = max_size
+        self.max_age_seconds = max_age_seconds
+        self.health_check_after = health_check_after
+        self.checkout_timeout = checkout_timeout
+        self._idle = deque()
+        self._size = 0
+        self._cond = threading.Condition()
+        self._in_use = 0
+        self._waiting = 0
+        self._checkouts = 0
+        self._checkout_seconds = 0.0
+        self._max_checkout_seconds = 0.0
+        self._recycled = 0
+
+    def _is_usable(self, conn: _PooledConnection) -> bool:
+        now = time.monotonic()
+        if now - conn.created_at > self.max_age_seconds:
+            return False
+        if now - conn.last_used > self.health_check_after:
+            try:
+                cursor = conn.raw.cursor()
+                cursor.execute("SELECT 1")
+                cursor.fetchall()
+                cursor.close()
+            except Exception:
+                return False
+        return True
+
+    def _discard(self, conn: _PooledConnection):
+        try:
+            conn.raw.close()
+        except Exception:
+            pass
+        with self._cond:
+            self._size -= 1
+            self._recycled += 1
+            self._cond.notify()
+
+    def _checkout(self) -> _PooledConnection:
+        started = time.monotonic()
+        deadline = started + self.checkout_timeout
+        while True:
+            conn = None
+            create = False
+            with self._cond:
+                if not self._idle and self._size >= self.max_size:
+                    self._waiting += 1
+                    try:
+                        while not self._idle and self._size >= self.max_size:
+                            remaining = deadline - time.monotonic()
+                            if remaining <= 0:
+                                raise Exception(
+                                    f"Timed out waiting for a database connection ({self.max_size} in use)")
+                            self._cond.wait(remaining)
+                    finally:
+                        self._waiting -= 1
+                if self._idle:
+                    conn = self._idle.pop()
+                else:
+                    self._size += 1
+                    create = True
+
+            if create:
+                try:
+                    conn = _PooledConnection(self._connect())
+                except Exception:
+                    with self._cond:
+                        self._size -= 1
+                        self._cond.notify()
+                    raise
+            elif not self._is_usable(conn):
+                self._discard(conn)
+                continue
+
+            elapsed = time.monotonic() - started
+            with self._cond:
+                self._in_use += 1
+                self._checkouts += 1
+                self._checkout_seconds += elapsed
+                self._max_checkout_seconds = max(self._max_checkout_seconds, elapsed)
+            return conn
+
+    def _release(self, conn: _PooledConnection, broken: bool = False):
+        with self._cond:
+            self._in_use -= 1
+        if broken:
+            self._discard(conn)
+            return
+        conn.last_used = time.monotonic()
+        with self._cond:
+            self._idle.append(conn)
+            self._cond.notify()
+
+    @contextmanager
+    def connection(self):
+        """Check out a connection and return it to the pool afterwards.
+
+        Anything not committed by the caller is rolled back, so the next borrower
+        never inherits an open transaction or a stale read snapshot.
+        """
+        conn = self._checkout()
+        broken = False
+        try:
+            yield conn.raw
+        finally:
+            try:
+                conn.raw.rollback()
+            except Exception:
+                broken = True
+            self._release(conn, broken)
+
+    def forget_connections(self):
+        """Drop every connection without closing it, for use in a forked child.
+
+        The sockets belong to the parent process; closing them here would send a
+        QUIT over a connection the parent is still using. Locks are recreated in
+        case another thread held them at fork time.
+        """
+        self._cond = threading.Condition()
+        self._idle = deque()
+        self._size = 0
+        self._in_use = 0
+        self._waiting = 0
+
+    def metrics(self) -> dict:
+        """Pool occupancy and checkout latency counters"""
+        with self._cond:
+            return {
+                'size': self._size,
+                'max_size': self.max_size,
+                'in_use': self._in_use,
+                'idle': len(self._idle),
+                'waiting': self._waiting,
+                'checkouts': self._checkouts,
+                'avg_checkout_ms': (self._checkout_seconds / self._checkouts * 1000
+                                    if self._checkouts else 0),
+                'max_checkout_ms': self._max_checkout_seconds * 1000,
+                'recycled': self._recycled
+            }
+
+    def close(self):
+        """Close all idle connections"""
+        with self._cond:
+            idle, self._idle = list(self._idle), deque()
+            self._size -= len(idle)
+        for conn in idle:
+            try:
+                conn.raw.close()
+            except Exception:
+                pass
+
+
+_pool = None
+_pool_lock = threading.Lock()
+
+
+def get_pool() -> ConnectionPool:
+    """Process-wide pool, created on first use"""
+    global _pool
+    with _pool_lock:
+        if _pool is None:
+            _pool = ConnectionPool(
+                _singlestore_connect,
+                max_size=int(os.getenv('db_pool_size', 10)),
+                max_age_seconds=float(os.getenv('db_pool_max_age', 1800)))
+        return _pool
+
+
+def configure_pool(connect, **kwargs) -> ConnectionPool:
+    """Replace the process-wide pool, e.g. with a sqlite3 factory for tests"""
+    global _pool
+    with _pool_lock:
+        if _pool is not None:
+            _pool.close()
+        _pool = ConnectionPool(connect, **kwargs)
+        return _pool
+
+
+def _reset_after_fork():
+    global _pool_lock
+    _pool_lock = threading.Lock()
+    if _pool is not None:
+        _pool.forget_connections()
+
+
+# Background jobs fork from a worker whose pool may already hold open connections
+os.register_at_fork(after_in_child=_reset_after_fork)
+
+
+def get_connection():
+    """Shortcut for `get_pool().connection()`"""
+    return get_pool().connection()
@@ -0,0 +1,290 @@
+import fcntl
+import hashlib
+import json
+import os
+import re
+import tempfile
+import threading
+
+import numpy as np
+from scipy import sparse
+
+STOPWORDS = {
+    'a', 'an', 'the', 'and', 'or', 'for', 'to', 'of', 'in', 'on', 'my', 'our', 'i', 'we',
+    'me', 'us', 'want', 'would', 'like', 'need', 'plan', 'planning', 'some', 'with', 'be',
+    'is', 'are', 'am', 'it', 'that', 'this', 'so', 'can', 'get', 'help', 'please', 'also',
+    'etc', 'money', 'goal', 'goals', 'invest', 'investing', 'investment', 'investments'
+}
+
+SUFFIXES = ('ments', 'ment', 'ings', 'ing', 'ions', 'ion', 'ies', 'ers', 'er', 'ed', 'es', 's')
+
+N_FEATURES = 1 << 14
+
+# Goals are only treated as the same goal when these agree exactly: similar wording
+# says nothing about "5 years" versus "30 years" or "avoid tech" versus "with tech"
+_NUMBER_RE = re.compile(r"\d+(?:[.,]\d+)*[kmb%]?")
+_NEGATION_RE = re.compile(r"\b(?:avoid\w*|no|not|none|never|without|exclud\w*|except|"
+                          r"(?:don|doesn|didn|won|can|shouldn)'?t)\b")
+
+
+def _stem(word: str) -> str:
+    for suffix in SUFFIXES:
+        if word.endswith(suffix) and len(word) - len(suffix) >= 3:
+            word = word[:-len(suffix)]
+            break
+    if word.endswith('e') and len(word) >= 4:
+        word = word[:-1]
+    return word
+
+
+def normalize_goal(text: str) -> list:
+    """Lowercase, drop punctuation and filler words, and stem what is left"""
+    words = re.findall(r"[a-z0-9]+", (text or '').lower())
+    return [_stem(w) for w in words if w not in STOPWORDS]
+
+
+def goal_constraints(text: str) -> tuple:
+    """Numbers and negation words in a goal, which a reused plan must match exactly"""
+    text = (text or '').lower().replace('\u2019', "'")
+    numbers = sorted(number.replace(',', '') for number in _NUMBER_RE.findall(text))
+    negations = sorted(negation.replace("'", '') for negation in _NEGATION_RE.findall(text))
+    return tuple(numbers), tuple(negations)
+
+
+def _features(terms: list) -> list:
+    """Word unigrams plus character trigrams, so 'retirement savings' and 'save for retirement' overlap"""
+    features = list(terms)
+    for term in terms:
+        padded = f"#{term}#"
+        features.extend(padded[i:i + 3] for i in range(len(padded) - 2))
+    return features
+
+
+def _bucket(feature: str) -> int:
+    return int.from_bytes(hashlib.blake2b(feature.encode(), digest_size=4).digest(), 'little') % N_FEATURES
+
+
+class GoalIndex:
+    """Nearest-neighbour index over investment goals using hashed TF-IDF vectors.
+
+    Runs entirely offline. Vectors are weighted with the document frequencies seen
+    at insert time, L2-normalised and kept as rows of a sparse CSR matrix, so a
+    lookup is a single sparse matrix-vector product. A cached plan is only reused
+    when the goals also share the same numbers and negation words. Row buffers grow by doubling,
+    so an insert appends in place instead of copying the matrix.
+
+    With a `path`, entries are also appended to a JSON-lines file and picked up by
+    every process using the same file, e.g. forked background-callback workers.
+    Each process reads only what was appended since its last sync; `start()` keeps
+    a long-lived process in sync so the workers it forks inherit a loaded index.
+    The file is compacted to the newest `max_entries` once it holds twice as many.
+    """
+
+    def __init__(self, threshold: float = 0.85, max_entries: int = 10000, path: str = None):
+        self.threshold = threshold
+        self.max_entries = max_entries
+        self.path = path
+        self._lock = threading.Lock()
+        self._stop = threading.Event()
+        self._thread = None
+        self.hits = 0
+        self.misses = 0
+        self._reset()
+
+    def _reset(self):
+        self._offset = 0
+        self._inode = None
+        self._file_entries = 0
+        self._doc_freq = np.zeros(N_FEATURES, dtype=np.float32)
+        self._n_docs = 0
+        self._indptr = np.zeros(1, dtype=np.int64)
+        self._indices = np.zeros(0, dtype=np.int32)
+        self._data = np.zeros(0, dtype=np.float32)
+        self._nnz = 0
+        self._plans = []
+        self._goals = []
+        self._constraints = []
+
+    def _counts(self, goal: str) -> np.ndarray:
+        counts = np.zeros(N_FEATURES, dtype=np.float32)
+        for feature in _features(normalize_goal(goal)):
+            counts[_bucket(feature)] += 1
+        return counts
+
+    def _vectorize(self, counts: np.ndarray) -> np.ndarray:
+        idf = np.log((1 + self._n_docs) / (1 + self._doc_freq)) + 1
+        vector = np.log1p(counts) * idf
+        norm = np.linalg.norm(vector)
+        return vector / norm if norm > 0 else vector
+
+    def _sync(self):
+        """Load entries other processes appended to the shared file (caller holds the lock)"""
+        if not self.path or not os.path.exists(self.path):
+            return
+        with open(self.path) as f:
+            inode = os.fstat(f.fileno()).st_ino
+            if self._inode is not None and inode != self._inode:
+                self._reset()  # compacted by another process; reload from the start
+            self._inode = inode
+            f.seek(self._offset)
+            lines = f.readlines()
+        for line in lines:
+            if not line.endswith('\n'):
+                break  # partially written; read it next time
+            self._offset += len(line.encode())
+            self._file_entries += 1
+            entry = json.loads(line)
+            self._insert(entry['goal'], entry['plan'], self._counts(entry['goal']))
+
+    def _compact(self):
+        """Rewrite the shared file with its newest max_entries lines (caller holds the file lock)"""
+        with open(self.path) as f:
+            lines = [line for line in f if line.endswith('\n')][-self.max_entries:]
+        fd, tmp_path = tempfile.mkstemp(dir=os.path.dirname(self.path) or '.', suffix='.tmp')
+        with os.fdopen(fd, 'w') as f:
+            f.writelines(lines)
+        os.replace(tmp_path, self.path)
+
+    @staticmethod
+    def _grow(buffer: np.ndarray, needed: int) -> np.ndarray:
+        if needed <= len(buffer):
+            return buffer
+        grown = np.zeros(max(needed, 2 * len(buffer)), dtype=buffer.dtype)
+        grown[:len(buffer)] = buffer
+        return grown
+
+    def _insert(self, goal: str, plan: dict, counts: np.ndarray):
+        self._doc_freq += counts > 0
+        self._n_docs += 1
+        vector = self._vectorize(counts)
+        columns = np.flatnonzero(vector)
+        rows = len(self._plans)
+        end = self._nnz + len(columns)
+        self._indices = self._grow(self._indices, end)
+        self._data = self._grow(self._data, end)
+        self._indptr = self._grow(self._indptr, rows + 2)
+        self._indices[self._nnz:end] = columns
+        self._data[self._nnz:end] = vector[columns]
+        self._nnz = end
+        self._indptr[rows + 1] = end
+        self._plans.append(plan)
+        self._goals.append(goal)
+        self._constraints.append(goal_constraints(goal))
+        # Evict the oldest quarter at once so trimming stays amortised
+        if len(self._plans) > self.max_entries + self.max_entries // 4:
+            self._evict(len(self._plans) - self.max_entries)
+
+    def _evict(self, n: int):
+        start = self._indptr[n]
+        rows = len(self._plans)
+        self._indices = self._indices[start:self._nnz].copy()
+        self._data = self._data[start:self._nnz].copy()
+        self._indptr = self._indptr[n:rows + 1] - start
+        self._nnz -= start
+        self._plans = self._plans[n:]
+        self._goals = self._goals[n:]
+        self._constraints = self._constraints[n:]
+
+    def _matrix(self) -> sparse.csr_matrix:
+        rows = len(self._plans)
+        return sparse.csr_matrix(
+            (self._data[:self._nnz], self._indices[:self._nnz], self._indptr[:rows + 1]),
+            shape=(rows, N_FEATURES), copy=False)
+
+    def lookup(self, goal: str):
+        """Return (plan, similarity) of the closest cached goal within threshold, else (None, score)"""
+        counts = self._counts(goal)
+        constraints = goal_constraints(goal)
+        with self._lock:
+            self._sync()
+            if not self._plans or not counts.any():
+                self.misses += 1
+                return None, 0.0
+            scores = self._matrix() @ self._vectorize(counts)
+            scores[[existing != constraints for existing in self._constraints]] = 0.0
+            best = int(np.argmax(scores))
+            score = float(scores[best])
+            if score >= self.threshold:
+                self.hits += 1
+                return self._plans[best], score
+            self.misses += 1
+            return None, score
+
+    def add(self, goal: str, plan: dict):
+        counts = self._counts(goal)
+        if not counts.any():
+            return
+        with self._lock:
+            if not self.path:
+                self._insert(goal, plan, counts)
+                return
+            # Append, then sync so this entry is loaded exactly once like any other
+            with open(self.path + '.lock', 'w') as lock_file:
+                fcntl.flock(lock_file, fcntl.LOCK_EX)
+                try:
+                    with open(self.path, 'a') as f:
+                        f.write(json.dumps({'goal': goal, 'plan': plan}) + '\n')
+                    self._sync()
+                    if self._file_entries > 2 * self.max_entries:
+                        self._compact()
+                        self._sync()
+                finally:
+                    fcntl.flock(lock_file, fcntl.LOCK_UN)
+
+    def sync(self):
+        """Load entries appended to the shared file since the last sync"""
+        with self._lock:
+            self._sync()
+
+    def start(self, interval_seconds: float = 60):
+        """Keep this process's copy loaded in the background, once per process"""
+        if not self.path:
+            return
+        with self._lock:
+            if self._thread is not None and self._thread.is_alive():
+                return
+            self._stop.clear()
+            self._thread = threading.Thread(target=self._run, args=(interval_seconds,),
+                                            name="goal-index-sync", daemon=True)
+            self._thread.start()
+
+    def stop(self):
+        self._stop.set()
+
+    def _run(self, interval_seconds: float):
+        while not self._stop.is_set():
+            try:
+                self.sync()
+            except Exception as e:
+                print(f"Failed to sync goal index: {e}")
+            self._stop.wait(interval_seconds)
+
+    def stats(self) -> dict:
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                'entries': len(self._plans),
+                'hits': self.hits,
+                'misses': self.misses,
+                'hit_rate': self.hits / lookups if lookups else 0
+            }
+
+
+def _lock_before_fork():
+    # Fork only between syncs, so the child never inherits a half-inserted entry
+    goal_index._lock.acquire()
+
+
+def _reset_after_fork():
+    goal_index._lock = threading.Lock()
+    goal_index._stop = threading.Event()
+    goal_index._thread = None
+
+
+goal_index = GoalIndex(threshold=float(os.getenv('goal_similarity_threshold', 0.85)),
+                       path=os.getenv('goal_index_path'))
+
+# Plan jobs fork from a worker whose sync thread may be holding the lock
+os.register_at_fork(before=_lock_before_fork,
+                    after_in_parent=lambda: goal_index._lock.release(),
+                    after_in_child=_reset_after_fork)
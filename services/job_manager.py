@@ -0,0 +1,61 @@
+import diskcache
+from dash import DiskcacheManager
+
+
+class DedupingDiskcacheManager(DiskcacheManager):
+    """Diskcache background-callback manager that runs identical jobs only once.
+
+    Dash keys a background job by the callback and its arguments. When a job with
+    the same key is already running, later callers subscribe to it instead of
+    spawning another process. Results are not memoized: the first reader moves a
+    finished result under the job's own key for `expire` seconds so the other
+    subscribers can read it, and the next trigger with the same arguments starts
+    a fresh job. A cancelled subscriber only stops the job once no one else is
+    waiting on it.
+    """
+
+    def __init__(self, cache: diskcache.Cache, expire: float = 60):
+        super().__init__(cache, expire=expire)
+
+    def call_job_fn(self, key, job_fn, *args, **kwargs):
+        with diskcache.Lock(self.handle, f"job-lock-{key}", expire=60):
+            job = self.handle.get(f"job-inflight-{key}")
+            # Also join a job that just finished but whose result nobody has read yet
+            if job is not None and (self.job_running(job) or key in self.handle):
+                self.handle.incr(f"job-subscribers-{job}", default=1)
+                return job
+            # Anything left under the key belongs to an earlier run
+            self.clear_cache_entry(key)
+            self.clear_cache_entry(self._make_progress_key(key))
+            job = super().call_job_fn(key, job_fn, *args, **kwargs)
+            self.handle.delete(f"job-result-{job}")
+            self.handle.set(f"job-inflight-{key}", job, expire=self.expire)
+            self.handle.set(f"job-subscribers-{job}", 1, expire=self.expire)
+            return job
+
+    def get_progress(self, key):
+        # Left in place so every subscriber sees it; each update overwrites it
+        return self.handle.get(self._make_progress_key(key))
+
+    def get_result(self, key, job):
+        result_key = f"job-result-{job}"
+        with self.handle.transact():
+            result = self.handle.get(result_key, self.UNDEFINED) if job else self.UNDEFINED
+            if result is self.UNDEFINED:
+                result = self.handle.get(key, self.UNDEFINED)
+                if result is self.UNDEFINED:
+                    return self.UNDEFINED
+                self.handle.set(result_key, result, expire=self.expire)
+                self.clear_cache_entry(key)
+                self.clear_cache_entry(self._make_progress_key(key))
+        self.terminate_job(job)
+        return result
+
+    def terminate_job(self, job):
+        if job is None:
+            return
+        remaining = self.handle.decr(f"job-subscribers-{job}", default=1)
+        if remaining > 0 and self.job_running(job):
+            return
+        self.handle.delete(f"job-subscribers-{job}")
+        super().terminate_job(job)
@@ -0,0 +1,159 @@
+import hashlib
+import json
+import os
+import sqlite3
+import threading
+import time
+from collections import OrderedDict
+
+
+def cache_key(model: str, prompt: str, max_tokens: int) -> str:
+    """Content address for an LLM request"""
+    payload = json.dumps([model, prompt, max_tokens], ensure_ascii=False)
+    return hashlib.sha256(payload.encode('utf-8')).hexdigest()
+
+
+class MemoryBackend:
+    def __init__(self, max_entries: int = 1000):
+        self.max_entries = max_entries
+        self._entries = OrderedDict()  # key -> (value, expires_at)
+        self._lock = threading.Lock()
+
+    def get(self, key: str):
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                return None
+            if entry[1] < time.time():
+                del self._entries[key]
+                return None
+            self._entries.move_to_end(key)
+            return entry[0]
+
+    def set(self, key: str, value: str, ttl: float):
+        with self._lock:
+            self._entries[key] = (value, time.time() + ttl)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+
+
+class SQLiteBackend:
+    """On-disk backend; survives restarts and is shared by workers on the host"""
+
+    def __init__(self, path: str, max_entries: int = 10000):
+        self.path = path
+        self.max_entries = max_entries
+        self._local = threading.local()
+        conn = self._conn()
+        conn.execute("""
+            CREATE TABLE IF NOT EXISTS llm_cache (
+                key TEXT PRIMARY KEY,
+                value TEXT NOT NULL,
+                expires_at REAL NOT NULL,
+                last_access REAL NOT NULL
+            )
+        """)
+        conn.execute("CREATE INDEX IF NOT EXISTS llm_cache_last_access ON llm_cache (last_access)")
+        conn.commit()
+
+    def _conn(self) -> sqlite3.Connection:
+        # Keyed by pid as well as thread: a connection inherited across fork() must not be used
+        conn = getattr(self._local, 'conn', None)
+        if conn is None or self._local.pid != os.getpid():
+            conn = sqlite3.connect(self.path, timeout=10)
+            conn.execute("PRAGMA journal_mode=WAL")
+            self._local.conn = conn
+            self._local.pid = os.getpid()
+        return conn
+
+    def get(self, key: str):
+        conn = self._conn()
+        now = time.time()
+        row = conn.execute("SELECT value, expires_at FROM llm_cache WHERE key = ?", (key,)).fetchone()
+        if row is None:
+            return None
+        if row[1] < now:
+            conn.execute("DELETE FROM llm_cache WHERE key = ?", (key,))
+            conn.commit()
+            return None
+        conn.execute("UPDATE llm_cache SET last_access = ? WHERE key = ?", (now, key))
+        conn.commit()
+        return row[0]
+
+    def set(self, key: str, value: str, ttl: float):
+        conn = self._conn()
+        now = time.time()
+        conn.execute("INSERT OR REPLACE INTO llm_cache (key, value, expires_at, last_access) VALUES (?, ?, ?, ?)",
+                     (key, value, now + ttl, now))
+        conn.execute("""
+            DELETE FROM llm_cache WHERE key IN (
+                SELECT key FROM llm_cache ORDER BY last_access DESC LIMIT -1 OFFSET ?
+            )
+        """, (self.max_entries,))
+        conn.commit()
+
+
+class LLMCache:
+    """Response cache for LLM calls keyed by hash(model, prompt, max_tokens).
+
+    Stores the parsed JSON result. Besides hit/miss counts it tracks how much
+    latency and how many tokens the hits avoided, based on what the misses cost.
+    """
+
+    def __init__(self, backend, ttl_seconds: float = 3600):
+        self.backend = backend
+        self.ttl_seconds = ttl_seconds
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        self.miss_seconds = 0.0
+        self.miss_tokens = 0
+        self.saved_seconds = 0.0
+        self.saved_tokens = 0
+
+    def get(self, key: str):
+        raw = self.backend.get(key)
+        if raw is None:
+            with self._lock:
+                self.misses += 1
+            return None
+        entry = json.loads(raw)
+        with self._lock:
+            self.hits += 1
+            self.saved_seconds += entry.get('seconds', 0)
+            self.saved_tokens += entry.get('tokens', 0)
+        return entry['result']
+
+    def set(self, key: str, result, seconds: float = 0.0, tokens: int = 0):
+        with self._lock:
+            self.miss_seconds += seconds
+            self.miss_tokens += tokens
+        self.backend.set(key, json.dumps({'result': result, 'seconds': seconds, 'tokens': tokens}),
+                         self.ttl_seconds)
+
+    def stats(self) -> dict:
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                'hits': self.hits,
+                'misses': self.misses,
+                'hit_rate': self.hits / lookups if lookups else 0,
+                'llm_seconds_spent': self.miss_seconds,
+                'llm_seconds_saved': self.saved_seconds,
+                'tokens_spent': self.miss_tokens,
+                'tokens_saved': self.saved_tokens
+            }
+
+
+def _default_cache():
+    ttl = float(os.getenv('llm_cache_ttl', 3600))
+    path = os.getenv('llm_cache_path')
+    if path:
+        backend = SQLiteBackend(path, max_entries=int(os.getenv('llm_cache_max_entries', 10000)))
+    else:
+        backend = MemoryBackend(max_entries=int(os.getenv('llm_cache_max_entries', 1000)))
+    return LLMCache(backend, ttl_seconds=ttl)
+
+
+llm_cache = _default_cache()
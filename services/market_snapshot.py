@@ -0,0 +1,58 @@
+import os
+import threading
+import time
+
+
+class MarketSnapshot:
+    """Market index summary shared by every page render.
+
+    A daemon thread refreshes the snapshot on a fixed interval; readers only
+    copy the last result and never touch the network.
+    """
+
+    def __init__(self, indices: list, interval_seconds: float = 60):
+        self.indices = indices
+        self.interval_seconds = interval_seconds
+        self.updated_at = None
+        self._data = {}
+        self._lock = threading.Lock()
+        self._stop = threading.Event()
+        self._thread = None
+
+    def refresh(self):
+        """Fetch a new summary and swap it in"""
+        from services.stock_service import StockService
+        data = StockService.get_market_summary(self.indices)
+        with self._lock:
+            self._data = data
+            self.updated_at = time.time()
+
+    def get(self) -> dict:
+        """Return the latest summary, or an empty dict before the first refresh"""
+        with self._lock:
+            return dict(self._data)
+
+    def start(self):
+        """Start the background refresher once per process"""
+        with self._lock:
+            if self._thread is not None and self._thread.is_alive():
+                return
+            self._stop.clear()
+            self._thread = threading.Thread(target=self._run, name="market-snapshot", daemon=True)
+            self._thread.start()
+
+    def stop(self):
+        self._stop.set()
+
+    def _run(self):
+        while not self._stop.is_set():
+            try:
+                self.refresh()
+            except Exception as e:
+                print(f"Failed to refresh market snapshot: {e}")
+            self._stop.wait(self.interval_seconds)
+
+
+market_snapshot = MarketSnapshot(
+    ['^GSPC', '^DJI', '^IXIC', '^TNX'],
+    interval_seconds=float(os.getenv('market_snapshot_interval', 60)))
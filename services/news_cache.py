@@ -0,0 +1,112 @@
+import os
+import threading
+import time
+from concurrent.futures import Future, ThreadPoolExecutor
+
+
+class NewsCache:
+    """TTL cache for NewsAPI responses with single-flight fetches.
+
+    - Fresh entries (younger than `ttl_seconds`) are returned directly.
+    - Stale entries (younger than `ttl_seconds + stale_seconds`) are returned
+      immediately while one background fetch revalidates them.
+    - On a miss, concurrent callers for the same key share one in-flight fetch.
+
+    With a `directory`, entries live in a diskcache store shared by every worker
+    and background job on the host; otherwise they are kept in this process.
+    """
+
+    def __init__(self, ttl_seconds: float = 300, stale_seconds: float = 1800, max_entries: int = 500,
+                 directory: str = None):
+        self.ttl_seconds = ttl_seconds
+        self.stale_seconds = stale_seconds
+        self.max_entries = max_entries
+        self._entries = {}    # key -> (value, fetched_at)
+        self._shared = None
+        if directory:
+            import diskcache
+            self._shared = diskcache.Cache(directory)
+        self._inflight = {}   # key -> Future
+        self._lock = threading.Lock()
+        self._executor = ThreadPoolExecutor(max_workers=4, thread_name_prefix="news-revalidate")
+        self.hits = 0
+        self.stale_hits = 0
+        self.misses = 0
+        self.coalesced = 0
+        self.fetches = 0
+
+    def _load(self, key: tuple):
+        if self._shared is not None:
+            return self._shared.get(key)
+        return self._entries.get(key)
+
+    def _save(self, key: tuple, value):
+        entry = (value, time.time())
+        if self._shared is not None:
+            self._shared.set(key, entry, expire=self.ttl_seconds + self.stale_seconds)
+            return
+        self._entries[key] = entry
+        if len(self._entries) > self.max_entries:
+            oldest = min(self._entries, key=lambda k: self._entries[k][1])
+            del self._entries[oldest]
+
+    def get_or_fetch(self, key: tuple, fetch):
+        now = time.time()
+        with self._lock:
+            entry = self._load(key)
+            if entry is not None:
+                age = now - entry[1]
+                if age <= self.ttl_seconds:
+                    self.hits += 1
+                    return entry[0]
+                if age <= self.ttl_seconds + self.stale_seconds:
+                    self.stale_hits += 1
+                    if key not in self._inflight:
+                        future = Future()
+                        self._inflight[key] = future
+                        self._executor.submit(self._run_fetch, key, fetch, future)
+                    return entry[0]
+
+            future = self._inflight.get(key)
+            if future is not None:
+                self.coalesced += 1
+                owner = False
+            else:
+                self.misses += 1
+                future = Future()
+                self._inflight[key] = future
+                owner = True
+
+        if owner:
+            self._run_fetch(key, fetch, future)
+        return future.result()
+
+    def _run_fetch(self, key: tuple, fetch, future: Future):
+        try:
+            value = fetch()
+        except Exception as e:
+            with self._lock:
+                self._inflight.pop(key, None)
+            future.set_exception(e)
+            return
+        with self._lock:
+            self.fetches += 1
+            self._save(key, value)
+            self._inflight.pop(key, None)
+        future.set_result(value)
+
+    def stats(self) -> dict:
+        with self._lock:
+            return {
+                'hits': self.hits,
+                'stale_hits': self.stale_hits,
+                'misses': self.misses,
+                'coalesced': self.coalesced,
+                'fetches': self.fetches,
+                'entries': len(self._shared) if self._shared is not None else len(self._entries)
+            }
+
+
+news_cache = NewsCache(ttl_seconds=float(os.getenv('news_cache_ttl', 300)),
+                       stale_seconds=float(os.getenv('news_cache_stale', 1800)),
+                       directory=os.getenv('news_cache_dir'))
@@ -0,0 +1,274 @@
+import json
+import os
+import re
+import sqlite3
+import tempfile
+import threading
+import time
+
+_TOKEN_RE = re.compile(r"[A-Za-z0-9]+")
+
+
+def fts_query(text: str) -> str:
+    """Turn free text into an FTS5 query that matches every word, ignoring FTS syntax"""
+    return " ".join(f'"{token}"' for token in _TOKEN_RE.findall(text))
+
+
+class NewsIndex:
+    """Local full-text index of news articles in SQLite FTS5.
+
+    Articles are deduplicated by URL. Articles fetched for a ticker are also tagged
+    with that symbol, so per-stock feeds can be read without a text search. The
+    database file is shared by all workers on the host.
+    """
+
+    def __init__(self, path: str, max_age_days: float = 30):
+        self.path = path
+        self.max_age_days = max_age_days
+        self._local = threading.local()
+        conn = self._conn()
+        conn.executescript("""
+            CREATE TABLE IF NOT EXISTS articles (
+                id INTEGER PRIMARY KEY,
+                url TEXT NOT NULL UNIQUE,
+                published_at TEXT,
+                ingested_at REAL NOT NULL,
+                payload TEXT NOT NULL
+            );
+            CREATE INDEX IF NOT EXISTS articles_published_at ON articles (published_at);
+            CREATE VIRTUAL TABLE IF NOT EXISTS articles_fts USING fts5(
+                title, description, content, source,
+                content='articles', content_rowid='id', tokenize='porter'
+            );
+            CREATE TABLE IF NOT EXISTS article_symbols (
+                symbol TEXT NOT NULL,
+                article_id INTEGER NOT NULL,
+                PRIMARY KEY (symbol, article_id)
+            );
+            CREATE TABLE IF NOT EXISTS tracked_symbols (
+                symbol TEXT PRIMARY KEY,
+                requested_at REAL NOT NULL,
+                ingested_at REAL
+            );
+            CREATE TABLE IF NOT EXISTS ingest_runs (
+                name TEXT PRIMARY KEY,
+                ran_at REAL NOT NULL
+            );
+            CREATE TABLE IF NOT EXISTS refreshes (
+                name TEXT PRIMARY KEY,
+                refreshed_at REAL NOT NULL
+            );
+        """)
+        conn.commit()
+
+    def _conn(self) -> sqlite3.Connection:
+        # Keyed by pid as well as thread: a connection inherited across fork() must not be used
+        conn = getattr(self._local, 'conn', None)
+        if conn is None or self._local.pid != os.getpid():
+            conn = sqlite3.connect(self.path, timeout=10)
+            conn.execute("PRAGMA journal_mode=WAL")
+            self._local.conn = conn
+            self._local.pid = os.getpid()
+        return conn
+
+    def ingest(self, articles: list, symbol: str = None) -> int:
+        """Add articles, skipping URLs already indexed. Returns the number of new articles."""
+        conn = self._conn()
+        now = time.time()
+        added = 0
+        with conn:
+            for article in articles:
+                url = article.get('url')
+                if not url or not article.get('title'):
+                    continue
+                cursor = conn.execute(
+                    "INSERT OR IGNORE INTO articles (url, published_at, ingested_at, payload) VALUES (?, ?, ?, ?)",
+                    (url, article.get('publishedAt'), now, json.dumps(article)))
+                if cursor.rowcount:
+                    article_id = cursor.lastrowid
+                    added += 1
+                    conn.execute(
+                        "INSERT INTO articles_fts (rowid, title, description, content, source) VALUES (?, ?, ?, ?, ?)",
+                        (article_id, article.get('title') or '', article.get('description') or '',
+                         article.get('content') or '', (article.get('source') or {}).get('name') or ''))
+                else:
+                    article_id = conn.execute("SELECT id FROM articles WHERE url = ?", (url,)).fetchone()[0]
+                if symbol:
+                    conn.execute("INSERT OR IGNORE INTO article_symbols (symbol, article_id) VALUES (?, ?)",
+                                 (symbol.upper(), article_id))
+            if symbol:
+                conn.execute("""
+                    INSERT INTO tracked_symbols (symbol, requested_at, ingested_at) VALUES (?, ?, ?)
+                    ON CONFLICT(symbol) DO UPDATE SET ingested_at = excluded.ingested_at
+                """, (symbol.upper(), now, now))
+        return added
+
+    def ingest_file(self, path: str) -> int:
+        """Load recorded articles: a JSON list, or {symbol or '': [articles]}"""
+        with open(path) as f:
+            recorded = json.load(f)
+        if isinstance(recorded, list):
+            added = self.ingest(recorded)
+        else:
+            added = sum(self.ingest(articles, symbol=symbol or None) for symbol, articles in recorded.items())
+        self.mark_refreshed()
+        return added
+
+    def search(self, query: str, limit: int = 10) -> list:
+        """Best BM25 matches for every word of the query, title matches weighted highest"""
+        match = fts_query(query)
+        if not match:
+            return []
+        rows = self._conn().execute("""
+            SELECT a.payload FROM articles_fts
+            JOIN articles a ON a.id = articles_fts.rowid
+            WHERE articles_fts MATCH ?
+            ORDER BY bm25(articles_fts, 10.0, 4.0, 1.0, 2.0)
+            LIMIT ?
+        """, (match, limit)).fetchall()
+        return [json.loads(row[0]) for row in rows]
+
+    def stock_articles(self, symbol: str, limit: int = 5) -> list:
+        """Newest articles ingested for a ticker"""
+        rows = self._conn().execute("""
+            SELECT a.payload FROM article_symbols s
+            JOIN articles a ON a.id = s.article_id
+            WHERE s.symbol = ?
+            ORDER BY a.published_at DESC
+            LIMIT ?
+        """, (symbol.upper(), limit)).fetchall()
+        return [json.loads(row[0]) for row in rows]
+
+    def symbol_age(self, symbol: str):
+        """Seconds since the symbol's feed was last ingested, or None if it never was"""
+        row = self._conn().execute("SELECT ingested_at FROM tracked_symbols WHERE symbol = ?",
+                                   (symbol.upper(),)).fetchone()
+        return None if row is None or row[0] is None else time.time() - row[0]
+
+    @staticmethod
+    def _refresh_name(query: str = None) -> str:
+        return 'index' if query is None else 'search:' + " ".join(_TOKEN_RE.findall(query.lower()))
+
+    def mark_refreshed(self, query: str = None):
+        """Record a full ingest run, or a remote refresh of one search query"""
+        conn = self._conn()
+        with conn:
+            conn.execute("""
+                INSERT INTO refreshes (name, refreshed_at) VALUES (?, ?)
+                ON CONFLICT(name) DO UPDATE SET refreshed_at = excluded.refreshed_at
+            """, (self._refresh_name(query), time.time()))
+
+    def refresh_age(self, query: str = None):
+        """Seconds since the last full ingest run, or since the query was last fetched remotely"""
+        row = self._conn().execute("SELECT refreshed_at FROM refreshes WHERE name = ?",
+                                   (self._refresh_name(query),)).fetchone()
+        return None if row is None else time.time() - row[0]
+
+    def track(self, symbol: str):
+        """Mark a ticker as wanted so the ingester keeps its feed current"""
+        conn = self._conn()
+        with conn:
+            conn.execute("""
+                INSERT INTO tracked_symbols (symbol, requested_at) VALUES (?, ?)
+                ON CONFLICT(symbol) DO UPDATE SET requested_at = excluded.requested_at
+            """, (symbol.upper(), time.time()))
+
+    def tracked_symbols(self, active_days: float = 7) -> list:
+        rows = self._conn().execute("SELECT symbol FROM tracked_symbols WHERE requested_at >= ? ORDER BY symbol",
+                                    (time.time() - active_days * 86400,)).fetchall()
+        return [row[0] for row in rows]
+
+    def claim_run(self, name: str, interval_seconds: float) -> bool:
+        """Atomically claim a periodic run, so one worker on the host does it per interval"""
+        conn = self._conn()
+        now = time.time()
+        with conn:
+            cursor = conn.execute("""
+                INSERT INTO ingest_runs (name, ran_at) VALUES (?, ?)
+                ON CONFLICT(name) DO UPDATE SET ran_at = excluded.ran_at
+                WHERE ingest_runs.ran_at < ?
+            """, (name, now, now - interval_seconds))
+            return cursor.rowcount > 0
+
+    def prune(self) -> int:
+        """Drop articles ingested more than max_age_days ago"""
+        conn = self._conn()
+        cutoff = time.time() - self.max_age_days * 86400
+        with conn:
+            rows = conn.execute("SELECT id, payload FROM articles WHERE ingested_at < ?", (cutoff,)).fetchall()
+            for article_id, payload in rows:
+                article = json.loads(payload)
+                conn.execute(
+                    "INSERT INTO articles_fts (articles_fts, rowid, title, description, content, source) "
+                    "VALUES ('delete', ?, ?, ?, ?, ?)",
+                    (article_id, article.get('title') or '', article.get('description') or '',
+                     article.get('content') or '', (article.get('source') or {}).get('name') or ''))
+            conn.execute("DELETE FROM article_symbols WHERE article_id IN "
+                         "(SELECT id FROM articles WHERE ingested_at < ?)", (cutoff,))
+            conn.execute("DELETE FROM articles WHERE ingested_at < ?", (cutoff,))
+        return len(rows)
+
+    def stats(self) -> dict:
+        conn = self._conn()
+        return {
+            'articles': conn.execute("SELECT COUNT(*) FROM articles").fetchone()[0],
+            'tracked_symbols': conn.execute("SELECT COUNT(*) FROM tracked_symbols").fetchone()[0]
+        }
+
+
+class NewsIngester:
+    """Periodically pulls business headlines and tracked tickers' news into the index.
+
+    Each interval is claimed through the index itself, so with several workers on a
+    host only one of them spends NewsAPI quota on a given run.
+    """
+
+    def __init__(self, index: NewsIndex, interval_seconds: float = 900, headline_limit: int = 50,
+                 symbol_limit: int = 20):
+        self.index = index
+        self.interval_seconds = interval_seconds
+        self.headline_limit = headline_limit
+        self.symbol_limit = symbol_limit
+        self._lock = threading.Lock()
+        self._stop = threading.Event()
+        self._thread = None
+
+    def run_once(self, news_service=None) -> int:
+        if news_service is None:
+            from services.registry import get_news_service
+            news_service = get_news_service()
+        added = self.index.ingest(news_service.fetch_market_news(self.headline_limit))
+        symbols = self.index.tracked_symbols()
+        if symbols:
+            news = news_service.fetch_portfolio_news(symbols, self.symbol_limit)
+            for symbol, articles in news.items():
+                added += self.index.ingest(articles, symbol=symbol)
+        self.index.mark_refreshed()
+        self.index.prune()
+        return added
+
+    def start(self):
+        """Start the background ingester once per process"""
+        with self._lock:
+            if self._thread is not None and self._thread.is_alive():
+                return
+            self._stop.clear()
+            self._thread = threading.Thread(target=self._run, name="news-ingester", daemon=True)
+            self._thread.start()
+
+    def stop(self):
+        self._stop.set()
+
+    def _run(self):
+        while not self._stop.is_set():
+            try:
+                if self.index.claim_run('news', self.interval_seconds):
+                    self.run_once()
+            except Exception as e:
+                print(f"Failed to ingest news: {e}")
+            self._stop.wait(min(self.interval_seconds, 60))
+
+
+news_index = NewsIndex(os.getenv('news_index_path',
+                                 os.path.join(tempfile.gettempdir(), 'news_index.sqlite')))
+news_ingester = NewsIngester(news_index, interval_seconds=float(os.getenv('news_ingest_interval', 900)))
@@ -1,57 +1,310 @@
-from newsapi import NewsApiClient
-
+import json
 import os
+import re
+import time
+from concurrent.futures import ThreadPoolExecutor, TimeoutError as FutureTimeoutError
+
+from services.news_cache import news_cache
+from services.news_index import fts_query
+
+# NewsAPI rejects `q` values longer than 500 characters
+MAX_QUERY_CHARS = 500
+# NewsAPI returns at most 100 articles per request
+MAX_PAGE_SIZE = 100
+
+# Names articles use for common holdings, so batched results can be attributed
+# to a ticker even when the symbol itself is not mentioned
+COMPANY_NAMES = {
+    'AAPL': ['Apple'],
+    'MSFT': ['Microsoft'],
+    'GOOGL': ['Alphabet', 'Google'],
+    'GOOG': ['Alphabet', 'Google'],
+    'AMZN': ['Amazon'],
+    'META': ['Meta Platforms', 'Facebook'],
+    'NVDA': ['Nvidia'],
+    'TSLA': ['Tesla'],
+    'BRK-B': ['Berkshire Hathaway'],
+    'JPM': ['JPMorgan'],
+    'V': ['Visa'],
+    'MA': ['Mastercard'],
+    'JNJ': ['Johnson & Johnson'],
+    'UNH': ['UnitedHealth'],
+    'XOM': ['Exxon'],
+    'CVX': ['Chevron'],
+    'PG': ['Procter & Gamble'],
+    'HD': ['Home Depot'],
+    'KO': ['Coca-Cola'],
+    'PEP': ['PepsiCo'],
+    'WMT': ['Walmart'],
+    'COST': ['Costco'],
+    'DIS': ['Disney'],
+    'NFLX': ['Netflix'],
+    'AMD': ['AMD', 'Advanced Micro Devices'],
+    'INTC': ['Intel'],
+    'ORCL': ['Oracle'],
+    'CRM': ['Salesforce'],
+    'ADBE': ['Adobe'],
+    'BAC': ['Bank of America'],
+    'PFE': ['Pfizer'],
+    'MRK': ['Merck'],
+    'LLY': ['Eli Lilly'],
+    'ABBV': ['AbbVie'],
+    'T': ['AT&T'],
+    'VZ': ['Verizon'],
+}
+
+_portfolio_executor = ThreadPoolExecutor(max_workers=4, thread_name_prefix="news-fetch")
+
+
+def symbol_terms(symbol: str, names: dict = None) -> list:
+    """The ticker plus the company names used to find and attribute its articles"""
+    aliases = (names or {}).get(symbol) or COMPANY_NAMES.get(symbol, [])
+    return list(dict.fromkeys([symbol] + list(aliases)))
+
+
+def build_symbol_queries(symbols: list, names: dict = None, max_chars: int = MAX_QUERY_CHARS) -> list:
+    """Pack symbols into OR-combined queries no longer than max_chars.
+
+    Returns [(query, [symbols])]. A symbol whose own clause is too long is
+    queried by its ticker alone.
+    """
+    batches = []
+    clauses, batch = [], []
+    for symbol in dict.fromkeys(symbols):
+        clause = " OR ".join(f'"{term}"' if " " in term else term for term in symbol_terms(symbol, names))
+        if len(clause) > max_chars:
+            clause = symbol
+        if clauses and len(" OR ".join(clauses + [clause])) > max_chars:
+            batches.append((" OR ".join(clauses), batch))
+            clauses, batch = [], []
+        clauses.append(clause)
+        batch.append(symbol)
+    if clauses:
+        batches.append((" OR ".join(clauses), batch))
+    return batches
+
+
+def split_by_symbol(articles: list, symbols: list, names: dict = None) -> dict:
+    """Attribute articles to every symbol whose ticker or company name they mention.
+
+    Tickers match case-sensitively as whole words, names case-insensitively.
+    Each symbol's list is deduplicated by URL and keeps the input order.
+    """
+    patterns = {}
+    for symbol in symbols:
+        terms = symbol_terms(symbol, names)
+        ticker = re.compile(rf"(?<![\w.-]){re.escape(symbol)}(?![\w-])")
+        aliases = [re.compile(rf"(?<!\w){re.escape(name)}(?!\w)", re.IGNORECASE) for name in terms[1:]]
+        patterns[symbol] = [ticker] + aliases
+
+    split = {symbol: [] for symbol in symbols}
+    seen = {symbol: set() for symbol in symbols}
+    for article in articles:
+        url = article.get('url')
+        text = " ".join(filter(None, (article.get('title'), article.get('description'))))
+        for symbol, matchers in patterns.items():
+            if url in seen[symbol]:
+                continue
+            if any(matcher.search(text) for matcher in matchers):
+                split[symbol].append(article)
+                seen[symbol].add(url)
+    return split
+
+
+class FixtureNewsClient:
+    """Replays recorded NewsAPI articles, for tests and offline runs.
+
+    Accepts the same recorded file as `NewsIndex.ingest_file`: a JSON list of
+    articles, or {symbol or '': [articles]}.
+    """
+
+    def __init__(self, articles: list):
+        self.articles = articles
+        self.calls = 0
+
+    @classmethod
+    def from_file(cls, path: str):
+        with open(path) as f:
+            recorded = json.load(f)
+        if isinstance(recorded, dict):
+            recorded = [article for articles in recorded.values() for article in articles]
+        return cls(list({article['url']: article for article in recorded}.values()))
+
+    def get_top_headlines(self, page_size: int = 20, **kwargs) -> dict:
+        self.calls += 1
+        return {'status': 'ok', 'articles': self.articles[:page_size]}
+
+    def get_everything(self, q: str, page_size: int = 20, **kwargs) -> dict:
+        self.calls += 1
+        terms = [term.strip('"').lower() for term in fts_query(q).split() if term not in ('"OR"', '"AND"')]
+        matches = [
+            article for article in self.articles
+            if any(term in f"{article.get('title')} {article.get('description')}".lower() for term in terms)
+        ]
+        return {'status': 'ok', 'articles': matches[:page_size]}
 
 
 class NewsService:
 
-    def __init__(self):
-        api_key = os.getenv('news_api_key')
-        if not api_key:
-            raise Exception("NEWS_API_KEY environment variable is not set")
-        self.api = NewsApiClient(api_key=api_key)
+    def __init__(self, api=None, index=None, symbol_max_age: float = None, search_max_age: float = None):
+        if api is None:
+            api_key = os.getenv('news_api_key')
+            if not api_key:
+                raise Exception("NEWS_API_KEY environment variable is not set")
+            from newsapi import NewsApiClient
+            api = NewsApiClient(api_key=api_key)
+        if index is None:
+            from services.news_index import news_index as index
+        self.api = api
+        self.index = index
+        # A ticker's local feed is trusted for two ingest intervals before going remote
+        self.symbol_max_age = symbol_max_age if symbol_max_age is not None else \
+            2 * float(os.getenv('news_ingest_interval', 900))
+        # Local search results are trusted for two ingest intervals after the last ingest
+        # run, or after the same query was last fetched remotely
+        self.search_max_age = search_max_age if search_max_age is not None else \
+            2 * float(os.getenv('news_ingest_interval', 900))
+
+    def _is_fresh(self, age) -> bool:
+        return age is not None and age < self.search_max_age
+
+    @staticmethod
+    def _articles(news: dict) -> list:
+        if news.get('status') == 'error':
+            raise Exception(news.get('message', 'Unknown error occurred'))
+        return news.get('articles', [])
+
+    # Remote NewsAPI calls, shared through the TTL cache
+
+    def fetch_market_news(self, limit: int = 10) -> list:
+        return news_cache.get_or_fetch(
+            ('top_headlines', 'business', limit),
+            lambda: self._articles(self.api.get_top_headlines(category='business',
+                                                              language='en',
+                                                              country='us',
+                                                              page_size=limit)))
+
+    def fetch_stock_news(self, symbol: str, limit: int = 5) -> list:
+        return news_cache.get_or_fetch(
+            ('everything_latest', symbol, limit),
+            lambda: self._articles(self.api.get_everything(q=symbol,
+                                                           language='en',
+                                                           sort_by='publishedAt',
+                                                           page_size=limit)))
+
+    def fetch_search(self, query: str, limit: int = 10) -> list:
+        return news_cache.get_or_fetch(
+            ('everything_relevant', query.strip().lower(), limit),
+            lambda: self._articles(self.api.get_everything(q=query,
+                                                           language='en',
+                                                           sort_by='relevancy',
+                                                           page_size=limit)))
+
+    def fetch_portfolio_news(self, symbols: list, limit: int = 5, names: dict = None,
+                             timeout: float = 15.0) -> dict:
+        """Fetch news for many symbols with a few OR-combined queries run concurrently.
+
+        Returns {symbol: [articles]} with at most `limit` articles per symbol.
+        Batches that fail or time out leave their symbols with empty lists.
+        """
+        symbols = list(dict.fromkeys(symbols))
+        futures = []
+        for query, batch in build_symbol_queries(symbols, names):
+            page_size = min(MAX_PAGE_SIZE, limit * len(batch) * 2)
+            futures.append((batch, _portfolio_executor.submit(
+                news_cache.get_or_fetch,
+                ('everything_latest', query, page_size),
+                lambda query=query, page_size=page_size: self._articles(
+                    self.api.get_everything(q=query,
+                                            language='en',
+                                            sort_by='publishedAt',
+                                            page_size=page_size)))))
+
+        deadline = time.monotonic() + timeout
+        news = {symbol: [] for symbol in symbols}
+        for batch, future in futures:
+            try:
+                articles = future.result(timeout=max(0, deadline - time.monotonic()))
+            except FutureTimeoutError:
+                future.cancel()
+                print(f"Timed out fetching news for {batch}")
+                continue
+            except Exception as e:
+                print(f"Failed to fetch news for {batch}: {e}")
+                continue
+            for symbol, matched in split_by_symbol(articles, batch, names).items():
+                news[symbol] = matched[:limit]
+        return news
+
+    # Public API: answered from the local index where possible
 
     def get_market_news(self, limit: int = 10) -> list:
         """Get general market news"""
         try:
-            news = self.api.get_top_headlines(category='business',
-                                              language='en',
-                                              country='us',
-                                              page_size=limit)
-
-            if news.get('status') == 'error':
-                raise Exception(news.get('message', 'Unknown error occurred'))
-
-            return news.get('articles', [])
+            articles = self.fetch_market_news(limit)
+            self.index.ingest(articles)
+            return articles
         except Exception as e:
             raise Exception(f"Failed to fetch market news: {e}")
 
     def get_stock_news(self, symbol: str, limit: int = 5) -> list:
         """Get news articles for a specific stock"""
         try:
-            news = self.api.get_everything(q=symbol,
-                                           language='en',
-                                           sort_by='publishedAt',
-                                           page_size=limit)
+            self.index.track(symbol)
+            age = self.index.symbol_age(symbol)
+            if age is not None and age < self.symbol_max_age:
+                articles = self.index.stock_articles(symbol, limit)
+                if articles:
+                    return articles
+            articles = self.fetch_stock_news(symbol, limit)
+            self.index.ingest(articles, symbol=symbol)
+            return articles
+        except Exception as e:
+            raise Exception(f"Failed to fetch news for {symbol}: {e}")
 
-            if news.get('status') == 'error':
-                raise Exception(news.get('message', 'Unknown error occurred'))
+    def get_portfolio_news(self, symbols: list, limit: int = 5, names: dict = None) -> dict:
+        """Get news for every holding, with one remote query per batch of symbols.
 
-            return news.get('articles', [])
+        Symbols with a fresh local feed are answered from the index; the rest are
+        fetched together and ingested. Returns {symbol: [articles]}.
+        """
+        try:
+            news, remote = {}, []
+            for symbol in dict.fromkeys(symbols):
+                self.index.track(symbol)
+                age = self.index.symbol_age(symbol)
+                articles = self.index.stock_articles(symbol, limit) \
+                    if age is not None and age < self.symbol_max_age else []
+                if articles:
+                    news[symbol] = articles
+                else:
+                    remote.append(symbol)
+            if remote:
+                fetched = self.fetch_portfolio_news(remote, limit, names)
+                for symbol, articles in fetched.items():
+                    self.index.ingest(articles, symbol=symbol)
+                news.update(fetched)
+            return {symbol: news[symbol] for symbol in dict.fromkeys(symbols)}
         except Exception as e:
-            raise Exception(f"Failed to fetch news for {symbol}: {e}")
+            raise Exception(f"Failed to fetch portfolio news: {e}")
 
     def search_news(self, query: str, limit: int = 10) -> list:
         """Search news articles by query"""
         try:
-            news = self.api.get_everything(q=query,
-                                           language='en',
-                                           sort_by='relevancy',
-                                           page_size=limit)
-
-            if news.get('status') == 'error':
-                raise Exception(news.get('message', 'Unknown error occurred'))
-
-            return news.get('articles', [])
+            local = self.index.search(query, limit)
+            # A query fetched remotely is answered locally until it ages out, even with
+            # few hits; other queries while the ingester keeps the index current
+            if self._is_fresh(self.index.refresh_age(query)) or \
+                    (local and self._is_fresh(self.index.refresh_age())):
+                return local
+            try:
+                articles = self.fetch_search(query, limit)
+            except Exception:
+                if local:
+                    return local
+                raise
+            self.index.ingest(articles)
+            self.index.mark_refreshed(query)
+            return articles or local
         except Exception as e:
             raise Exception(f"Failed to search news: {e}")
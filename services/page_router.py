@@ -0,0 +1,130 @@
+import math
+import re
+
+from services.goal_index import normalize_goal
+
+BASE_PAGES = ["Welcome", "Portfolio Dashboard", "News Tracker", "AI Insights"]
+
+EXTRA_PAGES = ["College Savings Account", "529 Plan", "Crypto Investments",
+               "Mortgage Planning", "Estate Planning", "Life Insurance"]
+
+# High-precision keyword rules; a match selects the page outright
+KEYWORD_RULES = {
+    "College Savings Account": r"\b(college|universit(y|ies)|tuition|education|school|student)\b",
+    "529 Plan": r"\b(529|college|tuition|education savings)\b",
+    "Crypto Investments": r"\b(crypto\w*|bitcoin|btc|ethereum|eth|blockchain|digital (assets?|currenc\w+)|altcoins?)\b",
+    "Mortgage Planning": r"\b(mortgages?|home ?buy\w*|buy(ing)? (a |my |our )?(home|house|condo)|down ?payment|refinanc\w+|real estate(?! (stocks?|funds?|etfs?|reits?|investment))|first home)\b",
+    "Estate Planning": r"\b(estate plan\w*|(my|our|an?) estate|(a|my|our) will|last will|wills and trusts|"
+                       r"(a|family|living|revocable|irrevocable) trusts?|trust funds?|inheritance|heirs?|legacy|"
+                       r"pass (on|down)|probate|beneficiar\w+)\b",
+    "Life Insurance": r"\b(life insurance|insurance|insure|term life|whole life|protect (my |our )?family|dependents?|death benefit)\b",
+}
+
+# Seed examples for the statistical model, which covers phrasings the rules miss
+TRAINING_EXAMPLES = [
+    ("pay for my daughter's degree when she turns 18", ["College Savings Account", "529 Plan"]),
+    ("fund my son's schooling in a tax advantaged way", ["College Savings Account", "529 Plan"]),
+    ("kids will need money for higher learning", ["College Savings Account", "529 Plan"]),
+    ("put some money into coins and tokens", ["Crypto Investments"]),
+    ("speculative digital coins like solana and dogecoin", ["Crypto Investments"]),
+    ("web3 and defi exposure", ["Crypto Investments"]),
+    ("save up to purchase our first apartment", ["Mortgage Planning"]),
+    ("pay off the loan on our house faster", ["Mortgage Planning"]),
+    ("move into a bigger place for the family in a few years", ["Mortgage Planning"]),
+    ("make sure my assets go to my children after i die", ["Estate Planning"]),
+    ("leave wealth to my grandchildren", ["Estate Planning"]),
+    ("set things up so my spouse is looked after if i pass away", ["Life Insurance", "Estate Planning"]),
+    ("cover my family financially if something happens to me", ["Life Insurance"]),
+    ("income replacement for my wife and kids if i die early", ["Life Insurance"]),
+    ("retire comfortably at 65", []),
+    ("set aside part of every paycheck until i stop working", []),
+    ("i will keep working until 67 and then live off my savings", []),
+    ("reits and property shares for yield", []),
+    ("grow my wealth with index funds", []),
+    ("aggressive growth in tech stocks", []),
+    ("generate steady dividend income", []),
+    ("build an emergency fund and invest the rest", []),
+    ("low risk conservative portfolio", []),
+]
+
+
+def _tokens(text: str) -> list:
+    return normalize_goal(text)
+
+
+class NaiveBayesPageModel:
+    """One-vs-rest multinomial Naive Bayes over stemmed goal tokens"""
+
+    def __init__(self, examples: list, labels: list, alpha: float = 1.0):
+        self.labels = labels
+        self.alpha = alpha
+        self.vocab = {token for text, _ in examples for token in _tokens(text)}
+        self.params = {}
+        for label in labels:
+            counts = {True: {}, False: {}}
+            docs = {True: 0, False: 0}
+            for text, text_labels in examples:
+                cls = label in text_labels
+                docs[cls] += 1
+                for token in _tokens(text):
+                    counts[cls][token] = counts[cls].get(token, 0) + 1
+            totals = {cls: sum(c.values()) for cls, c in counts.items()}
+            self.params[label] = (counts, docs, totals)
+
+    def predict_proba(self, text: str) -> dict:
+        tokens = [t for t in _tokens(text) if t in self.vocab]
+        probabilities = {}
+        v = len(self.vocab)
+        for label, (counts, docs, totals) in self.params.items():
+            n_examples = docs[True] + docs[False]
+            log_p = {}
+            for cls in (True, False):
+                log_p[cls] = math.log((docs[cls] + self.alpha) / (n_examples + 2 * self.alpha))
+                for token in tokens:
+                    log_p[cls] += math.log((counts[cls].get(token, 0) + self.alpha) /
+                                           (totals[cls] + self.alpha * v))
+            diff = max(min(log_p[False] - log_p[True], 50), -50)
+            probabilities[label] = 1 / (1 + math.exp(diff))
+        return probabilities
+
+
+class PageRouter:
+    """Choose extra navigation pages for an investment goal without an LLM.
+
+    Keyword rules select pages outright; the Naive Bayes model decides the rest.
+    route() reports whether any page fell in the uncertain band, in which case a
+    caller may ask the LLM instead.
+    """
+
+    def __init__(self, low: float = 0.35, high: float = 0.65):
+        self.low = low
+        self.high = high
+        self.rules = {page: re.compile(pattern, re.IGNORECASE) for page, pattern in KEYWORD_RULES.items()}
+        self.model = NaiveBayesPageModel(TRAINING_EXAMPLES, EXTRA_PAGES)
+
+    def route(self, investment_goals: str) -> tuple:
+        """Return (extra_pages, confident)"""
+        text = investment_goals or ''
+        selected = {page for page, rule in self.rules.items() if rule.search(text)}
+        confident = True
+        for page, probability in self.model.predict_proba(text).items():
+            if page in selected:
+                continue
+            if probability >= self.high:
+                selected.add(page)
+            elif probability > self.low:
+                confident = False
+        return [page for page in EXTRA_PAGES if page in selected], confident
+
+
+def merge_pages(current_pages: list, new_pages: list) -> list:
+    """Merge and validate pages, keeping the base pages first in their fixed order"""
+    allowed = set(BASE_PAGES) | set(EXTRA_PAGES)
+    merged = []
+    for page in list(current_pages) + list(new_pages):
+        if page in allowed and page not in merged:
+            merged.append(page)
+    return [p for p in BASE_PAGES if p in merged] + [p for p in merged if p not in BASE_PAGES]
+
+
+page_router = PageRouter()
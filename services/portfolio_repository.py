@@ -0,0 +1,121 @@
+import csv
+
+from services.database import get_connection
+from services.positions_cache import positions_cache
+
+INSERT_PREFIX = "INSERT INTO optimized_portfolio (user_id, symbol, quantity, target_allocation) VALUES "
+
+
+def _merge_holdings(user_id: str, holdings: list) -> list:
+    """Collapse duplicate symbols into one row each, matching the (user_id, symbol) key"""
+    merged = {}
+    for holding in holdings:
+        symbol = holding["symbol"]
+        quantity = int(holding.get("quantity", 0))
+        allocation = float(holding.get("target_allocation", 0.0) or 0.0)
+        if symbol in merged:
+            _, _, prev_quantity, prev_allocation = merged[symbol]
+            merged[symbol] = (user_id, symbol, prev_quantity + quantity, prev_allocation + allocation)
+        else:
+            merged[symbol] = (user_id, symbol, quantity, allocation)
+    return list(merged.values())
+
+
+def _insert_rows(cursor, rows: list):
+    if not rows:
+        return
+    placeholders = ", ".join(["(%s, %s, %s, %s)"] * len(rows))
+    cursor.execute(INSERT_PREFIX + placeholders, [value for row in rows for value in row])
+
+
+def _drop_summaries(cursor, user_ids: list):
+    """Remove batch-computed summaries that no longer match the holdings"""
+    cursor.execute(
+        "DELETE FROM portfolio_summary WHERE user_id IN ({})".format(", ".join(["%s"] * len(user_ids))),
+        user_ids)
+
+
+class PortfolioRepository:
+    @staticmethod
+    def get_positions(user_id: str) -> dict:
+        """Return {symbol: quantity} for a user, served from the positions cache when warm"""
+        return positions_cache.get(user_id, PortfolioRepository.load_positions)
+
+    @staticmethod
+    def load_positions(user_id: str) -> dict:
+        """Read {symbol: quantity} for a user straight from the database"""
+        with get_connection() as connection:
+            cursor = connection.cursor()
+            cursor.execute("SELECT symbol, quantity FROM optimized_portfolio WHERE user_id = %s",
+                           (user_id,))
+            results = cursor.fetchall()
+            cursor.close()
+
+        positions = {}
+        for symbol, quantity in results:
+            positions[symbol] = positions.get(symbol, 0) + quantity
+        return positions
+
+    @staticmethod
+    def replace_portfolio(user_id: str, holdings: list):
+        """Replace a user's whole portfolio in one transaction.
+
+        Runs a DELETE, one multi-row INSERT and a DELETE of the user's stale batch
+        summary, then commits once.
+        """
+        rows = _merge_holdings(user_id, holdings)
+        with get_connection() as connection:
+            cursor = connection.cursor()
+            cursor.execute("DELETE FROM optimized_portfolio WHERE user_id = %s", (user_id,))
+            _insert_rows(cursor, rows)
+            _drop_summaries(cursor, [user_id])
+            connection.commit()
+            cursor.close()
+        positions_cache.invalidate(user_id)
+
+    @staticmethod
+    def add_position(user_id: str, symbol: str, quantity: int, target_allocation: float = 0.0):
+        """Atomically add shares to a holding, creating it if needed"""
+        with get_connection() as connection:
+            cursor = connection.cursor()
+            cursor.execute(
+                INSERT_PREFIX + "(%s, %s, %s, %s) "
+                "ON DUPLICATE KEY UPDATE quantity = quantity + VALUES(quantity)",
+                (user_id, symbol, quantity, target_allocation))
+            _drop_summaries(cursor, [user_id])
+            connection.commit()
+            cursor.close()
+        positions_cache.invalidate(user_id)
+
+    @staticmethod
+    def bulk_import_csv(path: str, users_per_batch: int = 1000) -> int:
+        """Load many users' portfolios from a CSV with columns
+        user_id, symbol, quantity[, target_allocation].
+
+        Each imported user's existing portfolio is replaced. Users are written in
+        batches of `users_per_batch`, each batch as one DELETE, one multi-row
+        INSERT and one DELETE of the batch's stale summaries inside a single
+        transaction. Returns the number of users imported.
+        """
+        portfolios = {}
+        with open(path, newline='') as f:
+            for record in csv.DictReader(f):
+                portfolios.setdefault(record['user_id'], []).append(record)
+
+        user_ids = list(portfolios)
+        with get_connection() as connection:
+            cursor = connection.cursor()
+            for start in range(0, len(user_ids), users_per_batch):
+                batch = user_ids[start:start + users_per_batch]
+                rows = [row for user_id in batch for row in _merge_holdings(user_id, portfolios[user_id])]
+                cursor.execute(
+                    "DELETE FROM optimized_portfolio WHERE user_id IN ({})".format(
+                        ", ".join(["%s"] * len(batch))),
+                    batch)
+                _insert_rows(cursor, rows)
+                _drop_summaries(cursor, batch)
+                connection.commit()
+                for user_id in batch:
+                    positions_cache.invalidate(user_id)
+            cursor.close()
+        return len(user_ids)
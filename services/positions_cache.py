@@ -0,0 +1,119 @@
+import os
+import threading
+import time
+
+
+class InMemoryBackend:
+    """Per-process backend; invalidations are only seen by this worker"""
+
+    def __init__(self):
+        self._data = {}
+        self._versions = {}
+        self._lock = threading.Lock()
+
+    def get(self, key: str):
+        with self._lock:
+            entry = self._data.get(key)
+            if entry is None or entry[1] < time.time():
+                return None
+            return entry[0]
+
+    def version(self, key: str) -> int:
+        with self._lock:
+            return self._versions.get(key, 0)
+
+    def set_if_version(self, key: str, value, ttl: float, version: int) -> bool:
+        """Store value unless the key was invalidated since `version` was read"""
+        with self._lock:
+            if self._versions.get(key, 0) != version:
+                return False
+            self._data[key] = (value, time.time() + ttl)
+            return True
+
+    def invalidate(self, key: str):
+        with self._lock:
+            self._versions[key] = self._versions.get(key, 0) + 1
+            self._data.pop(key, None)
+
+
+class SharedBackend:
+    """diskcache-backed store shared by every worker on the host"""
+
+    def __init__(self, directory: str):
+        import diskcache
+        self._cache = diskcache.Cache(directory)
+
+    def get(self, key: str):
+        return self._cache.get(key)
+
+    def version(self, key: str) -> int:
+        return self._cache.get(f"{key}:version", 0)
+
+    def set_if_version(self, key: str, value, ttl: float, version: int) -> bool:
+        """Store value unless the key was invalidated since `version` was read"""
+        with self._cache.transact():
+            if self._cache.get(f"{key}:version", 0) != version:
+                return False
+            self._cache.set(key, value, expire=ttl)
+            return True
+
+    def invalidate(self, key: str):
+        with self._cache.transact():
+            self._cache.incr(f"{key}:version", default=0)
+            self._cache.delete(key)
+
+
+class PositionsCache:
+    """Read-through cache of {symbol: quantity} per user, invalidated on every write"""
+
+    def __init__(self, backend, ttl_seconds: float = 300):
+        self.backend = backend
+        self.ttl_seconds = ttl_seconds
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        self.invalidations = 0
+
+    @staticmethod
+    def _key(user_id: str) -> str:
+        return f"positions:{user_id}"
+
+    def get(self, user_id: str, loader) -> dict:
+        """Return cached positions, calling loader(user_id) on a miss"""
+        positions = self.backend.get(self._key(user_id))
+        if positions is not None:
+            with self._lock:
+                self.hits += 1
+            return dict(positions)
+        with self._lock:
+            self.misses += 1
+        # Read the version before loading: if a write invalidates the user while the
+        # loader runs, the rows it returned may predate that write and are not cached
+        version = self.backend.version(self._key(user_id))
+        positions = loader(user_id)
+        self.backend.set_if_version(self._key(user_id), dict(positions), self.ttl_seconds, version)
+        return positions
+
+    def invalidate(self, user_id: str):
+        self.backend.invalidate(self._key(user_id))
+        with self._lock:
+            self.invalidations += 1
+
+    def stats(self) -> dict:
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                'hits': self.hits,
+                'misses': self.misses,
+                'invalidations': self.invalidations,
+                'hit_rate': self.hits / lookups if lookups else 0
+            }
+
+
+def _default_backend():
+    directory = os.getenv('positions_cache_dir')
+    return SharedBackend(directory) if directory else InMemoryBackend()
+
+
+positions_cache = PositionsCache(_default_backend(),
+                                 ttl_seconds=float(os.getenv('positions_cache_ttl', 300)))
@@ -0,0 +1,102 @@
+import fcntl
+import os
+import tempfile
+import time
+
+import pandas as pd
+
+
+class PriceStore:
+    """On-disk OHLCV store shared by every worker process.
+
+    Each (symbol, interval) lives in its own uncompressed Arrow IPC (Feather v2)
+    file so reads can be memory-mapped straight from the page cache. Files are
+    written as a single record batch, which lets `load` hand pandas views over the
+    mapping instead of copying every column into each worker. Writers take an
+    exclusive lock per file and publish with an atomic rename, so readers in other
+    workers only ever see complete files.
+    """
+
+    def __init__(self, root: str, ttl_seconds: float = 900):
+        self.root = root
+        self.ttl_seconds = ttl_seconds
+        os.makedirs(root, exist_ok=True)
+
+    def _path(self, symbol: str, interval: str) -> str:
+        safe_symbol = symbol.replace('/', '_').replace('^', '_idx_')
+        return os.path.join(self.root, f"{safe_symbol}__{interval}.feather")
+
+    def load(self, symbol: str, interval: str = "1d"):
+        """Return (frame, period, age_seconds) for a stored symbol, or (None, None, None).
+
+        The frame's columns are read-only views over the memory-mapped file.
+        """
+        import pyarrow.feather as feather
+
+        path = self._path(symbol, interval)
+        try:
+            age = time.time() - os.path.getmtime(path)
+            table = feather.read_table(path, memory_map=True)
+        except (FileNotFoundError, OSError):
+            return None, None, None
+        return table.to_pandas(split_blocks=True), _period(table.schema), age
+
+    def info(self, symbol: str, interval: str = "1d"):
+        """Return (period, age_seconds) from the file's schema alone, or (None, None)"""
+        import pyarrow as pa
+
+        path = self._path(symbol, interval)
+        try:
+            age = time.time() - os.path.getmtime(path)
+            with pa.memory_map(path) as source:
+                schema = pa.ipc.open_file(source).schema
+        except (FileNotFoundError, OSError):
+            return None, None
+        return _period(schema), age
+
+    def is_fresh(self, age: float) -> bool:
+        return age is not None and age <= self.ttl_seconds
+
+    def save(self, symbol: str, frame: pd.DataFrame, period: str, interval: str = "1d"):
+        """Atomically replace the stored frame for a symbol"""
+        import pyarrow as pa
+        import pyarrow.feather as feather
+
+        if frame is None or frame.empty:
+            return
+        path = self._path(symbol, interval)
+        table = pa.Table.from_pandas(frame, preserve_index=True)
+        metadata = dict(table.schema.metadata or {})
+        metadata[b'period'] = period.encode()
+        table = table.replace_schema_metadata(metadata)
+
+        with open(path + '.lock', 'w') as lock_file:
+            fcntl.flock(lock_file, fcntl.LOCK_EX)
+            try:
+                fd, tmp_path = tempfile.mkstemp(dir=self.root, suffix='.tmp')
+                os.close(fd)
+                try:
+                    # One chunk per column: multi-chunk columns can't be viewed zero-copy
+                    feather.write_feather(table, tmp_path, compression='uncompressed',
+                                          chunksize=max(table.num_rows, 1))
+                    os.replace(tmp_path, path)
+                except Exception:
+                    os.unlink(tmp_path)
+                    raise
+            finally:
+                fcntl.flock(lock_file, fcntl.LOCK_UN)
+
+
+def _period(schema) -> str:
+    metadata = schema.metadata or {}
+    return metadata.get(b'period', b'').decode() or None
+
+
+def _default_store():
+    root = os.getenv('price_store_dir')
+    if not root:
+        return None
+    return PriceStore(root, ttl_seconds=float(os.getenv('history_cache_ttl', 900)))
+
+
+price_store = _default_store()
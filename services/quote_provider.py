@@ -0,0 +1,60 @@
+import pandas as pd
+
+
+class QuoteProvider:
+    """Interface for fetching last price and previous close for many symbols at once"""
+
+    def get_quotes(self, symbols: list) -> dict:
+        """Return {symbol: {'price': float, 'previous_close': float}}"""
+        raise NotImplementedError
+
+
+class YahooQuoteProvider(QuoteProvider):
+    """Fetches quotes for every symbol in a single yfinance download"""
+
+    def __init__(self, period: str = "5d"):
+        self.period = period
+
+    def get_quotes(self, symbols: list) -> dict:
+        symbols = list(dict.fromkeys(symbols))
+        if not symbols:
+            return {}
+        import yfinance as yf
+        try:
+            data = yf.download(tickers=symbols,
+                               period=self.period,
+                               interval="1d",
+                               group_by="column",
+                               auto_adjust=False,
+                               threads=True,
+                               progress=False)
+        except Exception as e:
+            raise Exception(f"Failed to fetch quotes for {symbols}: {e}")
+
+        closes = data['Close'] if not data.empty else pd.DataFrame()
+        if isinstance(closes, pd.Series):
+            closes = closes.to_frame(name=symbols[0])
+
+        quotes = {}
+        for symbol in symbols:
+            if symbol not in closes:
+                quotes[symbol] = {'price': 0, 'previous_close': 0}
+                continue
+            series = closes[symbol].dropna()
+            price = float(series.iloc[-1]) if len(series) > 0 else 0
+            prev_close = float(series.iloc[-2]) if len(series) > 1 else price
+            quotes[symbol] = {'price': price, 'previous_close': prev_close}
+        return quotes
+
+
+class FixtureQuoteProvider(QuoteProvider):
+    """Serves quotes from a local dict, for tests and offline runs"""
+
+    def __init__(self, quotes: dict):
+        self.quotes = quotes
+
+    def get_quotes(self, symbols: list) -> dict:
+        return {
+            symbol: self.quotes.get(symbol, {'price': 0, 'previous_close': 0})
+            for symbol in symbols
+        }
@@ -0,0 +1,62 @@
+import os
+import threading
+
+# Lazily created, process-wide service instances. Heavy SDKs are imported on first
+# use rather than at module import, and each client is built once and reused.
+_instances = {}
+_lock = threading.Lock()
+
+
+def _get(name: str, factory):
+    instance = _instances.get(name)
+    if instance is None:
+        with _lock:
+            instance = _instances.get(name)
+            if instance is None:
+                instance = factory()
+                _instances[name] = instance
+    return instance
+
+
+def get_anthropic_client():
+    def build():
+        from anthropic import Anthropic
+        return Anthropic(api_key=os.getenv('anthropic_api_key'))
+    return _get('anthropic', build)
+
+
+def get_openai_client():
+    def build():
+        from openai import OpenAI
+        return OpenAI(api_key=os.getenv("openai_api_key"))
+    return _get('openai', build)
+
+
+def get_ai_service():
+    def build():
+        from services.ai_service import AIService
+        return AIService()
+    return _get('ai_service', build)
+
+
+def get_news_service():
+    def build():
+        from services.news_service import NewsService
+        return NewsService()
+    return _get('news_service', build)
+
+
+def reset():
+    """Forget all instances, e.g. in tests"""
+    with _lock:
+        _instances.clear()
+
+
+def _reset_after_fork():
+    global _lock
+    _lock = threading.Lock()
+    _instances.clear()
+
+
+# SDK clients keep HTTP connection pools that must not be shared with a forked child
+os.register_at_fork(after_in_child=_reset_after_fork)
@@ -0,0 +1,172 @@
+import fcntl
+import os
+import tempfile
+from datetime import datetime
+
+from services.database import get_connection
+
+# Ordered, append-only list of (version, description, steps). A step is a SQL
+# string or a callable taking the cursor. DDL commits implicitly and the version
+# row is written last, so every step must be safe to re-run after a crash.
+# Never edit a migration that has shipped; add a new one instead.
+MIGRATIONS = [
+    (1, "baseline tables", [
+        """
+        CREATE TABLE IF NOT EXISTS optimized_portfolio (
+            id BIGINT AUTO_INCREMENT PRIMARY KEY,
+            user_id VARCHAR(100),
+            symbol VARCHAR(10),
+            quantity INT,
+            target_allocation FLOAT,
+            created_at DATETIME DEFAULT CURRENT_TIMESTAMP
+        )
+        """,
+        """
+        CREATE TABLE IF NOT EXISTS user_activities (
+            id BIGINT AUTO_INCREMENT PRIMARY KEY,
+            user_id VARCHAR(100),
+            activity_type VARCHAR(50),
+            details JSON,
+            timestamp DATETIME
+        )
+        """
+    ]),
+    (2, "key optimized_portfolio by (user_id, symbol), sharded on user_id", [
+        lambda cursor: _rebuild_table(cursor, "optimized_portfolio", """
+            CREATE ROWSTORE TABLE optimized_portfolio_new (
+                user_id VARCHAR(100) NOT NULL,
+                symbol VARCHAR(10) NOT NULL,
+                quantity INT NOT NULL DEFAULT 0,
+                target_allocation FLOAT,
+                created_at DATETIME DEFAULT CURRENT_TIMESTAMP,
+                PRIMARY KEY (user_id, symbol),
+                SHARD KEY (user_id)
+            )
+            """, """
+            INSERT INTO optimized_portfolio_new (user_id, symbol, quantity, target_allocation, created_at)
+            SELECT user_id, symbol, SUM(quantity), MAX(target_allocation), MIN(created_at)
+            FROM optimized_portfolio
+            WHERE user_id IS NOT NULL AND symbol IS NOT NULL
+            GROUP BY user_id, symbol
+            """)
+    ]),
+    (3, "shard user_activities on user_id, sort by timestamp", [
+        lambda cursor: _rebuild_table(cursor, "user_activities", """
+            CREATE TABLE user_activities_new (
+                id BIGINT AUTO_INCREMENT,
+                user_id VARCHAR(100) NOT NULL,
+                activity_type VARCHAR(50),
+                details JSON,
+                timestamp DATETIME NOT NULL,
+                SHARD KEY (user_id),
+                SORT KEY (timestamp),
+                KEY (id) USING HASH
+            )
+            """, """
+            INSERT INTO user_activities_new (user_id, activity_type, details, timestamp)
+            SELECT COALESCE(user_id, 'anonymous'), activity_type, details, COALESCE(timestamp, NOW())
+            FROM user_activities
+            """)
+    ]),
+    (4, "portfolio_summary for batch analytics", [
+        """
+        CREATE ROWSTORE TABLE IF NOT EXISTS portfolio_summary (
+            user_id VARCHAR(100) NOT NULL,
+            total_value DOUBLE,
+            daily_change DOUBLE,
+            daily_return DOUBLE,
+            ytd_return DOUBLE,
+            volatility DOUBLE,
+            sharpe DOUBLE,
+            max_drawdown DOUBLE,
+            beta DOUBLE,
+            diversification_score DOUBLE,
+            updated_at DATETIME,
+            PRIMARY KEY (user_id),
+            SHARD KEY (user_id)
+        )
+        """
+    ])
+]
+
+
+def _table_exists(cursor, table: str) -> bool:
+    cursor.execute("""
+        SELECT COUNT(*) FROM information_schema.tables
+        WHERE table_schema = DATABASE() AND table_name = %s
+    """, (table,))
+    return cursor.fetchone()[0] > 0
+
+
+def _rebuild_table(cursor, table: str, create_new: str, copy_rows: str):
+    """Copy `table` into `<table>_new` and swap the two, resuming a swap a crash interrupted.
+
+    - `<table>_old` and `<table>` both exist: both renames happened, only the drop is left.
+    - `<table>_old` exists without `<table>`: the first rename happened; `<table>_new`
+      already holds the copied rows.
+    - Otherwise start over from a fresh `<table>_new`.
+    """
+    new, old = f"{table}_new", f"{table}_old"
+    if _table_exists(cursor, old):
+        if not _table_exists(cursor, table):
+            cursor.execute(f"ALTER TABLE {new} RENAME TO {table}")
+        cursor.execute(f"DROP TABLE {old}")
+        return
+    cursor.execute(f"DROP TABLE IF EXISTS {new}")
+    cursor.execute(create_new)
+    cursor.execute(copy_rows)
+    cursor.execute(f"ALTER TABLE {table} RENAME TO {old}")
+    cursor.execute(f"ALTER TABLE {new} RENAME TO {table}")
+    cursor.execute(f"DROP TABLE {old}")
+
+
+def _applied_versions(cursor) -> set:
+    cursor.execute("""
+        CREATE TABLE IF NOT EXISTS schema_migrations (
+            version INT PRIMARY KEY,
+            description VARCHAR(255),
+            applied_at DATETIME
+        )
+    """)
+    cursor.execute("SELECT version FROM schema_migrations")
+    return {row[0] for row in cursor.fetchall()}
+
+
+def run_migrations() -> list:
+    """Apply pending migrations once. Returns the versions applied by this call.
+
+    A host-wide file lock keeps gunicorn workers starting at the same time from
+    running the same migration twice; the first one applies, the rest find
+    nothing pending.
+    """
+    lock_path = os.getenv('schema_lock_path',
+                          os.path.join(tempfile.gettempdir(), 'finance_schema.lock'))
+    applied = []
+    with open(lock_path, 'w') as lock_file:
+        fcntl.flock(lock_file, fcntl.LOCK_EX)
+        try:
+            with get_connection() as connection:
+                cursor = connection.cursor()
+                done = _applied_versions(cursor)
+                for version, description, steps in MIGRATIONS:
+                    if version in done:
+                        continue
+                    for step in steps:
+                        if callable(step):
+                            step(cursor)
+                        else:
+                            cursor.execute(step)
+                    cursor.execute(
+                        "INSERT INTO schema_migrations (version, description, applied_at) VALUES (%s, %s, %s)",
+                        (version, description, datetime.now()))
+                    connection.commit()
+                    applied.append(version)
+                cursor.close()
+        finally:
+            fcntl.flock(lock_file, fcntl.LOCK_UN)
+    return applied
+
+
+if __name__ == '__main__':
+    versions = run_migrations()
+    print(f"Applied migrations: {versions}" if versions else "Schema is up to date")
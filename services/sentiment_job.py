@@ -0,0 +1,135 @@
+import fcntl
+import json
+import os
+import tempfile
+import threading
+import time
+from collections import OrderedDict
+
+from services.registry import get_ai_service, get_news_service
+
+
+class SentimentSnapshot:
+    """Market sentiment for the default news feed, scored once per refresh interval.
+
+    The scored snapshot is written to a shared JSON file. Every worker's refresher
+    first checks that file and only calls the LLM when it is stale, under a file
+    lock, so the whole host makes one sentiment call per interval. Page renders
+    read the in-memory copy.
+    """
+
+    def __init__(self, path: str, interval_seconds: float = 900, news_limit: int = 10,
+                 query_ttl_seconds: float = 900, max_queries: int = 500):
+        self.path = path
+        self.interval_seconds = interval_seconds
+        self.news_limit = news_limit
+        self.query_ttl_seconds = query_ttl_seconds
+        self.max_queries = max_queries
+        self._snapshot = None
+        self._query_cache = OrderedDict()  # query -> (sentiment, scored_at), least recent first
+        self._lock = threading.Lock()
+        self._stop = threading.Event()
+        self._thread = None
+
+    def _read_file(self):
+        try:
+            with open(self.path) as f:
+                return json.load(f)
+        except (FileNotFoundError, ValueError):
+            return None
+
+    def _is_fresh(self, snapshot) -> bool:
+        if snapshot is None:
+            return False
+        # A snapshot whose scoring failed is retried on the next check rather than a full interval later
+        max_age = self.interval_seconds if snapshot['sentiment'] is not None or not snapshot['articles'] \
+            else min(self.interval_seconds, 60)
+        return time.time() - snapshot['updated_at'] < max_age
+
+    def refresh(self):
+        """Load a fresh shared snapshot, or score the current headlines if there is none"""
+        snapshot = self._read_file()
+        if not self._is_fresh(snapshot):
+            with open(self.path + '.lock', 'w') as lock_file:
+                fcntl.flock(lock_file, fcntl.LOCK_EX)
+                try:
+                    snapshot = self._read_file()
+                    if not self._is_fresh(snapshot):
+                        snapshot = self._score_headlines()
+                finally:
+                    fcntl.flock(lock_file, fcntl.LOCK_UN)
+        with self._lock:
+            self._snapshot = snapshot
+
+    def _score_headlines(self) -> dict:
+        articles = get_news_service().get_market_news(limit=self.news_limit)
+        sentiment = None
+        if articles:
+            try:
+                sentiment = get_ai_service().get_market_sentiment(articles)
+            except Exception as e:
+                # Still publish the headlines so the default feed isn't empty
+                print(f"Failed to score market sentiment: {e}")
+        snapshot = {
+            'articles': articles,
+            'sentiment': sentiment,
+            'updated_at': time.time()
+        }
+        fd, tmp_path = tempfile.mkstemp(dir=os.path.dirname(self.path) or '.', suffix='.tmp')
+        with os.fdopen(fd, 'w') as f:
+            json.dump(snapshot, f)
+        os.replace(tmp_path, self.path)
+        return snapshot
+
+    def get(self):
+        """Latest {'articles', 'sentiment', 'updated_at'} snapshot, or None before the first refresh.
+
+        A process that has not refreshed yet, e.g. a background job forked before
+        the parent's first refresh, reads the shared file instead.
+        """
+        with self._lock:
+            snapshot = self._snapshot
+        return snapshot if snapshot is not None else self._read_file()
+
+    def get_query_sentiment(self, query: str, articles: list) -> dict:
+        """Score a custom search on demand, reusing the result for the same query within the TTL"""
+        key = query.strip().lower()
+        with self._lock:
+            cached = self._query_cache.get(key)
+            if cached and time.time() - cached[1] < self.query_ttl_seconds:
+                self._query_cache.move_to_end(key)
+                return cached[0]
+        sentiment = get_ai_service().get_market_sentiment(articles)
+        with self._lock:
+            self._query_cache[key] = (sentiment, time.time())
+            self._query_cache.move_to_end(key)
+            while len(self._query_cache) > self.max_queries:
+                self._query_cache.popitem(last=False)
+        return sentiment
+
+    def start(self):
+        """Start the background refresher once per process"""
+        with self._lock:
+            if self._thread is not None and self._thread.is_alive():
+                return
+            self._stop.clear()
+            self._thread = threading.Thread(target=self._run, name="sentiment-snapshot", daemon=True)
+            self._thread.start()
+
+    def stop(self):
+        self._stop.set()
+
+    def _run(self):
+        while not self._stop.is_set():
+            try:
+                self.refresh()
+            except Exception as e:
+                print(f"Failed to refresh market sentiment: {e}")
+            # Re-check often enough to pick up a snapshot another worker just wrote
+            self._stop.wait(min(self.interval_seconds, 60))
+
+
+sentiment_snapshot = SentimentSnapshot(
+    os.getenv('sentiment_snapshot_path',
+              os.path.join(tempfile.gettempdir(), 'market_sentiment.json')),
+    interval_seconds=float(os.getenv('sentiment_refresh_interval', 900)))
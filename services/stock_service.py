@@ -1,18 +1,211 @@
-import yfinance as yf
 import pandas as pd
 import numpy as np
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor, TimeoutError as FutureTimeoutError
+from services.quote_provider import QuoteProvider, YahooQuoteProvider
+from services.history_cache import history_cache
+from services.price_store import price_store
+
+# How far back each yfinance period reaches, used to trim incrementally extended frames
+PERIOD_OFFSETS = {
+    '1d': pd.DateOffset(days=1),
+    '5d': pd.DateOffset(days=5),
+    '1mo': pd.DateOffset(months=1),
+    '3mo': pd.DateOffset(months=3),
+    '6mo': pd.DateOffset(months=6),
+    '1y': pd.DateOffset(years=1),
+    '2y': pd.DateOffset(years=2),
+    '5y': pd.DateOffset(years=5),
+    '10y': pd.DateOffset(years=10)
+}
+
+INDEX_NAMES = {
+    '^GSPC': 'S&P 500',
+    '^DJI': 'Dow Jones',
+    '^IXIC': 'NASDAQ',
+    '^TNX': '10-YR Treasury'
+}
+
+# Periods from shortest to longest; a stored frame can serve any period at or below its own.
+# 'ytd' has no fixed length, so it is ranked separately in _period_covers.
+PERIOD_ORDER = ['1d', '5d', '1mo', '3mo', '6mo', '1y', '2y', '5y', '10y', 'max']
+
+# Per-request timeout handed to yfinance, so a stalled connection eventually frees its thread
+HISTORY_REQUEST_TIMEOUT = 10
+
+# Shared pool for bulk history fetches; a hung request must not block the caller on shutdown
+_history_executor = ThreadPoolExecutor(max_workers=8, thread_name_prefix="history-fetch")
+
+# Running fetches by (symbol, period, interval). A fetch that outlives its caller's deadline
+# keeps its pool thread until yfinance returns; later callers wait on that same future
+# instead of submitting another, so a hung symbol holds at most one thread.
+_history_inflight = {}
+_history_inflight_lock = threading.RLock()
 
 class StockService:
+    quote_provider: QuoteProvider = YahooQuoteProvider()
+    incremental_refresh: bool = True
+
+    @staticmethod
+    def set_quote_provider(provider: QuoteProvider):
+        """Swap the quote source, e.g. for a FixtureQuoteProvider in tests"""
+        StockService.quote_provider = provider
+
+    @staticmethod
+    def get_quotes(symbols: list) -> dict:
+        """Fetch last price and previous close for all symbols in one call"""
+        return StockService.quote_provider.get_quotes(list(symbols))
+
     @staticmethod
-    def get_stock_data(symbol: str, period: str = "1y") -> pd.DataFrame:
-        """Fetch stock data from Yahoo Finance"""
+    def get_stock_data(symbol: str, period: str = "1y", interval: str = "1d") -> pd.DataFrame:
+        """Fetch stock data from Yahoo Finance, served from the shared store or history cache when fresh.
+
+        With a price store configured, fresh frames are read-only views over the
+        memory-mapped file; they are not copied into the per-process history cache.
+        """
+        key = (symbol, period, interval)
+        stale, fetch_period = None, period
+        if price_store is not None:
+            stored, stored_period, age = price_store.load(symbol, interval)
+            if stored is not None and StockService._period_covers(stored_period, period):
+                if price_store.is_fresh(age):
+                    return StockService._trim_to_period(stored, period)
+                # Refresh the whole stored window so the shared file never shrinks
+                stale, fetch_period = stored, stored_period
+        else:
+            cached = history_cache.get(key)
+            if cached is not None:
+                return cached
+            stale = history_cache.peek(key)
+
+        import yfinance as yf
         try:
             stock = yf.Ticker(symbol)
-            hist = stock.history(period=period)
-            return hist
+            hist = None
+            if StockService.incremental_refresh and stale is not None and not stale.empty:
+                hist = StockService._extend_history(stock, stale, fetch_period, interval)
+            if hist is None:
+                hist = stock.history(period=fetch_period, interval=interval,
+                                     timeout=HISTORY_REQUEST_TIMEOUT)
         except Exception as e:
             raise Exception(f"Failed to fetch stock data for {symbol}: {e}")
 
+        if price_store is not None:
+            StockService._store_history(symbol, hist, fetch_period, interval)
+            return StockService._trim_to_period(hist, period) if fetch_period != period else hist
+        history_cache.put(key, hist)
+        return hist
+
+    @staticmethod
+    def get_many_histories(symbols: list, period: str = "1y", interval: str = "1d",
+                           timeout: float = 10.0) -> dict:
+        """Fetch histories for many symbols concurrently.
+
+        Each symbol gets up to `timeout` seconds from the start of the call. Symbols
+        that fail or time out are left out of the result instead of failing the batch.
+        A timed-out fetch is not interrupted (threads can't be); it finishes in the
+        background and is shared with any caller that asks for the same history.
+        """
+        futures = {
+            symbol: StockService._submit_history(symbol, period, interval)
+            for symbol in dict.fromkeys(symbols)
+        }
+        deadline = time.monotonic() + timeout
+        histories = {}
+        for symbol, future in futures.items():
+            try:
+                histories[symbol] = future.result(timeout=max(0, deadline - time.monotonic()))
+            except FutureTimeoutError:
+                print(f"Timed out fetching history for {symbol}")
+            except Exception as e:
+                print(f"Failed to fetch history for {symbol}: {e}")
+        return histories
+
+    @staticmethod
+    def _submit_history(symbol: str, period: str, interval: str):
+        """Return the running fetch for this history, starting one if there is none"""
+        key = (symbol, period, interval)
+        with _history_inflight_lock:
+            future = _history_inflight.get(key)
+            if future is None:
+                future = _history_executor.submit(StockService.get_stock_data, symbol, period, interval)
+                _history_inflight[key] = future
+                future.add_done_callback(lambda done: StockService._forget_history(key, done))
+            return future
+
+    @staticmethod
+    def _forget_history(key: tuple, future):
+        with _history_inflight_lock:
+            if _history_inflight.get(key) is future:
+                del _history_inflight[key]
+
+    @staticmethod
+    def _period_covers(stored_period: str, period: str) -> bool:
+        # A year-to-date window is anywhere from a day to a year long: only a year or more covers it
+        if period == 'ytd' and stored_period in PERIOD_ORDER:
+            return PERIOD_ORDER.index(stored_period) >= PERIOD_ORDER.index('1y')
+        if stored_period not in PERIOD_ORDER or period not in PERIOD_ORDER:
+            return stored_period == period
+        return PERIOD_ORDER.index(stored_period) >= PERIOD_ORDER.index(period)
+
+    @staticmethod
+    def _trim_to_period(frame: pd.DataFrame, period: str) -> pd.DataFrame:
+        """Slice positionally so a memory-mapped frame stays a view instead of being copied"""
+        if frame.empty:
+            return frame
+        last = frame.index[-1]
+        offset = PERIOD_OFFSETS.get(period)
+        if offset is not None:
+            return frame.iloc[frame.index.searchsorted(last - offset, side='right'):]
+        if period == 'ytd':
+            year_start = pd.Timestamp(year=last.year, month=1, day=1, tz=last.tz)
+            return frame.iloc[frame.index.searchsorted(year_start):]
+        return frame
+
+    @staticmethod
+    def _store_history(symbol: str, hist: pd.DataFrame, period: str, interval: str):
+        """Persist to the shared store unless it already holds a longer, fresh window"""
+        try:
+            stored_period, age = price_store.info(symbol, interval)
+            if (price_store.is_fresh(age) and stored_period != period
+                    and StockService._period_covers(stored_period, period)):
+                return
+            price_store.save(symbol, hist, period, interval)
+        except Exception as e:
+            print(f"Failed to persist price history for {symbol}: {e}")
+
+    @staticmethod
+    def _extend_history(stock, stale: pd.DataFrame, period: str, interval: str):
+        """Fetch only the bars since the last completed cached one and append them.
+
+        The newest cached bar may be a partial one from the open session, so the
+        overlap is checked on the bar before it and everything after that bar is
+        replaced. Returns None when the cached frame can't be extended, e.g.
+        because a split or dividend changed the adjusted prices of bars we
+        already have.
+        """
+        if len(stale) < 2:
+            return None
+        anchor = stale.index[-2]
+        new_bars = stock.history(start=anchor.date(), interval=interval,
+                                 timeout=HISTORY_REQUEST_TIMEOUT)
+        if new_bars.empty:
+            return stale
+
+        # The overlapping bar must still match; adjusted history shifts after splits/dividends
+        if anchor not in new_bars.index:
+            return None
+        overlap_close = new_bars.loc[anchor, 'Close']
+        if not np.isclose(overlap_close, stale.loc[anchor, 'Close'], rtol=1e-6):
+            return None
+        for column in ('Dividends', 'Stock Splits'):
+            if column in new_bars and (new_bars.loc[new_bars.index > anchor, column] != 0).any():
+                return None
+
+        merged = pd.concat([stale[stale.index <= anchor], new_bars[new_bars.index > anchor]])
+        return StockService._trim_to_period(merged.sort_index(), period)
+
     @staticmethod
     def get_portfolio_performance(positions: dict) -> dict:
         """Calculate portfolio performance"""
@@ -22,10 +215,12 @@ class StockService:
             'holdings': []
         }
         
+        quotes = StockService.get_quotes(positions.keys())
+
         for symbol, quantity in positions.items():
-            stock = yf.Ticker(symbol)
-            current_price = stock.info.get('regularMarketPrice', 0)
-            prev_close = stock.info.get('previousClose', 0)
+            quote = quotes.get(symbol, {})
+            current_price = quote.get('price', 0)
+            prev_close = quote.get('previous_close', 0)
             
             position_value = current_price * quantity
             daily_change = (current_price - prev_close) * quantity
@@ -43,18 +238,20 @@ class StockService:
         return performance
 
     @staticmethod
-    def get_market_summary() -> dict:
+    def get_market_summary(indices: list = None) -> dict:
         """Get summary of major market indices"""
-        indices = ['^GSPC', '^DJI', '^IXIC']  # S&P 500, Dow Jones, NASDAQ
+        indices = indices or ['^GSPC', '^DJI', '^IXIC']  # S&P 500, Dow Jones, NASDAQ
+        quotes = StockService.get_quotes(indices)
         summary = {}
-        
+
         for index in indices:
-            idx = yf.Ticker(index)
-            info = idx.info
+            quote = quotes.get(index, {})
+            price = quote.get('price', 0)
+            prev_close = quote.get('previous_close', 0)
             summary[index] = {
-                'name': info.get('shortName', ''),
-                'price': info.get('regularMarketPrice', 0),
-                'change': info.get('regularMarketChangePercent', 0)
+                'name': INDEX_NAMES.get(index, index),
+                'price': price,
+                'change': (price - prev_close) / prev_close * 100 if prev_close else 0
             }
-            
+
         return summary
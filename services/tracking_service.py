@@ -1,44 +1,194 @@
 import streamlit as st
-import os
-import singlestoredb as s2
+from services.database import get_connection
 from datetime import datetime
+import atexit
 import json
+import os
+import queue
+import sys
+import threading
+import time
+
+INSERT_PREFIX = "INSERT INTO user_activities (user_id, activity_type, details, timestamp) VALUES "
+
+
+class ActivityLogger:
+    """Non-blocking activity logger.
+
+    Callers enqueue events into a bounded in-memory queue; a background thread
+    writes them in multi-row INSERTs once `batch_size` events are waiting or
+    `flush_interval` seconds have passed. When the queue is full the
+    `backpressure` policy decides what happens: "drop" the event, "block" the
+    caller, or "spill" it to a local JSON-lines file that is replayed later.
+    """
+
+    def __init__(self, max_queue: int = 10000, batch_size: int = 500,
+                 flush_interval: float = 2.0, backpressure: str = "drop",
+                 spill_path: str = None):
+        if backpressure not in ("drop", "block", "spill"):
+            raise ValueError(f"Unknown backpressure policy: {backpressure}")
+        self.batch_size = batch_size
+        self.flush_interval = flush_interval
+        self.backpressure = backpressure
+        self.spill_path = spill_path or os.path.join(os.getcwd(), "activity_spill.jsonl")
+        self._queue = queue.Queue(maxsize=max_queue)
+        self._spill_lock = threading.Lock()
+        self._stop = threading.Event()
+        self._thread = None
+        self._start_lock = threading.Lock()
+        self.enqueued = 0
+        self.dropped = 0
+        self.spilled = 0
+        self.written = 0
+        self.failed = 0
+
+    def log(self, user_id: str, activity_type: str, details: dict = None):
+        """Enqueue an event; never touches the database on the caller's thread"""
+        self._ensure_started()
+        event = (user_id, activity_type, json.dumps(details), datetime.now().isoformat(sep=' '))
+        try:
+            if self.backpressure == "block":
+                self._queue.put(event)
+            else:
+                self._queue.put_nowait(event)
+            self.enqueued += 1
+        except queue.Full:
+            if self.backpressure == "spill":
+                self._spill([event])
+            else:
+                self.dropped += 1
+
+    def _ensure_started(self):
+        if self._thread is not None:
+            return
+        with self._start_lock:
+            if self._thread is None:
+                self._thread = threading.Thread(target=self._run, name="activity-writer", daemon=True)
+                self._thread.start()
+                atexit.register(self.shutdown)
+                # Forked background jobs exit without running atexit hooks, only
+                # their process library's finalizers
+                for name in ('multiprocess.util', 'multiprocessing.util'):
+                    if name in sys.modules:
+                        sys.modules[name].Finalize(self, self.shutdown, exitpriority=10)
+
+    def _reset_after_fork(self):
+        """Start over in a forked child, which inherits the parent's queue but not its writer.
+
+        Events the parent queued stay the parent's to write. Locks are recreated in
+        case another thread held them at fork time.
+        """
+        self._queue = queue.Queue(maxsize=self._queue.maxsize)
+        self._spill_lock = threading.Lock()
+        self._start_lock = threading.Lock()
+        self._stop = threading.Event()
+        self._thread = None
+
+    def _run(self):
+        while not self._stop.is_set():
+            batch = self._collect_batch()
+            if batch:
+                self._write(batch)
+            elif os.path.exists(self.spill_path):
+                self._replay_spill()
+        self._drain()
+
+    def _collect_batch(self) -> list:
+        batch = []
+        deadline = time.monotonic() + self.flush_interval
+        while len(batch) < self.batch_size:
+            remaining = deadline - time.monotonic()
+            if remaining <= 0 or self._stop.is_set():
+                break
+            try:
+                batch.append(self._queue.get(timeout=remaining))
+            except queue.Empty:
+                break
+        return batch
+
+    def _write(self, batch: list):
+        placeholders = ", ".join(["(%s, %s, %s, %s)"] * len(batch))
+        params = [value for event in batch for value in event]
+        try:
+            with get_connection() as connection:
+                cursor = connection.cursor()
+                cursor.execute(INSERT_PREFIX + placeholders, params)
+                connection.commit()
+                cursor.close()
+            self.written += len(batch)
+        except Exception as e:
+            print(f"Failed to write {len(batch)} activity events: {e}")
+            self.failed += len(batch)
+            if self.backpressure == "spill":
+                self._spill(batch)
+
+    def _spill(self, events: list):
+        with self._spill_lock:
+            with open(self.spill_path, "a") as f:
+                for event in events:
+                    f.write(json.dumps(event) + "\n")
+        self.spilled += len(events)
+
+    def _replay_spill(self):
+        """Move spilled events back into the database once the queue is idle"""
+        with self._spill_lock:
+            # Every worker replays the shared spill file; each claims it under its own name
+            replay_path = f"{self.spill_path}.replay.{os.getpid()}"
+            try:
+                os.replace(self.spill_path, replay_path)
+            except FileNotFoundError:
+                return
+        with open(replay_path) as f:
+            events = [tuple(json.loads(line)) for line in f if line.strip()]
+        os.remove(replay_path)
+        for start in range(0, len(events), self.batch_size):
+            self._write(events[start:start + self.batch_size])
+
+    def _drain(self):
+        batch = []
+        while True:
+            try:
+                batch.append(self._queue.get_nowait())
+            except queue.Empty:
+                break
+            if len(batch) >= self.batch_size:
+                self._write(batch)
+                batch = []
+        if batch:
+            self._write(batch)
+
+    def shutdown(self, timeout: float = 10.0):
+        """Stop the writer and flush everything still queued"""
+        self._stop.set()
+        if self._thread is not None:
+            self._thread.join(timeout)
+
+    def stats(self) -> dict:
+        return {
+            'queued': self._queue.qsize(),
+            'enqueued': self.enqueued,
+            'dropped': self.dropped,
+            'spilled': self.spilled,
+            'written': self.written,
+            'failed': self.failed
+        }
+
+
+activity_logger = ActivityLogger(
+    max_queue=int(os.getenv('activity_queue_size', 10000)),
+    batch_size=int(os.getenv('activity_batch_size', 500)),
+    flush_interval=float(os.getenv('activity_flush_interval', 2.0)),
+    backpressure=os.getenv('activity_backpressure', 'drop'),
+    spill_path=os.getenv('activity_spill_path'))
+
+# Background jobs fork from a worker that may already be running the writer thread
+os.register_at_fork(after_in_child=activity_logger._reset_after_fork)
+
 
 class TrackingService:
     @staticmethod
     def log_activity(activity_type: str, details: dict = None):
-        """Log user activity to database"""
-        config = {
-            "host": os.getenv('host'),
-            "port": os.getenv('port'),
-            "user": os.getenv('user'),
-            "password": os.getenv('password'),
-            "database": os.getenv('database')
-        }
-        
-        connection = s2.connect(**config)
-        cursor = connection.cursor()
-        
-        # Create table if it doesn't exist
-        cursor.execute("""
-            CREATE TABLE IF NOT EXISTS user_activities (
-                id BIGINT AUTO_INCREMENT PRIMARY KEY,
-                user_id VARCHAR(100),
-                activity_type VARCHAR(50),
-                details JSON,
-                timestamp DATETIME
-            )
-        """)
-        
+        """Queue a user activity for the background writer"""
         # Get user_id from session state
         user_id = st.session_state.get('user_id', 'anonymous')
-        
-        # Insert activity
-        cursor.execute(
-            "INSERT INTO user_activities (user_id, activity_type, details, timestamp) VALUES (%s, %s, %s, %s)",
-            (user_id, activity_type, json.dumps(details), datetime.now())
-        )
-        
-        connection.commit()
-        cursor.close()
-        connection.close()
+        activity_logger.log(user_id, activity_type, details)
@@ -0,0 +1,67 @@
+import json
+import threading
+import time
+from types import SimpleNamespace
+
+import pytest
+
+from services import ai_service
+from services.ai_service import AIService
+from services.llm_cache import LLMCache, MemoryBackend
+
+INSIGHTS = {'summary': 'Concentrated in tech', 'risks': ['single sector'],
+            'opportunities': [], 'recommendations': ['add bonds']}
+
+
+class FakeClient:
+    """Local stand-in for the Anthropic SDK with a configurable delay and failure"""
+
+    def __init__(self, reply: dict, delay: float = 0.0, error: Exception = None):
+        self.reply = reply
+        self.delay = delay
+        self.error = error
+        self.messages = self
+
+    def create(self, model, messages, max_tokens):
+        time.sleep(self.delay)
+        if self.error is not None:
+            raise self.error
+        return SimpleNamespace(content=[SimpleNamespace(text=json.dumps(self.reply))], usage=None)
+
+
+@pytest.fixture(autouse=True)
+def empty_cache(monkeypatch):
+    monkeypatch.setattr(ai_service, 'llm_cache', LLMCache(MemoryBackend()))
+
+
+def test_tasks_run_side_by_side():
+    service = AIService(client=FakeClient(INSIGHTS, delay=0.3))
+    started = time.monotonic()
+
+    results, errors = AIService.run_concurrently({
+        'first': lambda: service.get_portfolio_insights({'AAPL': 10}),
+        'second': lambda: service.get_portfolio_insights({'MSFT': 5})
+    })
+
+    assert time.monotonic() - started < 0.55
+    assert errors == {}
+    assert results == {'first': INSIGHTS, 'second': INSIGHTS}
+
+
+def test_failures_and_timeouts_do_not_hide_finished_results():
+    release = threading.Event()
+    service = AIService(client=FakeClient(INSIGHTS))
+    failing = AIService(client=FakeClient(INSIGHTS, error=RuntimeError("overloaded")))
+
+    try:
+        results, errors = AIService.run_concurrently({
+            'analysis': lambda: service.get_portfolio_insights({'AAPL': 10}),
+            'sentiment': lambda: failing.get_market_sentiment([]),
+            'slow': lambda: release.wait(5)
+        }, timeout=0.2)
+    finally:
+        release.set()
+
+    assert results == {'analysis': INSIGHTS}
+    assert errors['sentiment'] == "Failed to analyze market sentiment: overloaded"
+    assert errors['slow'] == "Timed out after 0.2s"
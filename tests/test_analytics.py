@@ -0,0 +1,64 @@
+import numpy as np
+import pandas as pd
+import pytest
+
+from utils.analytics import TRADING_DAYS, compute_portfolio_analytics, max_drawdowns, returns_matrix
+
+
+@pytest.fixture
+def prices():
+    index = pd.date_range('2023-12-01', periods=60, freq='B')
+    rng = np.random.default_rng(7)
+    steps = 1 + rng.normal(0, 0.01, size=(60, 3))
+    return pd.DataFrame(100 * np.cumprod(steps, axis=0), index=index, columns=['AAPL', 'MSFT', 'XOM'])
+
+
+def test_single_portfolio_matches_pandas(prices):
+    returns = returns_matrix(prices)
+    quantities = pd.Series({'AAPL': 10, 'MSFT': 5, 'XOM': 0})
+    last = prices.iloc[-1]
+
+    metrics = compute_portfolio_analytics(returns, quantities, last)
+
+    values = quantities * last
+    weights = values / values.sum()
+    daily = prices.pct_change().iloc[1:] @ weights
+    assert metrics['total_value'] == pytest.approx(values.sum())
+    assert metrics['daily_return'] == pytest.approx(daily.iloc[-1])
+    assert metrics['period_return'] == pytest.approx((1 + daily).prod() - 1)
+    assert metrics['ytd_return'] == pytest.approx((1 + daily[daily.index.year == 2024]).prod() - 1)
+    assert metrics['volatility'] == pytest.approx(daily.std() * np.sqrt(TRADING_DAYS))
+    assert metrics['diversification_score'] == pytest.approx(1 - (weights ** 2).sum())
+
+
+def test_batch_rows_match_single_portfolios(prices):
+    returns = returns_matrix(prices)
+    last = prices.iloc[-1]
+    benchmark = prices['XOM'].pct_change()
+    portfolios = pd.DataFrame({'AAPL': [10, 0], 'MSFT': [5, 3], 'XOM': [0, 7]}, index=['u1', 'u2'])
+
+    batch = compute_portfolio_analytics(returns, portfolios, last, benchmark=benchmark)
+
+    for row, user in enumerate(portfolios.index):
+        single = compute_portfolio_analytics(returns, portfolios.loc[user], last, benchmark=benchmark)
+        for key in ('total_value', 'ytd_return', 'volatility', 'sharpe', 'max_drawdown', 'beta'):
+            assert batch[key][row] == pytest.approx(single[key]), key
+
+
+def test_beta_against_itself_is_one(prices):
+    returns = returns_matrix(prices)
+    metrics = compute_portfolio_analytics(returns, pd.Series({'MSFT': 1}), prices.iloc[-1],
+                                          benchmark=prices['MSFT'].pct_change())
+    assert metrics['beta'] == pytest.approx(1.0)
+
+
+def test_max_drawdown_is_the_worst_fall_from_a_peak():
+    growth = np.array([[1.0, 1.2, 0.9, 1.1, 0.6, 1.3]])
+    assert max_drawdowns(growth)[0] == pytest.approx(0.6 / 1.2 - 1)
+
+
+def test_empty_portfolio_has_zero_weights(prices):
+    metrics = compute_portfolio_analytics(returns_matrix(prices), pd.Series({'AAPL': 0}), prices.iloc[-1])
+    assert metrics['total_value'] == 0
+    assert metrics['volatility'] == 0
+    assert metrics['sharpe'] == 0
@@ -0,0 +1,54 @@
+import numpy as np
+import pandas as pd
+import pytest
+from scipy import sparse
+
+from services.batch_analytics import build_quantity_matrix, compute_batch_metrics
+from utils.analytics import compute_portfolio_analytics
+
+DATES = pd.bdate_range('2024-01-02', periods=60)
+PRICES = pd.Series({'AAPL': 190.0, 'MSFT': 410.0, 'XOM': 110.0, 'NEWCO': 25.0})
+
+
+@pytest.fixture
+def returns():
+    rng = np.random.default_rng(7)
+    return pd.DataFrame(rng.normal(0.0005, 0.01, (3, len(DATES))),
+                        index=['AAPL', 'MSFT', 'XOM'], columns=DATES)
+
+
+def test_quantity_matrix_sums_duplicate_rows():
+    positions = pd.DataFrame({'user_id': ['u1', 'u1', 'u2', 'u1'],
+                              'symbol': ['AAPL', 'MSFT', 'AAPL', 'AAPL'],
+                              'quantity': [1, 2, 3, 4]})
+    users, symbols, Q = build_quantity_matrix(positions)
+    assert users == ['u1', 'u2'] and symbols == ['AAPL', 'MSFT']
+    assert Q.toarray().tolist() == [[5, 2], [3, 0]]
+
+
+def test_matches_the_per_user_engine_including_symbols_without_history(returns):
+    # NEWCO has a price but no history: both paths drop it from the return series
+    symbols = list(PRICES.index)
+    holdings = [{'AAPL': 10, 'MSFT': 5, 'NEWCO': 40}, {'XOM': 20}, {'NEWCO': 8}]
+    Q = sparse.csr_matrix([[h.get(s, 0) for s in symbols] for h in holdings], dtype=float)
+    benchmark = returns.loc['MSFT'] * 0.8
+
+    batch = compute_batch_metrics(Q, symbols, PRICES, PRICES * 0.99, returns, benchmark=benchmark)
+
+    for row, held in enumerate(holdings):
+        single = compute_portfolio_analytics(returns, pd.Series(held, dtype=float), PRICES,
+                                             benchmark=benchmark)
+        for metric in ('ytd_return', 'volatility', 'sharpe', 'max_drawdown'):
+            assert batch.loc[row, metric] == pytest.approx(single[metric], abs=1e-12), metric
+        if not np.isnan(single['beta']):
+            assert batch.loc[row, 'beta'] == pytest.approx(single['beta'])
+    assert batch.loc[0, 'total_value'] == pytest.approx(10 * 190 + 5 * 410 + 40 * 25)
+    assert batch.loc[2, 'volatility'] == 0
+
+
+def test_value_and_daily_change(returns):
+    Q = sparse.csr_matrix([[2.0, 0, 0, 0]])
+    metrics = compute_batch_metrics(Q, list(PRICES.index), PRICES, PRICES - 1, returns)
+    assert metrics.loc[0, 'total_value'] == 380
+    assert metrics.loc[0, 'daily_change'] == 2
+    assert metrics.loc[0, 'diversification_score'] == 0
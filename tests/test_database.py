@@ -0,0 +1,126 @@
+import sqlite3
+import threading
+import time
+
+import pytest
+
+from services.database import ConnectionPool
+
+
+def sqlite_factory(path):
+    opened = []
+
+    def connect():
+        conn = sqlite3.connect(path, check_same_thread=False)
+        opened.append(conn)
+        return conn
+    return connect, opened
+
+
+@pytest.fixture
+def db_path(tmp_path):
+    path = str(tmp_path / "pool.sqlite")
+    conn = sqlite3.connect(path)
+    conn.execute("CREATE TABLE items (name TEXT)")
+    conn.commit()
+    conn.close()
+    return path
+
+
+def test_connections_are_reused(db_path):
+    connect, opened = sqlite_factory(db_path)
+    pool = ConnectionPool(connect, max_size=2)
+    with pool.connection() as first:
+        pass
+    with pool.connection() as second:
+        pass
+    assert first is second
+    assert len(opened) == 1
+    assert pool.metrics()['checkouts'] == 2
+
+
+def test_checkout_times_out_when_pool_is_exhausted(db_path):
+    connect, _ = sqlite_factory(db_path)
+    pool = ConnectionPool(connect, max_size=1, checkout_timeout=0.1)
+    with pool.connection():
+        started = time.monotonic()
+        with pytest.raises(Exception, match="Timed out waiting for a database connection"):
+            with pool.connection():
+                pass
+        assert time.monotonic() - started >= 0.1
+    assert pool.metrics()['waiting'] == 0
+
+
+def test_waiter_gets_connection_when_released(db_path):
+    connect, _ = sqlite_factory(db_path)
+    pool = ConnectionPool(connect, max_size=1, checkout_timeout=5)
+    borrowed = []
+
+    def borrow():
+        with pool.connection() as conn:
+            borrowed.append(conn)
+
+    with pool.connection() as held:
+        thread = threading.Thread(target=borrow)
+        thread.start()
+        time.sleep(0.05)
+        assert pool.metrics()['waiting'] == 1
+    thread.join(timeout=5)
+    assert borrowed == [held]
+
+
+def test_old_connections_are_recycled(db_path):
+    connect, opened = sqlite_factory(db_path)
+    pool = ConnectionPool(connect, max_size=1, max_age_seconds=0.05)
+    with pool.connection() as first:
+        pass
+    time.sleep(0.1)
+    with pool.connection() as second:
+        pass
+    assert first is not second
+    assert len(opened) == 2
+    assert pool.metrics()['recycled'] == 1
+    with pytest.raises(sqlite3.ProgrammingError):
+        first.execute("SELECT 1")
+
+
+def test_broken_idle_connection_is_replaced(db_path):
+    connect, opened = sqlite_factory(db_path)
+    pool = ConnectionPool(connect, max_size=1, health_check_after=0)
+    with pool.connection() as first:
+        pass
+    first.close()
+    with pool.connection() as second:
+        assert second.execute("SELECT 1").fetchone() == (1,)
+    assert len(opened) == 2
+
+
+def test_uncommitted_work_is_rolled_back_on_return(db_path):
+    connect, _ = sqlite_factory(db_path)
+    pool = ConnectionPool(connect, max_size=1)
+    with pool.connection() as conn:
+        conn.execute("INSERT INTO items VALUES ('abandoned')")
+    with pool.connection() as conn:
+        conn.execute("INSERT INTO items VALUES ('kept')")
+        conn.commit()
+    with pool.connection() as conn:
+        assert conn.execute("SELECT name FROM items").fetchall() == [('kept',)]
+
+
+def test_rollback_failure_discards_connection(db_path):
+    class Unrollbackable:
+        def __init__(self, raw):
+            self.raw = raw
+
+        def rollback(self):
+            raise sqlite3.OperationalError("connection lost")
+
+        def close(self):
+            self.raw.close()
+
+    connect, opened = sqlite_factory(db_path)
+    pool = ConnectionPool(lambda: Unrollbackable(connect()), max_size=1)
+    with pool.connection():
+        pass
+    metrics = pool.metrics()
+    assert metrics['size'] == 0 and metrics['idle'] == 0 and metrics['recycled'] == 1
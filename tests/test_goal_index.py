@@ -0,0 +1,77 @@
+import os
+import threading
+import time
+
+import pytest
+
+from services.goal_index import GoalIndex, goal_constraints, goal_index
+
+PLAN = {'optimized_holdings': [{'symbol': 'VTI', 'quantity': 10, 'target_allocation': 1.0}],
+        'rationale': 'Broad market'}
+
+
+def index_with(goal: str) -> GoalIndex:
+    index = GoalIndex()
+    index.add(goal, PLAN)
+    return index
+
+
+def test_reworded_goal_reuses_plan():
+    index = index_with("retire in 30 years with aggressive growth")
+    plan, score = index.lookup("I want to retire in 30 years with aggressive growth")
+    assert plan == PLAN and score >= index.threshold
+
+
+@pytest.mark.parametrize("stored, asked", [
+    ("retire in 30 years with aggressive growth", "retire in 5 years with aggressive growth"),
+    ("avoid tech stocks, save for retirement", "save for retirement with tech stocks"),
+    ("save $500,000 for a house", "save $50,000 for a house"),
+    ("income portfolio without crypto", "income portfolio with crypto"),
+])
+def test_goals_with_different_numbers_or_negations_do_not_reuse_plan(stored, asked):
+    assert index_with(stored).lookup(asked)[0] is None
+    assert index_with(asked).lookup(stored)[0] is None
+
+
+def test_constraints():
+    assert goal_constraints("Don't buy tech; $1,000,000 by 2045") == (('1000000', '2045'), ('dont',))
+    assert goal_constraints("steady income") == ((), ())
+
+
+def test_shared_file_is_loaded_by_other_instances(tmp_path):
+    path = str(tmp_path / "goals.jsonl")
+    GoalIndex(path=path).add("aggressive growth for 30 years", PLAN)
+    assert GoalIndex(path=path).lookup("aggressive growth for 30 years")[0] == PLAN
+
+
+def test_file_is_compacted_to_newest_entries(tmp_path):
+    path = str(tmp_path / "goals.jsonl")
+    index = GoalIndex(path=path, max_entries=2)
+    for years in range(5):
+        index.add(f"retire in {years + 10} years", {'years': years})
+    with open(path) as f:
+        assert len(f.readlines()) <= 4
+    assert GoalIndex(path=path).lookup("retire in 14 years")[0] == {'years': 4}
+
+
+def test_forked_child_can_use_index_while_parent_syncs():
+    held = threading.Event()
+
+    def sync_in_progress():
+        with goal_index._lock:
+            held.set()
+            time.sleep(0.2)
+
+    thread = threading.Thread(target=sync_in_progress)
+    thread.start()
+    held.wait()
+    pid = os.fork()
+    if pid == 0:
+        # A deadlock here is turned into a failure by the alarm
+        import signal
+        signal.alarm(5)
+        goal_index.lookup("retire early")
+        os._exit(0)
+    thread.join()
+    _, status = os.waitpid(pid, 0)
+    assert os.waitstatus_to_exitcode(status) == 0
@@ -0,0 +1,59 @@
+import time
+
+import pandas as pd
+
+from services.history_cache import HistoryCache
+
+
+def frame(rows: int) -> pd.DataFrame:
+    return pd.DataFrame({'Close': range(rows)}, index=pd.date_range('2024-01-01', periods=rows))
+
+
+def test_expired_entries_miss_but_can_be_peeked():
+    cache = HistoryCache(ttl_seconds=0.05)
+    cache.put(('AAPL', '1y', '1d'), frame(10))
+    assert cache.get(('AAPL', '1y', '1d')) is not None
+    time.sleep(0.1)
+    assert cache.get(('AAPL', '1y', '1d')) is None
+    assert cache.peek(('AAPL', '1y', '1d')) is not None
+    assert cache.stats()['hits'] == 1 and cache.stats()['misses'] == 1
+
+
+def test_least_recently_used_entry_is_evicted_at_the_cap():
+    size = HistoryCache._frame_size(frame(100))
+    cache = HistoryCache(max_bytes=size * 2)
+    cache.put(('A',), frame(100))
+    cache.put(('B',), frame(100))
+    cache.get(('A',))
+    cache.put(('C',), frame(100))
+
+    assert cache.peek(('B',)) is None
+    assert cache.peek(('A',)) is not None and cache.peek(('C',)) is not None
+    stats = cache.stats()
+    assert stats['evictions'] == 1
+    assert stats['entries'] == 2
+    assert stats['bytes'] == size * 2
+
+
+def test_replacing_an_entry_does_not_double_count_it():
+    cache = HistoryCache()
+    cache.put(('A',), frame(100))
+    cache.put(('A',), frame(100))
+    assert cache.stats()['bytes'] == HistoryCache._frame_size(frame(100))
+
+
+def test_frames_larger_than_the_cap_are_not_cached():
+    cache = HistoryCache(max_bytes=HistoryCache._frame_size(frame(10)))
+    cache.put(('big',), frame(1000))
+    assert cache.peek(('big',)) is None
+    assert cache.stats()['bytes'] == 0
+
+
+def test_invalidate():
+    cache = HistoryCache()
+    cache.put(('A',), frame(10))
+    cache.put(('B',), frame(10))
+    cache.invalidate(('A',))
+    assert cache.peek(('A',)) is None and cache.peek(('B',)) is not None
+    cache.invalidate()
+    assert cache.stats()['entries'] == 0 and cache.stats()['bytes'] == 0
@@ -0,0 +1,86 @@
+import json
+import time
+from types import SimpleNamespace
+
+import pytest
+
+from services import ai_service
+from services.ai_service import AIService
+from services.llm_cache import LLMCache, MemoryBackend, SQLiteBackend, cache_key
+
+
+class FakeClient:
+    """Stands in for anthropic.Anthropic: replies with a fixed JSON object"""
+
+    def __init__(self, reply: dict):
+        self.reply = reply
+        self.calls = 0
+        self.messages = self
+
+    def create(self, model, messages, max_tokens):
+        self.calls += 1
+        return SimpleNamespace(content=[SimpleNamespace(text=json.dumps(self.reply))],
+                               usage=SimpleNamespace(input_tokens=120, output_tokens=30))
+
+
+def test_key_depends_on_model_prompt_and_max_tokens():
+    key = cache_key('model-a', 'prompt', 1000)
+    assert key == cache_key('model-a', 'prompt', 1000)
+    assert key != cache_key('model-b', 'prompt', 1000)
+    assert key != cache_key('model-a', 'prompt ', 1000)
+    assert key != cache_key('model-a', 'prompt', 500)
+
+
+def test_hits_count_the_latency_and_tokens_they_saved():
+    cache = LLMCache(MemoryBackend())
+    assert cache.get('k') is None
+    cache.set('k', {'summary': 'ok'}, seconds=2.5, tokens=150)
+
+    assert cache.get('k') == {'summary': 'ok'}
+    assert cache.get('k') == {'summary': 'ok'}
+    stats = cache.stats()
+    assert (stats['hits'], stats['misses']) == (2, 1)
+    assert stats['llm_seconds_saved'] == pytest.approx(5.0)
+    assert stats['tokens_saved'] == 300
+
+
+def test_memory_backend_expires_and_evicts_least_recent():
+    backend = MemoryBackend(max_entries=2)
+    backend.set('a', '1', ttl=60)
+    backend.set('b', '2', ttl=60)
+    backend.get('a')
+    backend.set('c', '3', ttl=60)
+    assert backend.get('b') is None
+    assert backend.get('a') == '1'
+
+    backend.set('short', 'x', ttl=0.01)
+    time.sleep(0.02)
+    assert backend.get('short') is None
+
+
+def test_sqlite_backend_is_shared_between_instances(tmp_path):
+    path = str(tmp_path / 'llm_cache.sqlite')
+    writer = SQLiteBackend(path, max_entries=2)
+    reader = SQLiteBackend(path, max_entries=2)
+    writer.set('a', '1', ttl=60)
+    writer.set('b', '2', ttl=60)
+    assert reader.get('a') == '1'
+    writer.set('c', '3', ttl=60)
+
+    assert reader.get('b') is None
+    assert reader.get('a') == '1' and reader.get('c') == '3'
+
+
+def test_identical_requests_reach_the_model_once(monkeypatch):
+    monkeypatch.setattr(ai_service, 'llm_cache', LLMCache(MemoryBackend()))
+    client = FakeClient({'overall_sentiment': 'neutral', 'confidence': 0.5,
+                         'key_factors': [], 'market_outlook': 'flat'})
+    service = AIService(client=client)
+    articles = [{'title': 'Markets flat', 'description': 'Nothing happened', 'source': {'name': 'Wire'}}]
+
+    first = service.get_market_sentiment(articles)
+    second = service.get_market_sentiment(articles)
+
+    assert first == second
+    assert client.calls == 1
+    assert ai_service.llm_cache.stats()['tokens_saved'] == 150
@@ -0,0 +1,105 @@
+import threading
+import time
+
+from services.news_cache import NewsCache
+
+
+def test_fresh_entries_are_served_from_cache():
+    cache = NewsCache(ttl_seconds=60)
+    calls = []
+    fetch = lambda: calls.append(1) or ['article']
+    assert cache.get_or_fetch(('k',), fetch) == ['article']
+    assert cache.get_or_fetch(('k',), fetch) == ['article']
+    assert len(calls) == 1
+    assert cache.stats()['hits'] == 1 and cache.stats()['misses'] == 1
+
+
+def test_concurrent_misses_share_one_fetch():
+    cache = NewsCache(ttl_seconds=60)
+    release = threading.Event()
+    calls = []
+
+    def fetch():
+        calls.append(1)
+        release.wait(5)
+        return ['article']
+
+    results = []
+    threads = [threading.Thread(target=lambda: results.append(cache.get_or_fetch(('k',), fetch)))
+               for _ in range(8)]
+    for thread in threads:
+        thread.start()
+    deadline = time.monotonic() + 5
+    while cache.stats()['coalesced'] < 7 and time.monotonic() < deadline:
+        time.sleep(0.01)
+    release.set()
+    for thread in threads:
+        thread.join(timeout=5)
+
+    assert results == [['article']] * 8
+    assert len(calls) == 1
+    assert cache.stats()['coalesced'] == 7
+
+
+def test_failed_fetch_reaches_every_waiter_and_is_not_cached():
+    cache = NewsCache(ttl_seconds=60)
+
+    def fail():
+        raise RuntimeError("quota exceeded")
+
+    for _ in range(2):
+        try:
+            cache.get_or_fetch(('k',), fail)
+        except RuntimeError as e:
+            assert str(e) == "quota exceeded"
+        else:
+            raise AssertionError("expected the fetch error")
+    assert cache.get_or_fetch(('k',), lambda: ['article']) == ['article']
+
+
+def test_stale_entry_is_served_while_one_revalidation_runs():
+    cache = NewsCache(ttl_seconds=0.05, stale_seconds=60)
+    cache.get_or_fetch(('k',), lambda: ['old'])
+    time.sleep(0.1)
+
+    release = threading.Event()
+    calls = []
+
+    def refetch():
+        calls.append(1)
+        release.wait(5)
+        return ['new']
+
+    assert cache.get_or_fetch(('k',), refetch) == ['old']
+    assert cache.get_or_fetch(('k',), refetch) == ['old']
+    release.set()
+    deadline = time.monotonic() + 5
+    while cache.stats()['fetches'] < 2 and time.monotonic() < deadline:
+        time.sleep(0.01)
+
+    assert len(calls) == 1
+    assert cache.get_or_fetch(('k',), refetch) == ['new']
+    assert cache.stats()['stale_hits'] == 2
+
+
+def test_entries_past_the_stale_window_are_refetched():
+    cache = NewsCache(ttl_seconds=0.01, stale_seconds=0.01)
+    cache.get_or_fetch(('k',), lambda: ['old'])
+    time.sleep(0.05)
+    assert cache.get_or_fetch(('k',), lambda: ['new']) == ['new']
+
+
+def test_oldest_entry_is_dropped_past_max_entries():
+    cache = NewsCache(ttl_seconds=60, max_entries=2)
+    for key in ('a', 'b', 'c'):
+        cache.get_or_fetch((key,), lambda key=key: [key])
+        time.sleep(0.01)
+    assert cache.stats()['entries'] == 2
+    assert cache.get_or_fetch(('a',), lambda: ['refetched']) == ['refetched']
+
+
+def test_shared_directory_is_visible_to_other_instances(tmp_path):
+    first = NewsCache(ttl_seconds=60, directory=str(tmp_path))
+    second = NewsCache(ttl_seconds=60, directory=str(tmp_path))
+    first.get_or_fetch(('k',), lambda: ['article'])
+    assert second.get_or_fetch(('k',), lambda: ['refetched']) == ['article']
@@ -0,0 +1,84 @@
+import os
+import time
+
+import pytest
+
+from services.news_index import NewsIndex
+from services.news_service import FixtureNewsClient, NewsService, build_symbol_queries, split_by_symbol
+
+FIXTURES = os.path.join(os.path.dirname(__file__), os.pardir, "benchmarks", "news_fixtures.json")
+
+
+@pytest.fixture
+def index(tmp_path):
+    index = NewsIndex(str(tmp_path / "news_index.sqlite"))
+    index.ingest_file(FIXTURES)
+    return index
+
+
+@pytest.fixture
+def client():
+    return FixtureNewsClient.from_file(FIXTURES)
+
+
+def test_indexed_query_makes_no_remote_calls(index, client):
+    service = NewsService(api=client, index=index, search_max_age=900)
+    for query in ("federal reserve rates", "dividend", "AI data center", "oil OPEC", "iPhone China"):
+        assert service.search_news(query, limit=5)
+    assert client.calls == 0
+
+
+def test_unindexed_query_is_fetched_once_then_served_locally(index, client):
+    service = NewsService(api=client, index=index, search_max_age=900)
+    service.search_news("stablecoin regulation", limit=5)
+    service.search_news("Stablecoin  regulation", limit=5)
+    assert client.calls == 1
+
+
+def test_stale_index_goes_remote(index, client):
+    service = NewsService(api=client, index=index, search_max_age=900)
+    index._conn().execute("UPDATE refreshes SET refreshed_at = ?", (time.time() - 3600,))
+    index._conn().commit()
+    service.search_news("bond yields retreat", limit=5)
+    assert client.calls == 1
+
+
+def test_remote_failure_falls_back_to_local_hits(index):
+    class FailingClient(FixtureNewsClient):
+        def get_everything(self, q, **kwargs):
+            raise RuntimeError("rate limited")
+
+    service = NewsService(api=FailingClient([]), index=index, search_max_age=0)
+    assert service.search_news("Nvidia data center orders", limit=5)
+
+
+def test_symbol_queries_are_packed_under_the_length_limit():
+    symbols = ['AAPL', 'META', 'JNJ', 'AAPL', 'XYZ'] + [f"T{i:03d}" for i in range(40)]
+
+    batches = build_symbol_queries(symbols, max_chars=120)
+
+    assert all(len(query) <= 120 for query, _ in batches)
+    assert [s for _, batch in batches for s in batch] == list(dict.fromkeys(symbols))
+    assert batches[0][0].startswith('AAPL OR Apple OR META OR "Meta Platforms" OR Facebook OR JNJ OR "Johnson & Johnson"')
+    assert len(batches) > 1
+
+
+def test_symbol_with_an_oversized_clause_is_queried_by_ticker():
+    names = {'LONG': ['A very long company name that will not fit in the query']}
+    assert build_symbol_queries(['LONG'], names, max_chars=30) == [('LONG', ['LONG'])]
+
+
+def test_articles_are_attributed_by_ticker_or_company_name():
+    articles = [
+        {'url': 'u1', 'title': 'Apple and Microsoft lead the rally', 'description': None},
+        {'url': 'u2', 'title': 'Visa fees under review', 'description': 'MA also named in the probe'},
+        {'url': 'u3', 'title': 'aapl is not a ticker mention', 'description': 'Neither is MAX or ma'},
+        {'url': 'u1', 'title': 'Apple and Microsoft lead the rally', 'description': 'duplicate'}
+    ]
+
+    split = split_by_symbol(articles, ['AAPL', 'MSFT', 'V', 'MA'])
+
+    assert [a['url'] for a in split['AAPL']] == ['u1']
+    assert [a['url'] for a in split['MSFT']] == ['u1']
+    assert [a['url'] for a in split['V']] == ['u2']
+    assert [a['url'] for a in split['MA']] == ['u2']
@@ -0,0 +1,39 @@
+import json
+import os
+
+import pytest
+
+from services.goal_index import normalize_goal
+from services.page_router import TRAINING_EXAMPLES, PageRouter, merge_pages
+
+FIXTURES = os.path.join(os.path.dirname(__file__), os.pardir, "benchmarks", "page_router_fixtures.json")
+
+
+@pytest.fixture(scope="module")
+def router():
+    return PageRouter()
+
+
+def test_benchmark_fixtures_are_held_out():
+    with open(FIXTURES) as f:
+        fixtures = [set(normalize_goal(case["goal"])) for case in json.load(f)]
+    for text, _ in TRAINING_EXAMPLES:
+        seed = set(normalize_goal(text))
+        overlapping = [goal for goal in fixtures if goal <= seed or seed <= goal]
+        assert not overlapping, f"seed {text!r} paraphrases a benchmark goal"
+
+
+@pytest.mark.parametrize("goal, pages", [
+    ("I will retire in 15 years", []),
+    ("I trust broad market ETFs", []),
+    ("real estate ETFs for income", []),
+    ("update my will and name my kids as heirs", ["Estate Planning"]),
+    ("sell our condo and buy a house", ["Mortgage Planning"]),
+])
+def test_rules(router, goal, pages):
+    assert router.route(goal)[0] == pages
+
+
+def test_merge_pages_keeps_base_pages_first_and_drops_unknown():
+    merged = merge_pages(["Welcome", "Crypto Investments"], ["AI Insights", "Made Up", "Crypto Investments"])
+    assert merged == ["Welcome", "AI Insights", "Crypto Investments"]
@@ -0,0 +1,102 @@
+import pytest
+
+from services import database
+from services.portfolio_repository import PortfolioRepository
+from services.positions_cache import positions_cache
+
+
+class RecordingCursor:
+    def __init__(self, connection):
+        self.connection = connection
+
+    def execute(self, sql, params=()):
+        self.connection.statements.append((" ".join(sql.split()), list(params)))
+
+    def fetchall(self):
+        return self.connection.rows
+
+    def close(self):
+        pass
+
+
+class RecordingConnection:
+    """DB-API stand-in that records statements and transaction boundaries"""
+
+    def __init__(self):
+        self.statements = []
+        self.commits = 0
+        self.rows = []
+
+    def cursor(self):
+        return RecordingCursor(self)
+
+    def commit(self):
+        self.statements.append(("COMMIT", []))
+        self.commits += 1
+
+    def rollback(self):
+        pass
+
+    def close(self):
+        pass
+
+
+@pytest.fixture
+def db():
+    connection = RecordingConnection()
+    database.configure_pool(lambda: connection, max_size=1)
+    yield connection
+    database.get_pool().close()
+    database._pool = None
+
+
+def test_replace_portfolio_is_one_transaction_with_merged_rows(db):
+    PortfolioRepository.replace_portfolio("u1", [
+        {"symbol": "AAPL", "quantity": 10, "target_allocation": 0.5},
+        {"symbol": "MSFT", "quantity": 4, "target_allocation": 0.3},
+        {"symbol": "AAPL", "quantity": 5, "target_allocation": 0.2},
+    ])
+    assert db.statements == [
+        ("DELETE FROM optimized_portfolio WHERE user_id = %s", ["u1"]),
+        ("INSERT INTO optimized_portfolio (user_id, symbol, quantity, target_allocation) VALUES "
+         "(%s, %s, %s, %s), (%s, %s, %s, %s)",
+         ["u1", "AAPL", 15, 0.7, "u1", "MSFT", 4, 0.3]),
+        ("DELETE FROM portfolio_summary WHERE user_id IN (%s)", ["u1"]),
+        ("COMMIT", []),
+    ]
+
+
+def test_replace_with_no_holdings_skips_the_insert(db):
+    PortfolioRepository.replace_portfolio("u1", [])
+    assert [sql.split()[0] for sql, _ in db.statements] == ["DELETE", "DELETE", "COMMIT"]
+
+
+def test_add_position_upserts(db):
+    PortfolioRepository.add_position("u1", "NVDA", 3)
+    sql, params = db.statements[0]
+    assert sql.endswith("ON DUPLICATE KEY UPDATE quantity = quantity + VALUES(quantity)")
+    assert params == ["u1", "NVDA", 3, 0.0]
+    assert db.commits == 1
+
+
+def test_writes_invalidate_cached_positions(db):
+    db.rows = [("AAPL", 10)]
+    assert PortfolioRepository.get_positions("u-cache") == {"AAPL": 10}
+    db.rows = [("AAPL", 12)]
+    assert PortfolioRepository.get_positions("u-cache") == {"AAPL": 10}
+    PortfolioRepository.add_position("u-cache", "AAPL", 2)
+    assert PortfolioRepository.get_positions("u-cache") == {"AAPL": 12}
+    positions_cache.invalidate("u-cache")
+
+
+def test_bulk_import_commits_once_per_batch(db, tmp_path):
+    path = tmp_path / "portfolios.csv"
+    path.write_text("user_id,symbol,quantity,target_allocation\n"
+                    "u1,AAPL,10,0.5\nu2,MSFT,5,1.0\nu1,AAPL,5,0.5\nu3,XOM,1,1.0\n")
+    assert PortfolioRepository.bulk_import_csv(str(path), users_per_batch=2) == 3
+
+    assert db.commits == 2
+    deletes = [params for sql, params in db.statements if sql.startswith("DELETE FROM optimized_portfolio")]
+    assert deletes == [["u1", "u2"], ["u3"]]
+    inserts = [params for sql, params in db.statements if sql.startswith("INSERT")]
+    assert inserts[0] == ["u1", "AAPL", 15, 1.0, "u2", "MSFT", 5, 1.0]
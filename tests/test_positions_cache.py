@@ -0,0 +1,48 @@
+import pytest
+
+from services.positions_cache import InMemoryBackend, PositionsCache, SharedBackend
+
+
+@pytest.fixture(params=["memory", "shared"])
+def cache(request, tmp_path):
+    backend = InMemoryBackend() if request.param == "memory" else SharedBackend(str(tmp_path))
+    return PositionsCache(backend, ttl_seconds=60)
+
+
+def test_read_through_and_invalidate(cache):
+    rows = {"u1": {"AAPL": 10}}
+    loads = []
+
+    def loader(user_id):
+        loads.append(user_id)
+        return dict(rows[user_id])
+
+    assert cache.get("u1", loader) == {"AAPL": 10}
+    assert cache.get("u1", loader) == {"AAPL": 10}
+    assert loads == ["u1"]
+
+    rows["u1"] = {"AAPL": 15}
+    cache.invalidate("u1")
+    assert cache.get("u1", loader) == {"AAPL": 15}
+    assert loads == ["u1", "u1"]
+    assert cache.stats()['hits'] == 1 and cache.stats()['misses'] == 2
+
+
+def test_cached_dict_is_not_shared_with_callers(cache):
+    cache.get("u1", lambda user_id: {"AAPL": 10})
+    cache.get("u1", lambda user_id: {})["AAPL"] = 0
+    assert cache.get("u1", lambda user_id: {}) == {"AAPL": 10}
+
+
+def test_write_during_load_does_not_cache_old_rows(cache):
+    rows = {"AAPL": 10}
+
+    def loader_racing_a_write(user_id):
+        loaded = dict(rows)
+        # A write commits and invalidates after the reader's SELECT, before its cache fill
+        rows["AAPL"] = 15
+        cache.invalidate(user_id)
+        return loaded
+
+    assert cache.get("u1", loader_racing_a_write) == {"AAPL": 10}
+    assert cache.get("u1", lambda user_id: dict(rows)) == {"AAPL": 15}
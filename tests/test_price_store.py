@@ -0,0 +1,36 @@
+import numpy as np
+import pandas as pd
+import pyarrow as pa
+
+from services.price_store import PriceStore
+
+
+def history(rows: int) -> pd.DataFrame:
+    index = pd.date_range('2000-01-03', periods=rows, freq='B', tz='America/New_York', name='Date')
+    rng = np.random.default_rng(0)
+    return pd.DataFrame({column: rng.random(rows) for column in ('Open', 'High', 'Low', 'Close', 'Volume')},
+                        index=index)
+
+
+def test_load_returns_views_over_the_mapped_file(tmp_path):
+    store = PriceStore(str(tmp_path))
+    # Larger than Feather's default 64K-row chunk, which would force a copy on read
+    store.save('AAPL', history(100_000), '10y')
+
+    allocated = pa.total_allocated_bytes()
+    frame, period, age = store.load('AAPL')
+
+    assert period == '10y' and store.is_fresh(age)
+    assert pa.total_allocated_bytes() - allocated < 1024
+    assert not frame['Close'].to_numpy().flags.writeable
+    pd.testing.assert_frame_equal(frame, history(100_000), check_freq=False)
+
+
+def test_info_reads_period_without_loading_the_frame(tmp_path):
+    store = PriceStore(str(tmp_path))
+    store.save('^GSPC', history(10), 'ytd')
+
+    period, age = store.info('^GSPC')
+
+    assert period == 'ytd' and store.is_fresh(age)
+    assert store.info('MSFT') == (None, None)
@@ -0,0 +1,54 @@
+import json
+
+from utils.prompt_builder import (build_articles_payload, build_portfolio_payload, estimate_tokens,
+                                  project_articles)
+
+
+def article(title: str, **extra) -> dict:
+    return {'title': title, 'description': f"{title} in detail", 'source': {'id': None, 'name': 'Wire'},
+            'publishedAt': '2024-03-01T14:30:00Z', 'url': f"https://example.com/{len(title)}",
+            'urlToImage': 'https://example.com/img.png', 'content': 'x' * 500, **extra}
+
+
+def test_articles_keep_only_needed_fields_and_drop_duplicates():
+    projected = project_articles([
+        article("Fed holds rates"),
+        article("Fed Holds Rates!"),
+        article("Oil jumps", description=None)
+    ])
+
+    assert projected == [
+        {'title': 'Fed holds rates', 'description': 'Fed holds rates in detail', 'source': 'Wire',
+         'publishedAt': '2024-03-01'},
+        {'title': 'Oil jumps', 'source': 'Wire', 'publishedAt': '2024-03-01'}
+    ]
+
+
+def test_articles_payload_fits_the_budget():
+    articles = [article(f"Story number {i} about markets") for i in range(50)]
+
+    payload = build_articles_payload(articles, token_budget=200)
+
+    assert estimate_tokens(payload) <= 200
+    kept = json.loads(payload)
+    assert 0 < len(kept) < 50
+    assert kept[0]['title'] == "Story number 0 about markets"
+
+
+def test_portfolio_payload_keeps_largest_holdings_within_budget():
+    holdings = [{'symbol': f"S{i}", 'quantity': i, 'target_allocation': i, 'note': 'dropped'}
+                for i in range(1, 60)]
+
+    payload = build_portfolio_payload({'optimized_holdings': holdings, 'risk': 'moderate'}, token_budget=150)
+
+    data = json.loads(payload)
+    assert estimate_tokens(payload) <= 150
+    assert data['risk'] == 'moderate'
+    assert data['holdings'][0] == {'symbol': 'S59', 'quantity': 59, 'target_allocation': 59}
+    allocations = [h['target_allocation'] for h in data['holdings']]
+    assert allocations == sorted(allocations, reverse=True) and len(allocations) < 59
+
+
+def test_portfolio_without_holdings_is_sent_as_is():
+    assert build_portfolio_payload({'AAPL': 10}) == '{"AAPL":10}'
+    assert build_portfolio_payload(None) == '{}'
@@ -0,0 +1,51 @@
+import pandas as pd
+import pytest
+
+from services.quote_provider import FixtureQuoteProvider, YahooQuoteProvider
+from services.stock_service import StockService
+
+
+@pytest.fixture
+def fixture_quotes(monkeypatch):
+    provider = FixtureQuoteProvider({
+        'AAPL': {'price': 190.0, 'previous_close': 188.0},
+        'MSFT': {'price': 410.0, 'previous_close': 415.0}
+    })
+    monkeypatch.setattr(StockService, 'quote_provider', StockService.quote_provider)
+    StockService.set_quote_provider(provider)
+    return provider
+
+
+def test_portfolio_performance_uses_the_configured_provider(fixture_quotes):
+    performance = StockService.get_portfolio_performance({'AAPL': 10, 'MSFT': 2})
+
+    assert performance['total_value'] == 190.0 * 10 + 410.0 * 2
+    assert performance['daily_change'] == 2.0 * 10 - 5.0 * 2
+    assert [h['symbol'] for h in performance['holdings']] == ['AAPL', 'MSFT']
+
+
+def test_unknown_symbols_are_priced_at_zero(fixture_quotes):
+    performance = StockService.get_portfolio_performance({'ZZZZ': 5})
+    assert performance['holdings'][0]['value'] == 0
+    assert performance['total_value'] == 0
+
+
+def test_yahoo_provider_fetches_all_symbols_in_one_download(monkeypatch):
+    import yfinance as yf
+
+    downloads = []
+    index = pd.date_range('2024-01-01', periods=3)
+    closes = pd.DataFrame({'AAPL': [1.0, 2.0, 3.0], 'MSFT': [5.0, 6.0, None]}, index=index)
+
+    def download(tickers, **kwargs):
+        downloads.append(tickers)
+        return pd.concat({'Close': closes}, axis=1)
+
+    monkeypatch.setattr(yf, 'download', download)
+    quotes = YahooQuoteProvider().get_quotes(['AAPL', 'MSFT', 'AAPL', 'GONE'])
+
+    assert downloads == [['AAPL', 'MSFT', 'GONE']]
+    assert quotes['AAPL'] == {'price': 3.0, 'previous_close': 2.0}
+    # Missing last bar falls back to the previous one that exists
+    assert quotes['MSFT'] == {'price': 6.0, 'previous_close': 5.0}
+    assert quotes['GONE'] == {'price': 0, 'previous_close': 0}
@@ -0,0 +1,126 @@
+import pandas as pd
+
+from services.stock_service import StockService
+
+
+def bars(start: str, closes: list, dividends: list = None) -> pd.DataFrame:
+    index = pd.date_range(start, periods=len(closes), freq='B', tz='America/New_York')
+    return pd.DataFrame({
+        'Close': [float(close) for close in closes],
+        'Dividends': [float(d) for d in (dividends or [0] * len(closes))],
+        'Stock Splits': [0.0] * len(closes)
+    }, index=index)
+
+
+class StubTicker:
+    def __init__(self, history: pd.DataFrame):
+        self._history = history
+        self.requests = []
+
+    def history(self, start=None, interval=None, **kwargs):
+        self.requests.append(start)
+        return self._history[self._history.index.date >= start]
+
+
+def test_partial_last_bar_is_replaced():
+    # The cached frame ends with an intraday bar that closed at 104 by the end of the day
+    stale = bars('2024-01-01', [100, 101, 102, 103.5])
+    ticker = StubTicker(bars('2024-01-01', [100, 101, 102, 104, 105]))
+
+    extended = StockService._extend_history(ticker, stale, '1y', '1d')
+
+    assert ticker.requests == [stale.index[-2].date()]
+    assert list(extended['Close']) == [100, 101, 102, 104, 105]
+    assert extended.index.is_unique
+
+
+def test_no_new_bars_keeps_cached_frame():
+    stale = bars('2024-01-01', [100, 101, 102])
+
+    class Empty(StubTicker):
+        def history(self, **kwargs):
+            return stale.iloc[0:0]
+
+    assert StockService._extend_history(Empty(stale), stale, '1y', '1d') is stale
+
+
+def test_adjusted_price_change_forces_full_refetch():
+    stale = bars('2024-01-01', [100, 101, 102, 103])
+    ticker = StubTicker(bars('2024-01-01', [50, 50.5, 51, 51.5, 52]))
+    assert StockService._extend_history(ticker, stale, '1y', '1d') is None
+
+
+def test_new_dividend_forces_full_refetch():
+    stale = bars('2024-01-01', [100, 101, 102, 103])
+    ticker = StubTicker(bars('2024-01-01', [100, 101, 102, 103, 104], dividends=[0, 0, 0, 0, 0.5]))
+    assert StockService._extend_history(ticker, stale, '1y', '1d') is None
+
+
+def test_single_cached_bar_cannot_be_extended():
+    stale = bars('2024-01-01', [100])
+    ticker = StubTicker(bars('2024-01-01', [100, 101]))
+    assert StockService._extend_history(ticker, stale, '1y', '1d') is None
+    assert ticker.requests == []
+
+
+def test_ytd_is_only_served_from_ytd_or_a_year_or_more():
+    assert StockService._period_covers('ytd', 'ytd')
+    assert StockService._period_covers('1y', 'ytd')
+    assert StockService._period_covers('max', 'ytd')
+    assert not StockService._period_covers('6mo', 'ytd')
+    # A stored year-to-date frame in February is shorter than six months
+    assert not StockService._period_covers('ytd', '6mo')
+    assert not StockService._period_covers('ytd', '1y')
+
+
+def test_trim_to_ytd_starts_at_the_first_bar_of_the_year():
+    frame = bars('2023-12-27', range(10))
+    trimmed = StockService._trim_to_period(frame, 'ytd')
+    assert trimmed.index[0] == pd.Timestamp('2024-01-01', tz='America/New_York')
+    assert len(trimmed) == 7
+
+
+def test_stored_frames_are_not_copied_into_the_history_cache(tmp_path, monkeypatch):
+    from services import stock_service
+    from services.history_cache import HistoryCache
+    from services.price_store import PriceStore
+
+    store = PriceStore(str(tmp_path))
+    store.save('AAPL', bars('2023-01-02', range(400)), '2y')
+    cache = HistoryCache()
+    monkeypatch.setattr(stock_service, 'price_store', store)
+    monkeypatch.setattr(stock_service, 'history_cache', cache)
+
+    hist = StockService.get_stock_data('AAPL', period='1y')
+
+    assert hist.index[0] > hist.index[-1] - pd.DateOffset(years=1)
+    assert not hist['Close'].to_numpy().flags.writeable
+    assert cache.stats()['entries'] == 0
+
+
+def test_hung_fetch_holds_one_thread_across_calls(monkeypatch, capsys):
+    import threading
+
+    release = threading.Event()
+    calls = []
+
+    def fetch(symbol, period, interval):
+        calls.append(symbol)
+        if symbol == 'HUNG':
+            release.wait(5)
+        if symbol == 'BAD':
+            raise ValueError("no data")
+        return bars('2024-01-01', [1, 2])
+
+    monkeypatch.setattr(StockService, 'get_stock_data', staticmethod(fetch))
+    try:
+        for _ in range(3):
+            histories = StockService.get_many_histories(['OK', 'HUNG', 'BAD'], timeout=0.2)
+            assert list(histories) == ['OK']
+        assert calls.count('HUNG') == 1
+    finally:
+        release.set()
+
+    out = capsys.readouterr().out
+    assert "Timed out fetching history for HUNG" in out
+    assert "Failed to fetch history for BAD: no data" in out
@@ -0,0 +1,57 @@
+import json
+
+from utils.streaming_json import IncrementalJSONParser
+
+REPLY = {
+    "summary": "Heavy in tech, {braces} and \"quotes\" inside strings",
+    "risks": ["Concentration in [tech]", "Rate sensitivity"],
+    "opportunities": [],
+    "allocation": {"stocks": 0.8, "bonds": 0.2},
+    "confidence": 0.75
+}
+
+
+def feed_in_chunks(text, size):
+    parser = IncrementalJSONParser()
+    events = []
+    for start in range(0, len(text), size):
+        events.extend(parser.feed(text[start:start + size]))
+    return parser, events
+
+
+def test_single_chunk_matches_json_loads():
+    parser, events = feed_in_chunks(json.dumps(REPLY), 10_000)
+    assert parser.done
+    assert parser.result == REPLY
+    assert [key for key, index, _ in events if index is None] == list(REPLY)
+
+
+def test_any_chunking_yields_the_same_events():
+    text = json.dumps(REPLY, indent=2)
+    _, expected = feed_in_chunks(text, len(text))
+    for size in (1, 2, 3, 7, 64):
+        parser, events = feed_in_chunks(text, size)
+        assert events == expected
+        assert parser.result == REPLY
+
+
+def test_array_items_are_reported_before_the_field_completes():
+    parser = IncrementalJSONParser()
+    assert parser.feed('{"risks": ["a", ') == [('risks', 0, 'a')]
+    assert parser.feed('"b"') == []
+    assert parser.feed('], ') == [('risks', 1, 'b'), ('risks', None, ['a', 'b'])]
+    assert not parser.done
+
+
+def test_text_around_the_object_is_ignored():
+    parser, events = feed_in_chunks('```json\n{"summary": "ok"}\n```', 4)
+    assert parser.done
+    assert parser.result == {"summary": "ok"}
+    assert events == [("summary", None, "ok")]
+
+
+def test_incomplete_reply_is_not_done():
+    parser = IncrementalJSONParser()
+    parser.feed('{"summary": "ok", "risks": ["a"')
+    assert not parser.done
+    assert parser.result == {"summary": "ok"}
@@ -0,0 +1,125 @@
+import json
+import os
+import threading
+import time
+
+import multiprocess
+
+from services import tracking_service
+from services.tracking_service import ActivityLogger
+
+
+class RecordingLogger(ActivityLogger):
+    """Writes batches to a list instead of the database"""
+
+    def __init__(self, fail: int = 0, **kwargs):
+        super().__init__(**kwargs)
+        self.batches = []
+        self.fail = fail
+        self.release = threading.Event()
+        self.release.set()
+
+    def _write(self, batch):
+        self.release.wait(5)
+        if self.fail:
+            self.fail -= 1
+            self.failed += len(batch)
+            if self.backpressure == "spill":
+                self._spill(batch)
+            return
+        self.batches.append(batch)
+        self.written += len(batch)
+
+
+def wait_for(condition, timeout=5):
+    deadline = time.monotonic() + timeout
+    while not condition() and time.monotonic() < deadline:
+        time.sleep(0.01)
+    return condition()
+
+
+def test_events_are_written_in_batches(tmp_path):
+    logger = RecordingLogger(batch_size=10, flush_interval=0.05, spill_path=str(tmp_path / "spill.jsonl"))
+    for i in range(25):
+        logger.log("u1", "page_view", {"i": i})
+    logger.shutdown()
+    assert sum(len(batch) for batch in logger.batches) == 25
+    assert all(len(batch) <= 10 for batch in logger.batches)
+    user_id, activity_type, details, _ = logger.batches[0][0]
+    assert (user_id, activity_type, json.loads(details)) == ("u1", "page_view", {"i": 0})
+
+
+def test_drop_policy_discards_events_when_queue_is_full(tmp_path):
+    logger = RecordingLogger(max_queue=2, batch_size=1, flush_interval=0.01,
+                             spill_path=str(tmp_path / "spill.jsonl"))
+    logger.release.clear()
+    logger.log("u1", "a")
+    assert wait_for(lambda: logger._queue.empty())  # writer is blocked on the first event
+    for _ in range(5):
+        logger.log("u1", "b")
+    assert logger.stats()['dropped'] == 3
+    logger.release.set()
+    logger.shutdown()
+    assert logger.written == 3
+
+
+def test_spilled_events_are_replayed(tmp_path):
+    spill_path = str(tmp_path / "spill.jsonl")
+    logger = RecordingLogger(fail=1, batch_size=5, flush_interval=0.05, backpressure="spill",
+                             spill_path=spill_path)
+    for i in range(3):
+        logger.log("u1", "trade", {"i": i})
+    assert wait_for(lambda: logger.written == 3)
+    assert logger.spilled == 3
+    assert not os.path.exists(spill_path)
+    logger.shutdown()
+
+
+def test_concurrent_replays_by_two_workers_keep_every_event(tmp_path, monkeypatch):
+    spill_path = str(tmp_path / "spill.jsonl")
+    first, second = RecordingLogger(spill_path=spill_path), RecordingLogger(spill_path=spill_path)
+    pid = [100]
+    monkeypatch.setattr(tracking_service.os, "getpid", lambda: pid[0])
+    replace = os.replace
+
+    def replace_then_other_worker_replays(src, dst):
+        replace(src, dst)
+        if pid[0] == 100:
+            # The second worker spills and replays between the first one's rename and read
+            pid[0] = 200
+            second._spill([("u2", "trade", "null", "2024-01-01 00:00:00")])
+            second._replay_spill()
+            pid[0] = 100
+
+    monkeypatch.setattr(tracking_service.os, "replace", replace_then_other_worker_replays)
+    first._spill([("u1", "trade", "null", "2024-01-01 00:00:00")])
+    first._replay_spill()
+    assert [batch[0][0] for batch in first.batches + second.batches] == ["u1", "u2"]
+
+
+def test_forked_child_writes_its_own_events(tmp_path, monkeypatch):
+    out = str(tmp_path / "written.jsonl")
+
+    def write_to_file(batch):
+        with open(out, "a") as f:
+            for event in batch:
+                f.write(json.dumps([os.getpid()] + list(event)) + "\n")
+
+    logger = tracking_service.activity_logger
+    monkeypatch.setattr(logger, "_write", write_to_file)
+    monkeypatch.setattr(logger, "flush_interval", 0.05)
+    logger.log("parent", "boot")
+
+    def child():
+        for i in range(3):
+            logger.log("child", "job", {"i": i})
+
+    process = multiprocess.get_context("fork").Process(target=child)
+    process.start()
+    process.join(10)
+    assert process.exitcode == 0
+    assert wait_for(lambda: os.path.exists(out) and "parent" in open(out).read())
+    with open(out) as f:
+        rows = [json.loads(line) for line in f]
+    assert sorted(row[1] for row in rows) == ["child"] * 3 + ["parent"]
+    assert {row[0] for row in rows if row[1] == "child"} == {process.pid}
@@ -0,0 +1,103 @@
+import numpy as np
+import pandas as pd
+
+TRADING_DAYS = 252
+
+
+def returns_matrix(prices: pd.DataFrame) -> pd.DataFrame:
+    """Turn a dates × symbols close-price frame into aligned daily returns (symbols × dates)"""
+    prices = prices.sort_index().ffill()
+    return prices.pct_change().iloc[1:].fillna(0).T
+
+
+def max_drawdowns(cumulative: np.ndarray) -> np.ndarray:
+    """Max drawdown along the last axis of a (portfolios × dates) growth matrix"""
+    running_peak = np.maximum.accumulate(cumulative, axis=-1)
+    return ((cumulative - running_peak) / running_peak).min(axis=-1)
+
+
+def compute_portfolio_analytics(returns: pd.DataFrame,
+                                quantities,
+                                last_prices: pd.Series,
+                                benchmark: pd.Series = None,
+                                risk_free_rate: float = 0.0) -> dict:
+    """Compute portfolio metrics for one or many portfolios in a single vectorized pass.
+
+    Args:
+        returns: symbols × dates daily returns, e.g. from returns_matrix().
+        quantities: shares held, either a Series indexed by symbol (one portfolio)
+            or a DataFrame of portfolios × symbols.
+        last_prices: latest price per symbol.
+        benchmark: daily returns of the benchmark (e.g. ^GSPC) indexed by date.
+        risk_free_rate: annual risk free rate used for the Sharpe ratio.
+
+    Returns:
+        dict of arrays (or scalars for a single portfolio) plus the covariance matrix.
+    """
+    single = isinstance(quantities, pd.Series)
+    quantity_frame = quantities.to_frame().T if single else quantities
+    symbols = returns.index
+    Q = quantity_frame.reindex(columns=symbols, fill_value=0).to_numpy(dtype=float)
+    R = returns.to_numpy(dtype=float)
+    prices = last_prices.reindex(symbols).fillna(0).to_numpy(dtype=float)
+
+    values = Q * prices                                   # portfolios × symbols
+    total_value = values.sum(axis=1)
+    safe_total = np.where(total_value > 0, total_value, 1)
+    weights = values / safe_total[:, None]
+
+    portfolio_returns = weights @ R                       # portfolios × dates
+    cumulative = np.cumprod(1 + portfolio_returns, axis=1)
+    period_return = cumulative[:, -1] - 1 if R.shape[1] else np.zeros(len(Q))
+    daily_return = portfolio_returns[:, -1] if R.shape[1] else np.zeros(len(Q))
+
+    dates = returns.columns
+    if len(dates):
+        ytd_mask = np.asarray(dates.year == dates[-1].year)
+        ytd_return = np.prod(1 + portfolio_returns[:, ytd_mask], axis=1) - 1
+    else:
+        ytd_return = np.zeros(len(Q))
+
+    covariance = np.cov(R) if R.shape[1] > 1 else np.zeros((len(symbols), len(symbols)))
+    covariance = np.atleast_2d(covariance) * TRADING_DAYS
+    volatility = np.sqrt(np.einsum('ps,st,pt->p', weights, covariance, weights))
+
+    mean_annual = portfolio_returns.mean(axis=1) * TRADING_DAYS if R.shape[1] else np.zeros(len(Q))
+    sharpe = np.divide(mean_annual - risk_free_rate, volatility,
+                       out=np.zeros_like(volatility), where=volatility > 0)
+
+    max_drawdown = max_drawdowns(cumulative) if R.shape[1] else np.zeros(len(Q))
+
+    if benchmark is not None and R.shape[1] > 1:
+        b = benchmark.reindex(dates).fillna(0).to_numpy(dtype=float)
+        b_centered = b - b.mean()
+        p_centered = portfolio_returns - portfolio_returns.mean(axis=1, keepdims=True)
+        b_var = (b_centered @ b_centered) / (len(b) - 1)
+        beta = (p_centered @ b_centered) / (len(b) - 1) / b_var if b_var > 0 else np.zeros(len(Q))
+    else:
+        beta = np.full(len(Q), np.nan)
+
+    hhi = (weights ** 2).sum(axis=1)
+
+    metrics = {
+        'total_value': total_value,
+        'weights': pd.DataFrame(weights, index=quantity_frame.index, columns=symbols),
+        'daily_return': daily_return,
+        'ytd_return': ytd_return,
+        'period_return': period_return,
+        'volatility': volatility,
+        'sharpe': sharpe,
+        'max_drawdown': max_drawdown,
+        'beta': beta,
+        'hhi': hhi,
+        'diversification_score': 1 - hhi,
+        'covariance': pd.DataFrame(covariance, index=symbols, columns=symbols)
+    }
+    if single:
+        metrics = {
+            key: (value.iloc[0] if key == 'weights'
+                  else value if key == 'covariance'
+                  else float(value[0]))
+            for key, value in metrics.items()
+        }
+    return metrics
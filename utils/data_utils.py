@@ -1,32 +1,58 @@
 import pandas as pd
 import numpy as np
 from datetime import datetime, timedelta
+from utils.analytics import compute_portfolio_analytics, returns_matrix
 
 def calculate_returns(data: pd.DataFrame) -> pd.DataFrame:
     """Calculate daily returns from price data"""
     returns = data['Close'].pct_change()
     return returns.fillna(0)
 
-def calculate_portfolio_metrics(portfolio_data: dict) -> dict:
-    """Calculate key portfolio metrics"""
+def calculate_portfolio_metrics(portfolio_data: dict, histories: dict = None,
+                                benchmark: pd.DataFrame = None) -> dict:
+    """Calculate key portfolio metrics.
+
+    When price histories (symbol -> OHLCV frame) are given, return and risk metrics
+    are computed with the vectorized analytics engine; benchmark is the ^GSPC history.
+    """
     metrics = {
         'total_value': 0,
         'daily_return': 0,
         'ytd_return': 0,
         'risk_metrics': {}
     }
-    
-    # Calculate total value and returns
-    total_value = sum(position['value'] for position in portfolio_data['holdings'])
-    daily_changes = sum(position['daily_change'] for position in portfolio_data['holdings'])
-    
+
+    holdings = pd.DataFrame(portfolio_data['holdings'],
+                            columns=['symbol', 'quantity', 'value', 'daily_change'])
+    total_value = float(holdings['value'].sum())
+
     metrics['total_value'] = total_value
-    metrics['daily_return'] = (daily_changes / total_value) if total_value > 0 else 0
-    
-    # Calculate risk metrics
-    position_weights = [position['value'] / total_value for position in portfolio_data['holdings']]
-    metrics['risk_metrics']['diversification_score'] = 1 - sum(w**2 for w in position_weights)
-    
+    metrics['daily_return'] = float(holdings['daily_change'].sum() / total_value) if total_value > 0 else 0
+
+    weights = holdings['value'].to_numpy() / total_value if total_value > 0 else np.zeros(len(holdings))
+    metrics['risk_metrics']['diversification_score'] = 1 - float(np.sum(weights ** 2))
+
+    if histories:
+        closes = pd.DataFrame({
+            symbol: frame['Close'] for symbol, frame in histories.items()
+            if frame is not None and not frame.empty
+        })
+        if not closes.empty:
+            held = holdings.set_index('symbol')
+            last_prices = (held['value'] / held['quantity'].replace(0, np.nan)).fillna(0)
+            benchmark_returns = calculate_returns(benchmark) if benchmark is not None else None
+            analytics = compute_portfolio_analytics(returns_matrix(closes),
+                                                    held['quantity'].astype(float),
+                                                    last_prices,
+                                                    benchmark=benchmark_returns)
+            metrics['ytd_return'] = analytics['ytd_return']
+            metrics['risk_metrics'].update({
+                'volatility': analytics['volatility'],
+                'sharpe': analytics['sharpe'],
+                'max_drawdown': analytics['max_drawdown'],
+                'beta': analytics['beta']
+            })
+
     return metrics
 
 def format_currency(value: float) -> str:
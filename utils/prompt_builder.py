@@ -0,0 +1,81 @@
+import json
+import re
+
+# Fields of a NewsAPI article the sentiment model actually needs
+ARTICLE_FIELDS = ('title', 'description', 'source', 'publishedAt')
+
+
+def estimate_tokens(text: str) -> int:
+    """Local token estimate: roughly one token per word piece or punctuation mark.
+
+    Tracks Claude's tokenizer closely enough for budgeting without a network call.
+    """
+    return len(re.findall(r"\w{1,4}|[^\w\s]", text))
+
+
+def compact_json(data) -> str:
+    return json.dumps(data, separators=(',', ':'), ensure_ascii=False)
+
+
+def project_articles(articles: list) -> list:
+    """Keep only the fields the model needs and drop duplicate stories"""
+    projected = []
+    seen = set()
+    for article in articles:
+        title = (article.get('title') or '').strip()
+        dedupe_key = re.sub(r"\W+", " ", title.lower()).strip() or article.get('url')
+        if not dedupe_key or dedupe_key in seen:
+            continue
+        seen.add(dedupe_key)
+
+        item = {}
+        for field in ARTICLE_FIELDS:
+            value = article.get(field)
+            if field == 'source' and isinstance(value, dict):
+                value = value.get('name')
+            if field == 'publishedAt' and value:
+                value = value[:10]
+            if value:
+                item[field] = value.strip() if isinstance(value, str) else value
+        projected.append(item)
+    return projected
+
+
+def fit_to_budget(items: list, token_budget: int) -> list:
+    """Take items in order until the next one would exceed the token budget"""
+    kept = []
+    used = 2  # surrounding brackets
+    for item in items:
+        cost = estimate_tokens(compact_json(item)) + 1
+        if used + cost > token_budget:
+            break
+        kept.append(item)
+        used += cost
+    return kept
+
+
+def build_articles_payload(articles: list, token_budget: int = 1500) -> str:
+    """Projected, deduplicated, budget-trimmed articles as compact JSON"""
+    return compact_json(fit_to_budget(project_articles(articles), token_budget))
+
+
+def build_portfolio_payload(portfolio_data: dict, token_budget: int = 1500) -> str:
+    """Portfolio data as compact JSON, with holdings trimmed to fit the budget.
+
+    Holdings are kept largest-allocation first, and only the fields that describe
+    the position are sent.
+    """
+    data = dict(portfolio_data or {})
+    holdings = data.pop('optimized_holdings', None)
+    if holdings is None:
+        holdings = data.pop('holdings', None)
+    base = compact_json(data)
+    if holdings is None:
+        return base
+
+    keep = ('symbol', 'quantity', 'target_allocation', 'value', 'daily_change')
+    holdings = sorted(
+        ({k: h[k] for k in keep if k in h} for h in holdings),
+        key=lambda h: -(h.get('target_allocation') or h.get('value') or 0))
+    data['holdings'] = fit_to_budget(holdings, token_budget - estimate_tokens(base))
+    return compact_json(data)
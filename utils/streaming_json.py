@@ -0,0 +1,114 @@
+import json
+
+
+class IncrementalJSONParser:
+    """Parse a JSON object as it streams in, reporting fields the moment they complete.
+
+    feed() returns a list of (key, index, value) events:
+      - (key, None, value) when a top-level field of the object is complete
+      - (key, i, item) when item i of a top-level array field is complete
+    Text before the opening brace (e.g. a ```json fence) and after the closing
+    brace is ignored. `result` holds everything parsed so far.
+    """
+
+    def __init__(self):
+        self.result = {}
+        self.done = False
+        self._buf = ''
+        self._pos = 0
+        self._started = False
+        self._stack = []
+        self._in_string = False
+        self._escape = False
+        self._expect_key = False
+        self._key = None
+        self._key_start = None
+        self._value_pending = False
+        self._value_start = None
+        self._item_pending = False
+        self._item_start = None
+        self._item_index = 0
+
+    def feed(self, chunk: str) -> list:
+        events = []
+        self._buf += chunk
+        buf = self._buf
+        while self._pos < len(buf) and not self.done:
+            i = self._pos
+            c = buf[i]
+            self._pos += 1
+
+            if not self._started:
+                if c == '{':
+                    self._started = True
+                    self._stack.append('{')
+                    self._expect_key = True
+                continue
+
+            if self._in_string:
+                if self._escape:
+                    self._escape = False
+                elif c == '\\':
+                    self._escape = True
+                elif c == '"':
+                    self._in_string = False
+                    if self._key_start is not None:
+                        self._key = json.loads(buf[self._key_start:i + 1])
+                        self._key_start = None
+                continue
+
+            if c.isspace():
+                continue
+
+            depth = len(self._stack)
+            in_field_array = depth == 2 and self._stack[1] == '['
+            if depth == 1 and self._value_pending:
+                self._value_start = i
+                self._value_pending = False
+            if in_field_array and self._item_pending and c != ']':
+                self._item_start = i
+                self._item_pending = False
+
+            if c == '"':
+                self._in_string = True
+                if depth == 1 and self._expect_key:
+                    self._key_start = i
+                    self._expect_key = False
+            elif c == ':' and depth == 1:
+                self._value_pending = True
+            elif c in '{[':
+                if depth == 1 and c == '[':
+                    self._item_pending = True
+                    self._item_index = 0
+                self._stack.append(c)
+            elif c in '}]':
+                if in_field_array:
+                    self._emit_item(i, events)
+                self._stack.pop()
+                if not self._stack:
+                    self._emit_value(i, events)
+                    self.done = True
+            elif c == ',':
+                if depth == 1:
+                    self._emit_value(i, events)
+                    self._expect_key = True
+                elif in_field_array:
+                    self._emit_item(i, events)
+                    self._item_pending = True
+        return events
+
+    def _emit_value(self, end: int, events: list):
+        if self._value_start is None:
+            return
+        value = json.loads(self._buf[self._value_start:end])
+        self._value_start = None
+        self.result[self._key] = value
+        events.append((self._key, None, value))
+
+    def _emit_item(self, end: int, events: list):
+        if self._item_start is None:
+            return
+        item = json.loads(self._buf[self._item_start:end])
+        self._item_start = None
+        events.append((self._key, self._item_index, item))
+        self._item_index += 1